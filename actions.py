@@ -10,14 +10,81 @@ import numpy as np
 from PIL import Image
 import io
 import base64
-from bs4 import BeautifulSoup
 import re
 import os
+import zlib
+
+from circuit import UpstreamUnavailable
+from config import Config
+from crawler import crawl
+from html_analysis import StreamingPageAnalyzer
+from page_weight import measure_page
+from portfolio import analyze, parse_holdings
+from price_feed import PriceFeed
+from probe import probe_all
+from quotes import parse_symbols, quote_cache, quote_table
+from timeseries import price_store, summarize, to_days
+from transport import FetchResult, transport
 
 # API Keys and configurations
 WEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "demo_key")
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "demo_key")
 STOCK_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "demo_key")
+CRYPTO_API_KEY = os.getenv("COINGECKO_API_KEY", "demo_key")
+
+# Upstream endpoints (base URLs can point at fake_upstreams.py for offline load tests)
+WEATHER_URL = f"{Config.OPENWEATHER_BASE_URL}/data/2.5/weather"
+SEARCH_URL = f"{Config.DUCKDUCKGO_BASE_URL}/"
+STOCK_URL = f"{Config.ALPHA_VANTAGE_BASE_URL}/query"
+NEWS_URL = f"{Config.NEWS_API_BASE_URL}/v2/top-headlines"
+GITHUB_API_URL = Config.GITHUB_API_BASE_URL
+CRYPTO_URL = f"{Config.COINGECKO_BASE_URL}/api/v3/simple/price"
+BROWSER_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+def _use_mock_data(api_key: str, base_url_setting: str) -> bool:
+    """
+    Mock data stands in for a real provider when no API key is configured.
+    An overridden base URL (e.g. fake_upstreams.py) is always called over HTTP.
+    """
+    return api_key == "demo_key" and not os.getenv(base_url_setting)
+
+def _upstream_error(message: str, error: Exception) -> Dict[str, Any]:
+    """
+    Error result for a failed upstream call. Outages (open circuit, exhausted
+    quota, connection failures, timeouts) are flagged so the dispatcher can
+    answer with a stale or mock fallback instead.
+    """
+    result = {"error": f"{message}: {str(error) or type(error).__name__}"}
+    if isinstance(error, (UpstreamUnavailable, requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                          aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        result["upstream_unavailable"] = True
+    return result
+
+def _normalize_url(url: str) -> str:
+    """Add the https:// protocol to a bare domain."""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+def _response_time_metrics(response, response_time: float) -> Dict[str, Any]:
+    """Build the get_response_time result from a completed response."""
+    # Get additional metrics
+    status_code = response.status_code
+    content_length = len(response.content) if response.content else 0
+    headers = response.headers
+    
+    return {
+        "response_time": round(response_time, 3),
+        # Timed over a fresh connection, so it includes DNS, TCP and TLS setup
+        "connection": "new",
+        "status_code": status_code,
+        "content_length": content_length,
+        "final_url": str(response.url),
+        "headers": {
+            "server": headers.get("server", "unknown"),
+            "content_type": headers.get("content-type", "unknown")
+        }
+    }
 
 def get_response_time(url: str) -> Dict[str, Any]:
     """
@@ -27,74 +94,95 @@ def get_response_time(url: str) -> Dict[str, Any]:
         start_time = time.time()
         
         # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
+        url = _normalize_url(url)
         
-        response = requests.get(url, timeout=10, allow_redirects=True)
+        # A one-off session: the pooled keep-alive connections would hide connection setup
+        with requests.Session() as session:
+            response = session.get(url, headers={"User-Agent": transport.user_agent}, timeout=transport.timeout)
         end_time = time.time()
         
-        response_time = end_time - start_time
-        
-        # Get additional metrics
-        status_code = response.status_code
-        content_length = len(response.content) if response.content else 0
-        headers = dict(response.headers)
-        
-        return {
-            "response_time": round(response_time, 3),
-            "status_code": status_code,
-            "content_length": content_length,
-            "final_url": response.url,
-            "headers": {
-                "server": headers.get("server", "unknown"),
-                "content_type": headers.get("content-type", "unknown")
-            }
-        }
+        return _response_time_metrics(response, end_time - start_time)
     except requests.exceptions.RequestException as e:
         return {"error": str(e), "response_time": None}
 
+def _probe_targets(urls) -> List[str]:
+    """Accept a list or a comma/space separated string, capped at PROBE_MAX_URLS."""
+    if isinstance(urls, str):
+        urls = re.split(r"[,\s]+", urls)
+    return [url for url in urls if url and url.strip()][:Config.PROBE_MAX_URLS]
+
+def _response_times_report(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    measured = [result for result in results if "total" in result]
+    report = {
+        "urls_probed": len(results),
+        "failed": len(results) - len(measured),
+        "results": results
+    }
+    if measured:
+        slowest = max(measured, key=lambda result: result["total"]["median"])
+        report["slowest"] = {"url": slowest["url"], "median_total_ms": slowest["total"]["median"]}
+    return report
+
+def get_response_times(urls: List[str], samples: int = Config.PROBE_SAMPLES) -> Dict[str, Any]:
+    """
+    Probe several websites concurrently, reporting DNS, connect, TLS, time to
+    first byte and total time per URL (min / median / p95 over `samples` requests).
+    """
+    try:
+        targets = _probe_targets(urls)
+        if not targets:
+            return {"error": "No URLs given"}
+        return _response_times_report(transport.run_sync(probe_all(targets, int(samples))))
+    except Exception as e:
+        return {"error": f"Latency probe failed: {str(e)}"}
+
+def _mock_weather(city: str) -> Dict[str, Any]:
+    """Mock weather data used when no OpenWeatherMap API key is configured."""
+    weather_data = {
+        "new york": {"temperature": 72, "condition": "sunny", "humidity": 65, "wind_speed": 8},
+        "london": {"temperature": 58, "condition": "cloudy", "humidity": 80, "wind_speed": 12},
+        "tokyo": {"temperature": 75, "condition": "rainy", "humidity": 70, "wind_speed": 15},
+        "sydney": {"temperature": 68, "condition": "clear", "humidity": 55, "wind_speed": 10}
+    }
+    city_lower = city.lower().replace(" ", "_")
+    return weather_data.get(city_lower, {"temperature": 70, "condition": "unknown", "humidity": 60, "wind_speed": 5})
+
+def _weather_params(city: str) -> Dict[str, Any]:
+    return {
+        "q": city,
+        "appid": WEATHER_API_KEY,
+        "units": "imperial"
+    }
+
+def _parse_weather(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "temperature": round(data["main"]["temp"]),
+        "condition": data["weather"][0]["main"].lower(),
+        "humidity": data["main"]["humidity"],
+        "wind_speed": round(data["wind"]["speed"]),
+        "pressure": data["main"]["pressure"],
+        "visibility": data.get("visibility", "unknown"),
+        "sunrise": datetime.fromtimestamp(data["sys"]["sunrise"]).strftime("%H:%M"),
+        "sunset": datetime.fromtimestamp(data["sys"]["sunset"]).strftime("%H:%M")
+    }
+
 def get_weather_info(city: str) -> Dict[str, Any]:
     """
     Get real weather information using OpenWeatherMap API.
     """
     try:
-        if WEATHER_API_KEY == "demo_key":
+        if _use_mock_data(WEATHER_API_KEY, "OPENWEATHER_BASE_URL"):
             # Fallback to mock data if no API key
-            weather_data = {
-                "new york": {"temperature": 72, "condition": "sunny", "humidity": 65, "wind_speed": 8},
-                "london": {"temperature": 58, "condition": "cloudy", "humidity": 80, "wind_speed": 12},
-                "tokyo": {"temperature": 75, "condition": "rainy", "humidity": 70, "wind_speed": 15},
-                "sydney": {"temperature": 68, "condition": "clear", "humidity": 55, "wind_speed": 10}
-            }
-            city_lower = city.lower().replace(" ", "_")
-            return weather_data.get(city_lower, {"temperature": 70, "condition": "unknown", "humidity": 60, "wind_speed": 5})
+            return _mock_weather(city)
         
         # Real API call
-        base_url = "http://api.openweathermap.org/data/2.5/weather"
-        params = {
-            "q": city,
-            "appid": WEATHER_API_KEY,
-            "units": "imperial"
-        }
-        
-        response = requests.get(base_url, params=params, timeout=10)
+        response = transport.get(WEATHER_URL, params=_weather_params(city))
         response.raise_for_status()
         
-        data = response.json()
-        
-        return {
-            "temperature": round(data["main"]["temp"]),
-            "condition": data["weather"][0]["main"].lower(),
-            "humidity": data["main"]["humidity"],
-            "wind_speed": round(data["wind"]["speed"]),
-            "pressure": data["main"]["pressure"],
-            "visibility": data.get("visibility", "unknown"),
-            "sunrise": datetime.fromtimestamp(data["sys"]["sunrise"]).strftime("%H:%M"),
-            "sunset": datetime.fromtimestamp(data["sys"]["sunset"]).strftime("%H:%M")
-        }
+        return _parse_weather(response.json())
         
     except Exception as e:
-        return {"error": f"Failed to get weather data: {str(e)}"}
+        return _upstream_error("Failed to get weather data", e)
 
 def calculate_math_expression(expression: str) -> Dict[str, Any]:
     """
@@ -155,135 +243,266 @@ def get_current_time(timezone: str = "UTC") -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Time error: {str(e)}"}
 
+def _search_params(query: str) -> Dict[str, Any]:
+    return {
+        "q": query,
+        "format": "json",
+        "no_html": "1",
+        "skip_disambig": "1"
+    }
+
+def _parse_search(query: str, data: Dict[str, Any], max_results: int) -> Dict[str, Any]:
+    return {
+        "query": query,
+        "abstract": data.get("Abstract", "No abstract available"),
+        "related_topics": data.get("RelatedTopics", [])[:max_results],
+        "answer": data.get("Answer", "No direct answer available"),
+        "definition": data.get("Definition", "No definition available"),
+        "source": data.get("AbstractSource", "Unknown")
+    }
+
 def search_web(query: str, max_results: int = 5) -> Dict[str, Any]:
     """
     Perform web search using DuckDuckGo (no API key required).
     """
     try:
         # Use DuckDuckGo instant answer API
-        url = "https://api.duckduckgo.com/"
-        params = {
-            "q": query,
-            "format": "json",
-            "no_html": "1",
-            "skip_disambig": "1"
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
+        response = transport.get(SEARCH_URL, params=_search_params(query))
         response.raise_for_status()
         
-        data = response.json()
-        
-        results = {
-            "query": query,
-            "abstract": data.get("Abstract", "No abstract available"),
-            "related_topics": data.get("RelatedTopics", [])[:max_results],
-            "answer": data.get("Answer", "No direct answer available"),
-            "definition": data.get("Definition", "No definition available"),
-            "source": data.get("AbstractSource", "Unknown")
-        }
-        
-        return results
+        return _parse_search(query, response.json(), max_results)
         
     except Exception as e:
-        return {"error": f"Search failed: {str(e)}"}
+        return _upstream_error("Search failed", e)
+
+def _mock_stock(symbol: str) -> Dict[str, Any]:
+    """Mock quote data used when no Alpha Vantage API key is configured."""
+    mock_prices = {
+        "AAPL": {"price": 150.25, "change": 2.15, "change_percent": 1.45},
+        "GOOGL": {"price": 2750.80, "change": -15.20, "change_percent": -0.55},
+        "MSFT": {"price": 310.45, "change": 5.75, "change_percent": 1.89},
+        "TSLA": {"price": 245.60, "change": -8.90, "change_percent": -3.50}
+    }
+    return mock_prices.get(symbol.upper(), {"price": 100.00, "change": 0.00, "change_percent": 0.00})
+
+def _stock_params(symbol: str) -> Dict[str, Any]:
+    return {
+        "function": "GLOBAL_QUOTE",
+        "symbol": symbol.upper(),
+        "apikey": STOCK_API_KEY
+    }
+
+def _parse_stock_quote(data: Dict[str, Any]) -> Dict[str, Any]:
+    if "Note" in data or "Information" in data:
+        # Alpha Vantage reports an exhausted quota with HTTP 200 and a note
+        return {"error": f"Alpha Vantage: {data.get('Note') or data.get('Information')}", "upstream_unavailable": True}
+    quote = data.get("Global Quote", {})
+    
+    if not quote:
+        return {"error": "Stock symbol not found"}
+    
+    return {
+        "symbol": quote.get("01. symbol"),
+        "price": float(quote.get("05. price", 0)),
+        "change": float(quote.get("09. change", 0)),
+        "change_percent": quote.get("10. change percent", "0%"),
+        "volume": quote.get("06. volume"),
+        "market_cap": quote.get("07. market cap", "Unknown")
+    }
 
 def get_stock_price(symbol: str) -> Dict[str, Any]:
     """
     Get real-time stock price information using Alpha Vantage API.
+    Symbols on the price feed watchlist are answered from memory.
     """
     try:
-        if STOCK_API_KEY == "demo_key":
+        live = price_feed.lookup("stock", symbol)
+        if live is not None:
+            return live
+        
+        if _use_mock_data(STOCK_API_KEY, "ALPHA_VANTAGE_BASE_URL"):
             # Mock data for demonstration
-            mock_prices = {
-                "AAPL": {"price": 150.25, "change": 2.15, "change_percent": 1.45},
-                "GOOGL": {"price": 2750.80, "change": -15.20, "change_percent": -0.55},
-                "MSFT": {"price": 310.45, "change": 5.75, "change_percent": 1.89},
-                "TSLA": {"price": 245.60, "change": -8.90, "change_percent": -3.50}
-            }
-            return mock_prices.get(symbol.upper(), {"price": 100.00, "change": 0.00, "change_percent": 0.00})
+            return _mock_stock(symbol)
         
-        # Real API call
-        url = "https://www.alphavantage.co/query"
-        params = {
-            "function": "GLOBAL_QUOTE",
-            "symbol": symbol.upper(),
-            "apikey": STOCK_API_KEY
-        }
+        cached = quote_cache.get(symbol)
+        if cached is not None:
+            return cached
         
-        response = requests.get(url, params=params, timeout=10)
+        # Real API call
+        response = transport.get(STOCK_URL, params=_stock_params(symbol))
         response.raise_for_status()
         
-        data = response.json()
-        quote = data.get("Global Quote", {})
-        
-        if not quote:
-            return {"error": "Stock symbol not found"}
-        
-        return {
-            "symbol": quote.get("01. symbol"),
-            "price": float(quote.get("05. price", 0)),
-            "change": float(quote.get("09. change", 0)),
-            "change_percent": quote.get("10. change percent", "0%"),
-            "volume": quote.get("06. volume"),
-            "market_cap": quote.get("07. market cap", "Unknown")
-        }
+        quote = _parse_stock_quote(response.json())
+        quote_cache.put(symbol, quote)
+        return quote
         
+    except Exception as e:
+        return _upstream_error("Stock data error", e)
+
+def get_stock_prices(symbols: List[str]) -> Dict[str, Any]:
+    """
+    Get quotes for several stock symbols in one call, as a compact table.
+    Fresh quotes come from the shared quote cache and the rest are fetched
+    concurrently under the Alpha Vantage rate limit.
+    """
+    try:
+        return transport.run_sync(get_stock_prices_async(symbols))
     except Exception as e:
         return {"error": f"Stock data error: {str(e)}"}
 
+def _history_params(symbol: str, full: bool) -> Dict[str, Any]:
+    return {
+        "function": "TIME_SERIES_DAILY",
+        "symbol": symbol,
+        "outputsize": "full" if full else "compact",
+        "apikey": STOCK_API_KEY
+    }
+
+def _history_outputsize_full(symbol: str) -> bool:
+    """A compact response holds the last 100 trading days; anything older needs the full history."""
+    last = price_store.last_date(symbol)
+    return last is None or time.time() // 86400 - last > 130
+
+def _parse_daily_series(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Alpha Vantage TIME_SERIES_DAILY to store columns, or an error result."""
+    if "Note" in data or "Information" in data:
+        return {"error": f"Alpha Vantage: {data.get('Note') or data.get('Information')}", "upstream_unavailable": True}
+    series = data.get("Time Series (Daily)")
+    if not series:
+        return {"error": "Stock symbol not found"}
+    fields = np.array([[float(day[key]) for key in ("1. open", "2. high", "3. low", "4. close", "5. volume")]
+                       for day in series.values()]).T
+    return {"date": to_days(list(series)), "open": fields[0], "high": fields[1], "low": fields[2],
+            "close": fields[3], "volume": fields[4]}
+
+def _store_history(symbol: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Append a fetched series; returns an error result, or how many days were new."""
+    rows = _parse_daily_series(data)
+    if "error" in rows:
+        return rows
+    return {"new_days": price_store.append(symbol, rows)}
+
+def _mock_history(symbol: str, days: int = 500) -> Dict[str, np.ndarray]:
+    """Seeded random walk ending at the mock quote, used when no Alpha Vantage API key is configured."""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    close = np.cumprod(1 + rng.normal(0.0004, 0.018, days))
+    close *= _mock_stock(symbol)["price"] / close[-1]
+    today = np.datetime64(int(time.time() // 86400), "D")
+    dates = np.busday_offset(np.busday_offset(today, 0, roll="backward"), np.arange(-days + 1, 1))
+    spread = 1 + rng.uniform(0, 0.01, (2, days))
+    return {"date": dates.astype(np.int64), "open": np.append(close[0], close[:-1]), "high": close * spread[0],
+            "low": close / spread[1], "close": close, "volume": rng.integers(10_000, 90_000_000, days).astype(float)}
+
+def _history_report(symbol: str, columns: Dict[str, np.ndarray], window: int, source: str) -> Dict[str, Any]:
+    if len(columns["close"]) < 2:
+        return {"error": f"Not enough price history for {symbol}"}
+    start = time.perf_counter()
+    report = summarize(symbol, columns, window)
+    report.update({"source": source, "compute_ms": round((time.perf_counter() - start) * 1000, 3)})
+    return report
+
+def get_price_history(symbol: str, window: int = 90) -> Dict[str, Any]:
+    """
+    Price trend for a stock over the last `window` trading days: return, range,
+    moving averages, RSI, volatility and drawdown. Daily history is kept in a
+    local column store and only topped up when older than TIMESERIES_REFRESH.
+    """
+    try:
+        symbol = symbol.strip().upper()
+        if _use_mock_data(STOCK_API_KEY, "ALPHA_VANTAGE_BASE_URL"):
+            return _history_report(symbol, _mock_history(symbol), window, "mock data")
+        
+        source = "local store"
+        if price_store.needs_refresh(symbol):
+            try:
+                response = transport.get(STOCK_URL, params=_history_params(symbol, _history_outputsize_full(symbol)))
+                response.raise_for_status()
+                stored = _store_history(symbol, response.json())
+            except Exception as e:
+                # Rate limited, circuit open or HTTP error: the stored history still answers
+                if not price_store.length(symbol):
+                    raise
+                stored = {"error": str(e) or type(e).__name__}
+            if "error" in stored and not price_store.length(symbol):
+                return stored
+            source = (f"local store (refresh failed: {stored['error']})" if "error" in stored
+                      else f"fetched {stored['new_days']} new days")
+        
+        return _history_report(symbol, price_store.load(symbol), window, source)
+        
+    except Exception as e:
+        return _upstream_error("Price history error", e)
+
+def analyze_portfolio(holdings: Dict[str, float], window: int = Config.PORTFOLIO_WINDOW) -> Dict[str, Any]:
+    """
+    Risk and return analysis of a stock portfolio over the last `window`
+    trading days: annual return and volatility, correlation, historical
+    VaR / CVaR and each position's contribution. `holdings` maps symbols to
+    share counts (a plain list of symbols is equal-weighted). Prices come from
+    the local price history store, topping up only symbols that are due.
+    """
+    try:
+        return transport.run_sync(analyze_portfolio_async(holdings, window))
+    except Exception as e:
+        return {"error": f"Portfolio analysis error: {str(e)}"}
+
+def _mock_news(category: str) -> Dict[str, Any]:
+    """Mock headlines used when no NewsAPI key is configured."""
+    mock_news = {
+        "technology": [
+            {"title": "AI Breakthrough in Machine Learning", "description": "New algorithm shows promising results"},
+            {"title": "Quantum Computing Milestone", "description": "Researchers achieve quantum supremacy"}
+        ],
+        "business": [
+            {"title": "Market Rally Continues", "description": "Stocks reach new highs"},
+            {"title": "Tech Company Earnings Beat Expectations", "description": "Strong quarterly results reported"}
+        ]
+    }
+    return {"category": category, "articles": mock_news.get(category, [])}
+
+def _news_params(category: str, country: str) -> Dict[str, Any]:
+    return {
+        "country": country,
+        "category": category,
+        "apiKey": NEWS_API_KEY,
+        "pageSize": 10
+    }
+
+def _parse_news(category: str, country: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    articles = []
+    for article in data.get("articles", []):
+        articles.append({
+            "title": article.get("title"),
+            "description": article.get("description"),
+            "source": article.get("source", {}).get("name"),
+            "published_at": article.get("publishedAt"),
+            "url": article.get("url")
+        })
+    
+    return {
+        "category": category,
+        "country": country,
+        "total_results": data.get("totalResults", 0),
+        "articles": articles
+    }
+
 def get_news_headlines(category: str = "general", country: str = "us") -> Dict[str, Any]:
     """
     Get latest news headlines using NewsAPI.
     """
     try:
-        if NEWS_API_KEY == "demo_key":
+        if _use_mock_data(NEWS_API_KEY, "NEWS_API_BASE_URL"):
             # Mock news data
-            mock_news = {
-                "technology": [
-                    {"title": "AI Breakthrough in Machine Learning", "description": "New algorithm shows promising results"},
-                    {"title": "Quantum Computing Milestone", "description": "Researchers achieve quantum supremacy"}
-                ],
-                "business": [
-                    {"title": "Market Rally Continues", "description": "Stocks reach new highs"},
-                    {"title": "Tech Company Earnings Beat Expectations", "description": "Strong quarterly results reported"}
-                ]
-            }
-            return {"category": category, "articles": mock_news.get(category, [])}
+            return _mock_news(category)
         
         # Real API call
-        url = "https://newsapi.org/v2/top-headlines"
-        params = {
-            "country": country,
-            "category": category,
-            "apiKey": NEWS_API_KEY,
-            "pageSize": 10
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
+        response = transport.get(NEWS_URL, params=_news_params(category, country))
         response.raise_for_status()
         
-        data = response.json()
-        
-        articles = []
-        for article in data.get("articles", []):
-            articles.append({
-                "title": article.get("title"),
-                "description": article.get("description"),
-                "source": article.get("source", {}).get("name"),
-                "published_at": article.get("publishedAt"),
-                "url": article.get("url")
-            })
-        
-        return {
-            "category": category,
-            "country": country,
-            "total_results": data.get("totalResults", 0),
-            "articles": articles
-        }
+        return _parse_news(category, country, response.json())
         
     except Exception as e:
-        return {"error": f"News error: {str(e)}"}
+        return _upstream_error("News error", e)
 
 def analyze_text_sentiment(text: str) -> Dict[str, Any]:
     """
@@ -332,57 +551,70 @@ def analyze_text_sentiment(text: str) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Sentiment analysis error: {str(e)}"}
 
+def _website_result(url: str, status_code: int, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the get_website_info result from a StreamingPageAnalyzer result."""
+    result = {
+        "url": url,
+        "title": analysis["title"],
+        "description": analysis["description"],
+        "status_code": status_code,
+        "content_length": analysis["content_length"],
+        "word_count": analysis["word_count"],
+        "headings": analysis["headings"],
+        "images": analysis["images"],
+        "links": analysis["links"],
+        "language": analysis["language"],
+        "charset": analysis["charset"]
+    }
+    if analysis.get("truncated"):
+        result["truncated"] = True
+    return result
+
 def get_website_info(url: str) -> Dict[str, Any]:
     """
     Get comprehensive website information including metadata and content analysis.
+    The page is parsed while it downloads and reading stops at MAX_WEBSITE_SIZE.
     """
     try:
         # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        
-        response = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0'})
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract metadata
-        title = soup.find('title')
-        title_text = title.get_text() if title else "No title found"
-        
-        meta_description = soup.find('meta', attrs={'name': 'description'})
-        description = meta_description.get('content') if meta_description else "No description found"
+        url = _normalize_url(url)
         
-        # Count elements
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-        images = soup.find_all('img')
-        links = soup.find_all('a')
-        
-        # Extract text content
-        text_content = soup.get_text()
-        word_count = len(text_content.split())
-        
-        return {
-            "url": url,
-            "title": title_text.strip(),
-            "description": description.strip(),
-            "status_code": response.status_code,
-            "content_length": len(response.content),
-            "word_count": word_count,
-            "headings": {
-                "h1": len(soup.find_all('h1')),
-                "h2": len(soup.find_all('h2')),
-                "h3": len(soup.find_all('h3')),
-                "total": len(headings)
-            },
-            "images": len(images),
-            "links": len(links),
-            "language": soup.get('lang', 'Unknown'),
-            "charset": response.encoding
-        }
+        with transport.cached_stream(url, headers=BROWSER_HEADERS) as response:
+            response.raise_for_status()
+            analyzer = StreamingPageAnalyzer(response.headers.get("Content-Type"))
+            for chunk in response:
+                if not analyzer.feed(chunk):
+                    break
+            return _website_result(url, response.status_code, analyzer.close())
         
     except Exception as e:
-        return {"error": f"Website analysis error: {str(e)}"}
+        return _upstream_error("Website analysis error", e)
+
+def get_page_weight(url: str) -> Dict[str, Any]:
+    """
+    Measure what a page costs to load: its images, scripts and stylesheets are
+    sized concurrently and summarized as total bytes, bytes per type, the
+    largest assets and the slow ones.
+    """
+    try:
+        return transport.run_sync(measure_page(_normalize_url(url)))
+    except Exception as e:
+        return _upstream_error("Page weight error", e)
+
+def _crawl_bounds(max_pages, max_depth):
+    """Clamp crawl_site arguments to CRAWL_PAGE_LIMIT and a sane depth."""
+    return max(1, min(int(max_pages), Config.CRAWL_PAGE_LIMIT)), max(0, int(max_depth))
+
+def crawl_site(url: str, max_pages: int = Config.CRAWL_MAX_PAGES, max_depth: int = Config.CRAWL_MAX_DEPTH) -> Dict[str, Any]:
+    """
+    Crawl a website breadth-first from url (same site only, robots.txt respected)
+    and return one aggregated SEO report: status codes, broken links, missing
+    titles / descriptions / H1s, duplicate titles, thin content and slow pages.
+    """
+    try:
+        return transport.run_sync(crawl(url, *_crawl_bounds(max_pages, max_depth)))
+    except Exception as e:
+        return {"error": f"Site crawl failed: {str(e)}"}
 
 def perform_data_analysis(data_input: str) -> Dict[str, Any]:
     """
@@ -477,31 +709,104 @@ def translate_text(text: str, target_language: str = "es") -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Translation error: {str(e)}"}
 
+# Ticker -> CoinGecko coin id (other tickers are tried as lower-case ids)
+COINGECKO_IDS = {
+    "BTC": "bitcoin", "ETH": "ethereum", "ADA": "cardano", "DOT": "polkadot", "SOL": "solana",
+    "XRP": "ripple", "DOGE": "dogecoin", "LTC": "litecoin", "BNB": "binancecoin", "AVAX": "avalanche-2",
+    "LINK": "chainlink", "MATIC": "matic-network", "USDT": "tether", "USDC": "usd-coin"
+}
+
+def _mock_crypto(symbol: str) -> Dict[str, Any]:
+    """Mock crypto data used when no CoinGecko API key is configured."""
+    crypto_prices = {
+        "BTC": {"price": 45000, "change_24h": 2.5, "market_cap": "850B", "volume": "25B"},
+        "ETH": {"price": 3200, "change_24h": -1.2, "market_cap": "380B", "volume": "15B"},
+        "ADA": {"price": 1.25, "change_24h": 5.8, "market_cap": "40B", "volume": "2B"},
+        "DOT": {"price": 18.50, "change_24h": -0.8, "market_cap": "18B", "volume": "800M"}
+    }
+    symbol_upper = symbol.upper()
+    if symbol_upper not in crypto_prices:
+        return {"error": f"Cryptocurrency {symbol} not found"}
+    return {
+        "symbol": symbol_upper,
+        **crypto_prices[symbol_upper],
+        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+def _crypto_params(symbols: List[str]) -> Dict[str, Any]:
+    return {
+        "ids": ",".join(COINGECKO_IDS.get(symbol.upper(), symbol.lower()) for symbol in symbols),
+        "vs_currencies": "usd",
+        "include_market_cap": "true",
+        "include_24hr_vol": "true",
+        "include_24hr_change": "true"
+    }
+
+def _crypto_headers() -> Optional[Dict[str, str]]:
+    return {"x-cg-demo-api-key": CRYPTO_API_KEY} if CRYPTO_API_KEY != "demo_key" else None
+
+def _compact_amount(value: Optional[float]) -> str:
+    """850000000000 -> "850B", matching the mock data."""
+    if value is None:
+        return "Unknown"
+    for divisor, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if value >= divisor:
+            return f"{value / divisor:.3g}{suffix}"
+    return f"{value:.0f}"
+
+def _parse_crypto(symbols: List[str], data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """CoinGecko /simple/price for several coins to one result per ticker."""
+    quotes = {}
+    for symbol in symbols:
+        coin = data.get(COINGECKO_IDS.get(symbol.upper(), symbol.lower()))
+        if not coin or "usd" not in coin:
+            quotes[symbol.upper()] = {"error": f"Cryptocurrency {symbol} not found"}
+            continue
+        quotes[symbol.upper()] = {
+            "symbol": symbol.upper(),
+            "price": coin["usd"],
+            "change_24h": round(coin.get("usd_24h_change") or 0.0, 2),
+            "market_cap": _compact_amount(coin.get("usd_market_cap")),
+            "volume": _compact_amount(coin.get("usd_24h_vol")),
+            "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+    return quotes
+
 def get_crypto_price(symbol: str = "BTC") -> Dict[str, Any]:
     """
-    Get cryptocurrency price information.
+    Get cryptocurrency price information from CoinGecko.
+    Symbols on the price feed watchlist are answered from memory.
     """
     try:
-        # Mock crypto data (replace with real API like CoinGecko)
-        crypto_prices = {
-            "BTC": {"price": 45000, "change_24h": 2.5, "market_cap": "850B", "volume": "25B"},
-            "ETH": {"price": 3200, "change_24h": -1.2, "market_cap": "380B", "volume": "15B"},
-            "ADA": {"price": 1.25, "change_24h": 5.8, "market_cap": "40B", "volume": "2B"},
-            "DOT": {"price": 18.50, "change_24h": -0.8, "market_cap": "18B", "volume": "800M"}
-        }
+        live = price_feed.lookup("crypto", symbol)
+        if live is not None:
+            return live
         
-        symbol_upper = symbol.upper()
-        if symbol_upper in crypto_prices:
-            return {
-                "symbol": symbol_upper,
-                **crypto_prices[symbol_upper],
-                "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        else:
-            return {"error": f"Cryptocurrency {symbol} not found"}
+        if _use_mock_data(CRYPTO_API_KEY, "COINGECKO_BASE_URL"):
+            return _mock_crypto(symbol)
+        
+        response = transport.get(CRYPTO_URL, params=_crypto_params([symbol]), headers=_crypto_headers())
+        response.raise_for_status()
+        
+        return _parse_crypto([symbol], response.json())[symbol.upper()]
             
     except Exception as e:
-        return {"error": f"Crypto price error: {str(e)}"}
+        return _upstream_error("Crypto price error", e)
+
+def _parse_github(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": data.get("name"),
+        "full_name": data.get("full_name"),
+        "description": data.get("description"),
+        "language": data.get("language"),
+        "stars": data.get("stargazers_count"),
+        "forks": data.get("forks_count"),
+        "open_issues": data.get("open_issues_count"),
+        "size": data.get("size"),
+        "created_at": data.get("created_at"),
+        "updated_at": data.get("updated_at"),
+        "url": data.get("html_url")
+    }
 
 def get_github_repo_info(repo_name: str) -> Dict[str, Any]:
     """
@@ -509,26 +814,348 @@ def get_github_repo_info(repo_name: str) -> Dict[str, Any]:
     """
     try:
         # GitHub API (no authentication required for public repos)
-        url = f"https://api.github.com/repos/{repo_name}"
+        url = f"{GITHUB_API_URL}/repos/{repo_name}"
         
-        response = requests.get(url, timeout=10)
+        response = transport.get(url)
         response.raise_for_status()
         
-        data = response.json()
+        return _parse_github(response.json())
         
-        return {
-            "name": data.get("name"),
-            "full_name": data.get("full_name"),
-            "description": data.get("description"),
-            "language": data.get("language"),
-            "stars": data.get("stargazers_count"),
-            "forks": data.get("forks_count"),
-            "open_issues": data.get("open_issues_count"),
-            "size": data.get("size"),
-            "created_at": data.get("created_at"),
-            "updated_at": data.get("updated_at"),
-            "url": data.get("html_url")
-        }
+    except Exception as e:
+        return _upstream_error("GitHub API error", e)
+
+# Async variants of the network actions.
+# These share the request/parse helpers above, so results are identical to the
+# blocking versions, but they await the shared aiohttp pool instead of blocking the thread.
+
+# Buffered async response type, kept under its original name
+AsyncFetchResult = FetchResult
+
+async def get_response_time_async(url: str) -> Dict[str, Any]:
+    """
+    Async variant of get_response_time.
+    """
+    try:
+        start_time = time.time()
+        url = _normalize_url(url)
+        async with aiohttp.ClientSession(headers={"User-Agent": transport.user_agent},
+                                         timeout=aiohttp.ClientTimeout(total=transport.timeout)) as session:
+            async with session.get(url) as response:
+                content = await response.read()
+                result = FetchResult(response.status, response.headers, content, str(response.url), None)
+        end_time = time.time()
+        
+        return _response_time_metrics(result, end_time - start_time)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        return {"error": str(e) or type(e).__name__, "response_time": None}
+
+async def get_response_times_async(urls: List[str], samples: int = Config.PROBE_SAMPLES) -> Dict[str, Any]:
+    """
+    Async variant of get_response_times.
+    """
+    try:
+        targets = _probe_targets(urls)
+        if not targets:
+            return {"error": "No URLs given"}
+        return _response_times_report(await probe_all(targets, int(samples)))
+    except Exception as e:
+        return {"error": f"Latency probe failed: {str(e)}"}
+
+async def get_weather_info_async(city: str) -> Dict[str, Any]:
+    """
+    Async variant of get_weather_info.
+    """
+    try:
+        if _use_mock_data(WEATHER_API_KEY, "OPENWEATHER_BASE_URL"):
+            return _mock_weather(city)
+        
+        response = await transport.get_async(WEATHER_URL, params=_weather_params(city))
+        response.raise_for_status()
+        
+        return _parse_weather(response.json())
+        
+    except Exception as e:
+        return _upstream_error("Failed to get weather data", e)
+
+async def search_web_async(query: str, max_results: int = 5) -> Dict[str, Any]:
+    """
+    Async variant of search_web.
+    """
+    try:
+        response = await transport.get_async(SEARCH_URL, params=_search_params(query))
+        response.raise_for_status()
+        
+        return _parse_search(query, response.json(), max_results)
+        
+    except Exception as e:
+        return _upstream_error("Search failed", e)
+
+async def get_stock_price_async(symbol: str) -> Dict[str, Any]:
+    """
+    Async variant of get_stock_price.
+    """
+    try:
+        live = price_feed.lookup("stock", symbol)
+        if live is not None:
+            return live
+        
+        if _use_mock_data(STOCK_API_KEY, "ALPHA_VANTAGE_BASE_URL"):
+            return _mock_stock(symbol)
+        
+        cached = quote_cache.get(symbol)
+        if cached is not None:
+            return cached
+        
+        return await _fetch_quote_async(symbol)
+        
+    except Exception as e:
+        return _upstream_error("Stock data error", e)
+
+async def _fetch_quote_async(symbol: str, cache: bool = True) -> Dict[str, Any]:
+    """Fetch one quote into the shared quote cache."""
+    try:
+        response = await transport.get_async(STOCK_URL, params=_stock_params(symbol), cache=cache)
+        response.raise_for_status()
+        quote = _parse_stock_quote(response.json())
+    except Exception as e:
+        return _upstream_error("Stock data error", e)
+    quote_cache.put(symbol, quote)
+    return quote
+
+async def get_stock_prices_async(symbols: List[str]) -> Dict[str, Any]:
+    """
+    Async variant of get_stock_prices.
+    """
+    try:
+        tickers = parse_symbols(symbols)[:Config.QUOTE_MAX_SYMBOLS]
+        if not tickers:
+            return {"error": "No symbols given"}
+        if _use_mock_data(STOCK_API_KEY, "ALPHA_VANTAGE_BASE_URL"):
+            return quote_table({symbol: _mock_stock(symbol) for symbol in tickers})
+        return quote_table(await quote_cache.get_many(tickers, _fetch_quote_async))
+    except Exception as e:
+        return {"error": f"Stock data error: {str(e)}"}
+
+async def get_price_history_async(symbol: str, window: int = 90) -> Dict[str, Any]:
+    """
+    Async variant of get_price_history.
+    """
+    try:
+        symbol = symbol.strip().upper()
+        if _use_mock_data(STOCK_API_KEY, "ALPHA_VANTAGE_BASE_URL"):
+            return _history_report(symbol, _mock_history(symbol), window, "mock data")
+        
+        source = "local store"
+        if price_store.needs_refresh(symbol):
+            try:
+                response = await transport.get_async(STOCK_URL, params=_history_params(symbol, _history_outputsize_full(symbol)))
+                response.raise_for_status()
+                stored = _store_history(symbol, response.json())
+            except Exception as e:
+                # Rate limited, circuit open or HTTP error: the stored history still answers
+                if not price_store.length(symbol):
+                    raise
+                stored = {"error": str(e) or type(e).__name__}
+            if "error" in stored and not price_store.length(symbol):
+                return stored
+            source = (f"local store (refresh failed: {stored['error']})" if "error" in stored
+                      else f"fetched {stored['new_days']} new days")
+        
+        return _history_report(symbol, price_store.load(symbol), window, source)
         
     except Exception as e:
-        return {"error": f"GitHub API error: {str(e)}"}
+        return _upstream_error("Price history error", e)
+
+async def _load_history_async(symbol: str) -> Dict[str, Any]:
+    """Stored columns for symbol, topped up first when due; an error result when there is no history."""
+    # Store reads and appends touch memmapped files, so they run off the event loop
+    if await asyncio.to_thread(price_store.needs_refresh, symbol):
+        try:
+            outputsize = await asyncio.to_thread(_history_outputsize_full, symbol)
+            response = await transport.get_async(STOCK_URL, params=_history_params(symbol, outputsize))
+            response.raise_for_status()
+            stored = await asyncio.to_thread(_store_history, symbol, response.json())
+        except Exception:
+            if not price_store.length(symbol):
+                raise
+            stored = {}
+        if "error" in stored and not price_store.length(symbol):
+            return stored
+    return await asyncio.to_thread(price_store.load, symbol)
+
+async def analyze_portfolio_async(holdings: Dict[str, float], window: int = Config.PORTFOLIO_WINDOW) -> Dict[str, Any]:
+    """
+    Async variant of analyze_portfolio.
+    """
+    try:
+        positions = parse_holdings(holdings)
+        if not positions:
+            return {"error": "No holdings given"}
+        if len(positions) > Config.PORTFOLIO_MAX_SYMBOLS:
+            return {"error": f"At most {Config.PORTFOLIO_MAX_SYMBOLS} holdings per analysis"}
+        
+        if _use_mock_data(STOCK_API_KEY, "ALPHA_VANTAGE_BASE_URL"):
+            loaded = await asyncio.to_thread(lambda: [_mock_history(symbol) for symbol in positions])
+        else:
+            loaded = await asyncio.gather(*(_load_history_async(symbol) for symbol in positions), return_exceptions=True)
+        
+        series, missing = {}, {}
+        for symbol, columns in zip(positions, loaded):
+            if isinstance(columns, BaseException):
+                missing[symbol] = str(columns) or type(columns).__name__
+            elif "error" in columns:
+                missing[symbol] = columns["error"]
+            elif len(columns["close"]) < 2:
+                missing[symbol] = "Not enough price history"
+            else:
+                series[symbol] = columns
+        if not series:
+            return {"error": "No price history for any holding", "missing": missing}
+        
+        start = time.perf_counter()
+        report = await asyncio.to_thread(analyze, {symbol: positions[symbol] for symbol in series}, series, window)
+        report["compute_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        if missing:
+            report["missing"] = missing
+        return report
+        
+    except Exception as e:
+        return {"error": f"Portfolio analysis error: {str(e)}"}
+
+async def get_crypto_price_async(symbol: str = "BTC") -> Dict[str, Any]:
+    """
+    Async variant of get_crypto_price.
+    """
+    try:
+        live = price_feed.lookup("crypto", symbol)
+        if live is not None:
+            return live
+        
+        if _use_mock_data(CRYPTO_API_KEY, "COINGECKO_BASE_URL"):
+            return _mock_crypto(symbol)
+        
+        response = await transport.get_async(CRYPTO_URL, params=_crypto_params([symbol]), headers=_crypto_headers())
+        response.raise_for_status()
+        
+        return _parse_crypto([symbol], response.json())[symbol.upper()]
+        
+    except Exception as e:
+        return _upstream_error("Crypto price error", e)
+
+async def get_news_headlines_async(category: str = "general", country: str = "us") -> Dict[str, Any]:
+    """
+    Async variant of get_news_headlines.
+    """
+    try:
+        if _use_mock_data(NEWS_API_KEY, "NEWS_API_BASE_URL"):
+            return _mock_news(category)
+        
+        response = await transport.get_async(NEWS_URL, params=_news_params(category, country))
+        response.raise_for_status()
+        
+        return _parse_news(category, country, response.json())
+        
+    except Exception as e:
+        return _upstream_error("News error", e)
+
+async def get_website_info_async(url: str) -> Dict[str, Any]:
+    """
+    Async variant of get_website_info.
+    """
+    try:
+        url = _normalize_url(url)
+        
+        async with transport.cached_stream_async(url, headers=BROWSER_HEADERS) as response:
+            response.raise_for_status()
+            analyzer = StreamingPageAnalyzer(response.headers.get("Content-Type"))
+            async for chunk in response:
+                # HTML parsing is CPU-bound, keep it off the event loop
+                if not await asyncio.to_thread(analyzer.feed, chunk):
+                    break
+            return _website_result(url, response.status_code, await asyncio.to_thread(analyzer.close))
+        
+    except Exception as e:
+        return _upstream_error("Website analysis error", e)
+
+async def get_page_weight_async(url: str) -> Dict[str, Any]:
+    """
+    Async variant of get_page_weight.
+    """
+    try:
+        return await measure_page(_normalize_url(url))
+    except Exception as e:
+        return _upstream_error("Page weight error", e)
+
+async def crawl_site_async(url: str, max_pages: int = Config.CRAWL_MAX_PAGES,
+                           max_depth: int = Config.CRAWL_MAX_DEPTH) -> Dict[str, Any]:
+    """
+    Async variant of crawl_site.
+    """
+    try:
+        return await crawl(url, *_crawl_bounds(max_pages, max_depth))
+    except Exception as e:
+        return {"error": f"Site crawl failed: {str(e)}"}
+
+async def get_github_repo_info_async(repo_name: str) -> Dict[str, Any]:
+    """
+    Async variant of get_github_repo_info.
+    """
+    try:
+        url = f"{GITHUB_API_URL}/repos/{repo_name}"
+        
+        response = await transport.get_async(url)
+        response.raise_for_status()
+        
+        return _parse_github(response.json())
+        
+    except Exception as e:
+        return _upstream_error("GitHub API error", e)
+
+async def _feed_crypto(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Price feed poll: all watched coins in one CoinGecko call."""
+    if _use_mock_data(CRYPTO_API_KEY, "COINGECKO_BASE_URL"):
+        return {symbol: _mock_crypto(symbol) for symbol in symbols}
+    response = await transport.get_async(CRYPTO_URL, params=_crypto_params(symbols), headers=_crypto_headers(), cache=False)
+    response.raise_for_status()
+    return _parse_crypto(symbols, response.json())
+
+async def _feed_stocks(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Price feed poll: fresh quotes for the watched stocks, which also refresh the shared quote cache."""
+    if _use_mock_data(STOCK_API_KEY, "ALPHA_VANTAGE_BASE_URL"):
+        return {symbol: _mock_stock(symbol) for symbol in symbols}
+    # Not read through the quote cache: its quotes can be QUOTE_FRESHNESS seconds
+    # old, and the feed stamps every sample with the poll time
+    quotes = await asyncio.gather(*(_fetch_quote_async(symbol, cache=False) for symbol in symbols))
+    return dict(zip(symbols, quotes))
+
+# Background watchlist poller; started by main.py, main_ollama.py and server.py
+# when PRICE_FEED_ENABLED is set
+price_feed = PriceFeed(_feed_crypto, _feed_stocks)
+
+# Offline answers for actions whose upstream is unavailable, used by the
+# action dispatcher when no stale cached result exists either.
+fallback_actions = {
+    "get_weather_info": _mock_weather,
+    "get_stock_price": _mock_stock,
+    "get_crypto_price": _mock_crypto,
+    "get_news_headlines": lambda category="general", country="us": _mock_news(category)
+}
+
+# Async action lookup used by run_ai_agent_async. Actions without an entry here
+# are CPU-only and are run in a worker thread instead.
+async_available_actions = {
+    "get_response_time": get_response_time_async,
+    "get_response_times": get_response_times_async,
+    "get_weather_info": get_weather_info_async,
+    "search_web": search_web_async,
+    "get_stock_price": get_stock_price_async,
+    "get_stock_prices": get_stock_prices_async,
+    "get_price_history": get_price_history_async,
+    "analyze_portfolio": analyze_portfolio_async,
+    "get_crypto_price": get_crypto_price_async,
+    "get_news_headlines": get_news_headlines_async,
+    "get_website_info": get_website_info_async,
+    "get_page_weight": get_page_weight_async,
+    "crawl_site": crawl_site_async,
+    "get_github_repo_info": get_github_repo_info_async
+}
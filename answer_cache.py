@@ -0,0 +1,235 @@
+"""
+Offline near-duplicate answer cache.
+Questions are normalized and embedded as hashed TF-IDF vectors in NumPy, so a
+rephrased question ("What is the stock price of Apple?" / "Apple stock price now") can reuse a
+stored final answer without running the agent loop. Runs fully offline.
+"""
+
+import hashlib
+import math
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from cache import ACTION_TTLS
+from config import Config
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "be", "at", "of", "for", "to", "in", "on", "and", "or",
+    "what", "whats", "how", "much", "many", "me", "my", "i", "you", "can", "could", "would", "please",
+    "tell", "show", "give", "get", "does", "do", "it", "its", "this", "that", "right", "now",
+    "currently", "current", "today", "latest", "like", "there", "any", "some", "about"
+}
+
+# Common names the agents see, mapped to the identifiers the tools use
+ALIASES = {
+    "apple": "aapl", "google": "googl", "alphabet": "googl", "microsoft": "msft", "tesla": "tsla",
+    "bitcoin": "btc", "ethereum": "eth", "ether": "eth", "cardano": "ada", "polkadot": "dot"
+}
+
+# Words that mean the same thing to the tools
+SYNONYMS = {
+    "quote": "price", "trading": "price", "worth": "price", "cost": "price", "value": "price",
+    "shares": "stock", "share": "stock", "ticker": "stock", "forecast": "weather", "temperature": "weather",
+    "headlines": "news", "fast": "speed", "speed": "speed", "quick": "speed", "slow": "speed"
+}
+
+# Intent words shared across questions about different subjects. Every other
+# content word (cities, tickers, domains, numbers, search terms) is an entity.
+INTENT_WORDS = set(SYNONYMS.values()) | {
+    "stock", "price", "change", "market", "crypto", "cryptocurrency", "weather", "news", "business",
+    "technology", "sports", "health", "science", "entertainment", "general", "speed", "seo", "good",
+    "enough", "website", "site", "info", "information", "performance", "response", "analyze", "analysis",
+    "calculate", "time", "search", "web", "data", "sentiment", "translate", "translation", "repo",
+    "repository", "github", "details", "check", "status"
+}
+
+# Tools whose results are only valid at the moment they ran
+VOLATILE_TOOLS = {"get_current_time", "get_response_time", "get_response_times"}
+
+# Tools whose answers hinge on details a near-duplicate match can miss
+# (an operator, operand order), so they are never answered from the cache
+EXACT_TOOLS = {"calculate_math_expression"}
+
+# Kept as tokens of their own, so "3+2" and "3*2" have different entities
+OPERATORS = set("+-*/^%=<>()")
+
+def normalize_question(question: str) -> List[str]:
+    """Lowercase, strip punctuation, map aliases/synonyms and drop stopwords; operators are kept."""
+    text = question.lower().replace("'s", "s").replace("’s", "s")
+    text = re.sub(r"[^a-z0-9.\-/+*^%=<>() ]+", " ", text)
+    text = re.sub(r"([+*^%=<>()])", r" \1 ", text)
+    tokens = []
+    for word in text.split():
+        if word in OPERATORS:
+            tokens.append(word)
+            continue
+        word = word.strip(".-/")
+        if not word or word in STOPWORDS:
+            continue
+        word = ALIASES.get(word, word)
+        word = SYNONYMS.get(word, word)
+        tokens.append(word)
+    return tokens
+
+def entity_signature(tokens: Iterable[str]) -> tuple:
+    """
+    Tokens that must match exactly, in order and with repeats, for two
+    questions to share an answer, so "weather in London" never answers
+    "weather in Paris" and "2+3" never answers "3+2".
+    """
+    return tuple(token for token in tokens if token not in INTENT_WORDS)
+
+class _ScopeIndex:
+    """Vectors and answers for one system prompt."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.doc_freq = np.zeros(dim, dtype=np.float32)
+        self.entries: List[Dict[str, Any]] = []
+
+    def add(self, vector: np.ndarray, entry: Dict[str, Any]):
+        if len(self.entries) == len(self.vectors):
+            self.vectors = np.vstack([self.vectors, np.zeros_like(self.vectors)])
+        self.vectors[len(self.entries)] = vector
+        self.doc_freq += vector > 0
+        self.entries.append(entry)
+
+    def remove(self, keep: np.ndarray):
+        count = len(self.entries)
+        removed = self.vectors[:count][~keep]
+        self.doc_freq -= (removed > 0).sum(axis=0)
+        kept = self.vectors[:count][keep]
+        self.vectors = np.zeros((max(16, len(kept) * 2), self.vectors.shape[1]), dtype=np.float32)
+        self.vectors[:len(kept)] = kept
+        self.entries = [entry for entry, k in zip(self.entries, keep) if k]
+
+class AnswerCache:
+    """
+    Semantic cache of final answers, scoped per system prompt. Each answer
+    expires with the shortest TTL of the tools it used; answers that relied
+    on volatile tools (current time, live response times) or on the
+    calculator are not stored.
+    Disabled unless ANSWER_CACHE_ENABLED is set (opt-in).
+    """
+
+    def __init__(self, threshold: float = Config.ANSWER_CACHE_THRESHOLD, max_entries: int = Config.ANSWER_CACHE_MAX_ENTRIES,
+                 default_ttl: float = Config.ANSWER_CACHE_TTL, dim: int = 2048, enabled: bool = Config.ANSWER_CACHE_ENABLED):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.dim = dim
+        self.enabled = enabled
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _vectorize(self, tokens: List[str]) -> np.ndarray:
+        """Hashed word and character-trigram counts with sublinear TF."""
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            features = [f"w:{token}"] + [f"c:{padded[i:i + 3]}" for padded in [f"#{token}#"] for i in range(len(padded) - 2)]
+            for feature in features:
+                index = zlib.crc32(feature.encode("utf-8")) % self.dim
+                counts[index] = counts.get(index, 0) + 1
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for index, count in counts.items():
+            vector[index] = 1.0 + math.log(count)
+        return vector
+
+    @staticmethod
+    def _scope_key(system_prompt: str) -> str:
+        return hashlib.sha1(system_prompt.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, tools_used: Iterable[str]) -> float:
+        """Shortest lifetime of the tools an answer depended on (0 = do not cache)."""
+        ttls = [0 if tool in VOLATILE_TOOLS or tool in EXACT_TOOLS else ACTION_TTLS.get(tool, self.default_ttl)
+                for tool in tools_used]
+        return min(ttls, default=self.default_ttl)
+
+    def lookup(self, question: str, system_prompt: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        tokens = normalize_question(question)
+        if not tokens:
+            return None
+        signature = entity_signature(tokens)
+        query = self._vectorize(tokens)
+
+        with self._lock:
+            index = self._scopes.get(self._scope_key(system_prompt))
+            if index is None or not index.entries:
+                self.misses += 1
+                return None
+
+            count = len(index.entries)
+            now = time.time()
+            expires = np.fromiter((e["expires_at"] for e in index.entries), dtype=np.float64, count=count)
+            if (expires < now).any():
+                index.remove(expires >= now)
+                count = len(index.entries)
+                if not count:
+                    self.misses += 1
+                    return None
+
+            # TF-IDF cosine similarity of the query against every stored question at once
+            idf = np.log((1.0 + count) / (1.0 + index.doc_freq)) + 1.0
+            matrix = index.vectors[:count] * idf
+            weighted_query = query * idf
+            norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(weighted_query)
+            scores = (matrix @ weighted_query) / np.maximum(norms, 1e-12)
+            same_entities = np.fromiter((e["signature"] == signature for e in index.entries), dtype=bool, count=count)
+            scores[~same_entities] = -1.0
+
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return index.entries[best]["answer"]
+
+    def store(self, question: str, system_prompt: str, answer: str, tools_used: Iterable[str] = ()):
+        if not self.enabled or not answer or answer.startswith("Error:"):
+            return
+        ttl = self.ttl_for(tools_used)
+        tokens = normalize_question(question)
+        if ttl <= 0 or not tokens:
+            return
+
+        entry = {
+            "question": question,
+            "answer": answer,
+            "signature": entity_signature(tokens),
+            "expires_at": time.time() + ttl
+        }
+        with self._lock:
+            index = self._scopes.setdefault(self._scope_key(system_prompt), _ScopeIndex(self.dim))
+            if len(index.entries) >= self.max_entries:
+                # Drop the oldest entry
+                keep = np.ones(len(index.entries), dtype=bool)
+                keep[0] = False
+                index.remove(keep)
+            index.add(self._vectorize(tokens), entry)
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": sum(len(index.entries) for index in self._scopes.values()),
+            "scopes": len(self._scopes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+# Shared cache used by run_ai_agent in main.py and main_ollama.py
+answer_cache = AnswerCache()
@@ -0,0 +1,309 @@
+"""
+In-process result caching for agent actions.
+Provides a thread-safe TTL cache with pluggable eviction and the per-tool
+ActionCache that sits in front of the available_actions dispatch.
+"""
+
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from config import Config
+from singleflight import AsyncSingleFlight, SingleFlight
+
+class LRUEviction:
+    """Evict the least recently used key."""
+
+    def __init__(self):
+        self._order = OrderedDict()
+
+    def on_insert(self, key: Hashable):
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def on_access(self, key: Hashable):
+        self._order.move_to_end(key)
+
+    def on_remove(self, key: Hashable):
+        self._order.pop(key, None)
+
+    def victim(self) -> Hashable:
+        return next(iter(self._order))
+
+class LFUEviction:
+    """Evict the least frequently used key (oldest first among ties)."""
+
+    def __init__(self):
+        self._counts = OrderedDict()
+
+    def on_insert(self, key: Hashable):
+        self._counts[key] = 1
+
+    def on_access(self, key: Hashable):
+        self._counts[key] += 1
+
+    def on_remove(self, key: Hashable):
+        self._counts.pop(key, None)
+
+    def victim(self) -> Hashable:
+        return min(self._counts, key=self._counts.get)
+
+class FIFOEviction(LRUEviction):
+    """Evict the oldest inserted key, ignoring reads."""
+
+    def on_access(self, key: Hashable):
+        pass
+
+EVICTION_POLICIES = {
+    "lru": LRUEviction,
+    "lfu": LFUEviction,
+    "fifo": FIFOEviction
+}
+
+MISS = object()
+
+class TTLCache:
+    """
+    Thread-safe size-bounded cache whose entries expire after a per-entry TTL.
+    The eviction policy is any object with on_insert/on_access/on_remove/victim,
+    or one of the names in EVICTION_POLICIES.
+    """
+
+    def __init__(self, max_size: int = 1024, eviction="lru"):
+        self.max_size = max_size
+        self._policy = EVICTION_POLICIES[eviction]() if isinstance(eviction, str) else eviction
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Any:
+        """
+        Return the cached value, or MISS. Expired entries are kept until evicted,
+        and allow_stale returns them without counting, for callers that prefer
+        stale data to none.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if not allow_stale:
+                    self.misses += 1
+                return MISS
+            expires_at, value = entry
+            if allow_stale:
+                return value
+            if expires_at < time.monotonic():
+                self.expired += 1
+                self.misses += 1
+                return MISS
+            self._policy.on_access(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        with self._lock:
+            if key in self._entries:
+                self._policy.on_access(key)
+            else:
+                while len(self._entries) >= self.max_size:
+                    self._remove(self._policy.victim())
+                    self.evictions += 1
+                self._policy.on_insert(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def _remove(self, key: Hashable):
+        del self._entries[key]
+        self._policy.on_remove(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+# Cache lifetime in seconds per action. Actions not listed here (local
+# computation, the current time, response time measurements) are never cached.
+ACTION_TTLS = {
+    "get_weather_info": Config.WEATHER_CACHE_TTL,
+    "get_stock_price": Config.STOCK_CACHE_TTL,
+    "get_stock_prices": Config.STOCK_CACHE_TTL,
+    "get_price_history": Config.STOCK_CACHE_TTL,
+    "analyze_portfolio": Config.STOCK_CACHE_TTL,
+    "get_crypto_price": Config.CRYPTO_UPDATE_INTERVAL,
+    "get_news_headlines": Config.NEWS_CACHE_TTL,
+    "search_web": Config.SEARCH_CACHE_TTL,
+    "get_github_repo_info": Config.GITHUB_CACHE_TTL,
+    "get_website_info": Config.WEBSITE_CACHE_TTL,
+    "get_page_weight": Config.WEBSITE_CACHE_TTL,
+    "crawl_site": Config.WEBSITE_CACHE_TTL
+}
+
+# Actions whose string parameters are case-insensitive (cities, tickers, repos)
+CASE_INSENSITIVE_ACTIONS = {
+    "get_weather_info",
+    "get_stock_price",
+    "get_stock_prices",
+    "get_price_history",
+    "analyze_portfolio",
+    "get_crypto_price",
+    "get_news_headlines",
+    "get_github_repo_info"
+}
+
+def make_action_key(function_name: str, function_params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Build a cache key from an action call with normalized parameters, so
+    " London" and "london" share an entry for case-insensitive actions.
+    Strings inside lists and dicts (including dict keys) are normalized too,
+    and dict order does not matter.
+    """
+    fold = function_name in CASE_INSENSITIVE_ACTIONS
+
+    def normalize(value):
+        if isinstance(value, str):
+            value = value.strip()
+            return value.casefold() if fold else value
+        if isinstance(value, dict):
+            return {normalize(key) if isinstance(key, str) else key: normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        return value
+
+    normalized = {name: normalize(value) for name, value in (function_params or {}).items()}
+    return function_name, json.dumps(normalized, sort_keys=True, default=str)
+
+class ActionCache:
+    """
+    Per-tool TTL cache in front of the action dispatch, shared by all sessions
+    in the process. Error results are never cached; when a call fails (for
+    example because its provider's rate limit could not be waited out), the
+    last good result for the same call is returned instead, marked "stale".
+    If there is none and the upstream is unavailable, an optional offline
+    fallback answers, marked "fallback". Neither is ever stored.
+    Identical calls to a tool with a TTL that miss at the same time share one
+    upstream request; tools without one (clocks, latency probes) always run.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, max_size: int = Config.ACTION_CACHE_MAX_SIZE,
+                 eviction="lru", enabled: bool = Config.ACTION_CACHE_ENABLED):
+        self.ttls = dict(ACTION_TTLS if ttls is None else ttls)
+        self.enabled = enabled
+        self._cache = TTLCache(max_size=max_size, eviction=eviction)
+        self._lock = threading.Lock()
+        self._hits = Counter()
+        self._misses = Counter()
+        self._stale = Counter()
+        self._fallbacks = Counter()
+        self._flights = SingleFlight()
+        self._async_flights = AsyncSingleFlight()
+
+    def is_cacheable(self, function_name: str) -> bool:
+        return self.enabled and self.ttls.get(function_name, 0) > 0
+
+    def lookup(self, function_name: str, function_params: Optional[Dict[str, Any]]) -> Any:
+        """Return the cached result for this call, or MISS."""
+        if not self.is_cacheable(function_name):
+            return MISS
+        value = self._cache.get(make_action_key(function_name, function_params))
+        with self._lock:
+            (self._misses if value is MISS else self._hits)[function_name] += 1
+        return value
+
+    def store(self, function_name: str, function_params: Optional[Dict[str, Any]], result: Any):
+        if not self.is_cacheable(function_name):
+            return
+        if isinstance(result, dict) and "error" in result:
+            return
+        self._cache.set(make_action_key(function_name, function_params), result, self.ttls[function_name])
+
+    def stale(self, function_name: str, function_params: Optional[Dict[str, Any]]) -> Any:
+        """Return the last good result for this call even if expired, or MISS."""
+        if not self.is_cacheable(function_name):
+            return MISS
+        value = self._cache.get(make_action_key(function_name, function_params), allow_stale=True)
+        if value is MISS:
+            return MISS
+        with self._lock:
+            self._stale[function_name] += 1
+        return {**value, "stale": True} if isinstance(value, dict) else value
+
+    def settle(self, function_name: str, function_params: Optional[Dict[str, Any]], result: Any, fallback=None) -> Any:
+        """Store a fresh result, or fall back to a stale or offline one when the call failed."""
+        if isinstance(result, dict) and "error" in result:
+            stale = self.stale(function_name, function_params)
+            if stale is not MISS:
+                return stale
+            if fallback is not None and result.get("upstream_unavailable"):
+                with self._lock:
+                    self._fallbacks[function_name] += 1
+                return {**fallback(**(function_params or {})), "fallback": "offline data, upstream unavailable"}
+            return result
+        self.store(function_name, function_params, result)
+        return result
+
+    def call(self, function_name: str, function, function_params: Optional[Dict[str, Any]], fallback=None) -> Any:
+        """Run a blocking action through the cache."""
+        result = self.lookup(function_name, function_params)
+        if result is MISS:
+            def run():
+                value = function(**function_params) if function_params else function()
+                return self.settle(function_name, function_params, value, fallback)
+            if self.ttls.get(function_name, 0) <= 0:
+                return run()
+            result = self._flights.do(make_action_key(function_name, function_params), run)
+        return result
+
+    async def call_async(self, function_name: str, coroutine_function, function_params: Optional[Dict[str, Any]],
+                         fallback=None) -> Any:
+        """Run an async action through the cache."""
+        result = self.lookup(function_name, function_params)
+        if result is MISS:
+            async def run():
+                value = await coroutine_function(**(function_params or {}))
+                return self.settle(function_name, function_params, value, fallback)
+            if self.ttls.get(function_name, 0) <= 0:
+                return await run()
+            result = await self._async_flights.do(make_action_key(function_name, function_params), run)
+        return result
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_tool = {
+                name: {"hits": self._hits[name], "misses": self._misses[name], "stale": self._stale[name],
+                       "fallback": self._fallbacks[name]}
+                for name in sorted(set(self._hits) | set(self._misses))
+            }
+        return {
+            **self._cache.stats(),
+            "coalesced": self._flights.shared + self._async_flights.shared,
+            "tools": per_tool
+        }
+
+# Shared cache used by execute_function in main.py and main_ollama.py
+action_cache = ActionCache()
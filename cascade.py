@@ -0,0 +1,73 @@
+"""
+Model cascade support for run_ai_agent_cascade in main.py and main_ollama.py.
+A question is tried on the smallest model first and only escalated to the
+next tier when that model visibly fails at the ReAct protocol.
+"""
+
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+# Why a tier gave up on a question
+ESCALATION_REASONS = (
+    "invalid_action",    # asked for an action (PAUSE / function_name) but no action JSON could be parsed
+    "unknown_function",  # named a function that is not in available_actions
+    "max_iterations",    # ran out of ReAct iterations without a final answer
+    "llm_error"          # the backend returned an error instead of a completion
+)
+
+def parse_models(spec: str) -> List[str]:
+    """Parse "llama3.1:8b,llama3.1:70b" into an ordered list of tiers."""
+    return [model.strip() for model in (spec or "").split(",") if model.strip()]
+
+def check_turn(response: str, function_calls: List[Dict[str, Any]], known_actions: Iterable[str]) -> Optional[str]:
+    """
+    Return the escalation reason for one LLM turn, or None if the turn is usable.
+    """
+    if response.startswith("Error:"):
+        return "llm_error"
+    if not function_calls:
+        if "PAUSE" in response or '"function_name"' in response:
+            return "invalid_action"
+        return None
+    if any(call.get("function_name") not in known_actions for call in function_calls):
+        return "unknown_function"
+    return None
+
+class CascadeStats:
+    """Thread-safe per-tier counters of attempts, answers and escalation reasons."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._attempts = Counter()
+        self._successes = Counter()
+        self._reasons = {}
+
+    def record(self, model: str, reason: Optional[str]):
+        with self._lock:
+            self._attempts[model] += 1
+            if reason is None:
+                self._successes[model] += 1
+            else:
+                self._reasons.setdefault(model, Counter())[reason] += 1
+
+    def reset(self):
+        with self._lock:
+            self._attempts.clear()
+            self._successes.clear()
+            self._reasons.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                model: {
+                    "attempts": attempts,
+                    "successes": self._successes[model],
+                    "success_rate": round(self._successes[model] / attempts, 3),
+                    "escalations": dict(self._reasons.get(model, {}))
+                }
+                for model, attempts in self._attempts.items()
+            }
+
+# Shared counters for both backends (tiers are keyed by model name)
+cascade_stats = CascadeStats()
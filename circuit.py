@@ -0,0 +1,152 @@
+"""
+Circuit breakers for upstream hosts.
+A breaker watches the recent error rate and latency of calls to one host.
+Once too many fail or run slow it opens, and calls fail immediately instead
+of each waiting out the full timeout. After a cool-down it lets one probe
+through (half-open) and closes again if the probe succeeds.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from config import Config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class UpstreamUnavailable(Exception):
+    """An upstream cannot be called right now (breaker open, quota exhausted)."""
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised instead of calling a host whose breaker is open."""
+
+class CircuitBreaker:
+    """
+    Rolling-window breaker. Calls slower than slow_call count as failures, so
+    a host that degrades into timeouts trips the breaker like one returning 5xx.
+    """
+
+    def __init__(self, name: str, failure_threshold: float = Config.CIRCUIT_FAILURE_THRESHOLD,
+                 min_calls: int = Config.CIRCUIT_MIN_CALLS, window: int = Config.CIRCUIT_WINDOW,
+                 slow_call: float = Config.CIRCUIT_SLOW_CALL, open_seconds: float = Config.CIRCUIT_OPEN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.slow_call = slow_call
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} is unavailable (recovery probe in flight)")
+                self._probing = True
+
+    def cancel(self):
+        """Forget a call that before_call let through but that never reached the host."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def record(self, success: bool, latency: float):
+        """Record the outcome of a call that before_call let through."""
+        failed = not success or latency > self.slow_call
+        with self._lock:
+            self._latencies.append(latency)
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls and self.failure_rate() >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def failure_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "state": self.state,
+                "failure_rate": round(self.failure_rate(), 3),
+                "recent_calls": len(self._outcomes),
+                "p50_latency_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                "max_latency_ms": round(latencies[-1] * 1000, 1) if latencies else None,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected
+            }
+
+class CircuitBreakers:
+    """
+    One breaker per upstream, created on first use. URLs of a known API
+    provider (as named by provider_for, e.g. the rate limiter's) share that
+    provider's breaker; other URLs are keyed by host and port. Crawls touch
+    many one-off hosts, so beyond max_hosts the least recently used closed
+    breakers are dropped; open and half-open ones are always kept.
+    """
+
+    def __init__(self, max_hosts: int = Config.CIRCUIT_MAX_HOSTS,
+                 provider_for: Optional[Callable[[str], Optional[str]]] = None, **settings):
+        self.max_hosts = max_hosts
+        self.provider_for = provider_for
+        self._settings = settings
+        self._breakers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key_for(self, url: str) -> str:
+        provider = self.provider_for(url) if self.provider_for else None
+        return provider or urlparse(url).netloc or url
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = self.key_for(url)
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host, **self._settings)
+                self._evict()
+            else:
+                self._breakers.move_to_end(host)
+            return breaker
+
+    def _evict(self):
+        excess = len(self._breakers) - self.max_hosts
+        if excess <= 0:
+            return
+        closed = [host for host, breaker in self._breakers.items() if breaker.state == CLOSED][:excess]
+        for host in closed:
+            del self._breakers[host]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.stats() for host, breaker in sorted(breakers.items())}
@@ -18,23 +18,84 @@ class Config:
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.1"))
     OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "1000"))
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # None uses api.openai.com; point at fake_llm_server.py for load tests
+    OPENAI_CASCADE_MODELS = os.getenv("OPENAI_CASCADE_MODELS", "gpt-3.5-turbo,gpt-4")  # smallest first
+    
+    # Ollama Configuration
+    OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # keep models (and their KV cache) loaded between turns
+    OLLAMA_MAX_LOADED_MODELS = int(os.getenv("OLLAMA_MAX_LOADED_MODELS", "1"))  # models served at once before a swap
+    OLLAMA_MODEL_CONCURRENCY = os.getenv("OLLAMA_MODEL_CONCURRENCY", "llama3.1:8b=2,llama3.1:70b=1,mistral:7b=2")
+    OLLAMA_MODEL_CONCURRENCY_DEFAULT = int(os.getenv("OLLAMA_MODEL_CONCURRENCY_DEFAULT", "1"))  # models not listed above
+    OLLAMA_SCHEDULER_MAX_BATCH = int(os.getenv("OLLAMA_SCHEDULER_MAX_BATCH", "8"))  # grants to a loaded model before a waiting one swaps in
+    OLLAMA_CASCADE_MODELS = os.getenv("OLLAMA_CASCADE_MODELS", "llama3.1:8b,llama3.1:70b")  # smallest first
+    
+    # LLM Completion Cache Configuration (opt-in)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+    
+    # Semantic Answer Cache Configuration (opt-in)
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.8"))  # cosine similarity
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))  # per system prompt
+    ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "3600"))  # for answers that used no timed tools
+    
+    # HTTP Agent Service Configuration
+    SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "16"))  # concurrent agent sessions
+    SERVER_QUEUE_DEPTH = int(os.getenv("SERVER_QUEUE_DEPTH", "64"))  # waiting requests before 429
+    SERVER_REQUEST_TIMEOUT = float(os.getenv("SERVER_REQUEST_TIMEOUT", "120"))  # seconds, queue time included
     
     # Weather API Configuration
     OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
+    OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org")
     WEATHER_UNITS = os.getenv("WEATHER_UNITS", "imperial")  # metric, imperial, kelvin
+    OPENWEATHER_RATE_LIMIT = int(os.getenv("OPENWEATHER_RATE_LIMIT", "60"))  # requests per minute
     
     # News API Configuration
     NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+    NEWS_API_BASE_URL = os.getenv("NEWS_API_BASE_URL", "https://newsapi.org")
     NEWS_DEFAULT_COUNTRY = os.getenv("NEWS_DEFAULT_COUNTRY", "us")
     NEWS_DEFAULT_CATEGORY = os.getenv("NEWS_DEFAULT_CATEGORY", "general")
+    NEWS_RATE_LIMIT = int(os.getenv("NEWS_RATE_LIMIT", "100"))  # requests per day
     
     # Stock Market API Configuration
     ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+    ALPHA_VANTAGE_BASE_URL = os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co")
+    ALPHA_VANTAGE_RATE_LIMIT = int(os.getenv("ALPHA_VANTAGE_RATE_LIMIT", "5"))  # requests per minute
+    
+    # Web Search Configuration
+    DUCKDUCKGO_BASE_URL = os.getenv("DUCKDUCKGO_BASE_URL", "https://api.duckduckgo.com")
+    SEARCH_RATE_LIMIT = int(os.getenv("SEARCH_RATE_LIMIT", "60"))  # DuckDuckGo requests per minute
     
     # Web Scraping Configuration
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "10"))
     USER_AGENT = os.getenv("USER_AGENT", "AI-Agent-System/1.0")
     
+    # HTTP Transport Configuration (shared connection pools for all network actions)
+    HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))  # hosts with a kept-alive pool
+    HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "10"))  # connections per host
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))  # on connection errors and 429/502/503/504
+    HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.3"))  # seconds, doubled per retry
+    HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))  # idle seconds before closing
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"  # ETag / Cache-Control cache
+    HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "512"))
+    HTTP_CACHE_MAX_BODY = int(os.getenv("HTTP_CACHE_MAX_BODY", "2097152"))  # 2MB, larger bodies are not stored
+    HTTP_CACHE_RETENTION = int(os.getenv("HTTP_CACHE_RETENTION", "86400"))  # keep stale bodies for revalidation
+    RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5"))  # seconds to queue for a provider's next slot
+    CIRCUIT_FAILURE_THRESHOLD = float(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "0.5"))  # failed share of recent calls that opens
+    CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))  # recent calls needed before the breaker can open
+    CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))  # recent calls considered per host
+    CIRCUIT_SLOW_CALL = float(os.getenv("CIRCUIT_SLOW_CALL", "5"))  # seconds; slower calls count as failures
+    CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))  # fail fast this long before probing again
+    CIRCUIT_MAX_HOSTS = int(os.getenv("CIRCUIT_MAX_HOSTS", "256"))  # breakers kept; least recently used closed ones are dropped
+    HTTP_CACHE_HEURISTIC_MAX = int(os.getenv("HTTP_CACHE_HEURISTIC_MAX", "3600"))  # cap for Last-Modified-only freshness
+    
+    # Agent Loop Configuration
+    MAX_PARALLEL_ACTIONS = int(os.getenv("MAX_PARALLEL_ACTIONS", "8"))  # concurrent tool calls per LLM turn
+    
     # Data Analysis Configuration
     MAX_DATA_ROWS = int(os.getenv("MAX_DATA_ROWS", "10000"))
     MAX_DATA_COLUMNS = int(os.getenv("MAX_DATA_COLUMNS", "100"))
@@ -45,10 +106,37 @@ class Config:
     
     # GitHub API Configuration
     GITHUB_API_TOKEN = os.getenv("GITHUB_API_TOKEN")  # Optional, for higher rate limits
+    GITHUB_API_BASE_URL = os.getenv("GITHUB_API_BASE_URL", "https://api.github.com")
     GITHUB_RATE_LIMIT = int(os.getenv("GITHUB_RATE_LIMIT", "60"))  # requests per hour
     
     # Crypto API Configuration
-    CRYPTO_UPDATE_INTERVAL = int(os.getenv("CRYPTO_UPDATE_INTERVAL", "300"))  # 5 minutes
+    COINGECKO_API_KEY = os.getenv("COINGECKO_API_KEY")  # Optional demo key; mock data without it
+    COINGECKO_BASE_URL = os.getenv("COINGECKO_BASE_URL", "https://api.coingecko.com")
+    COINGECKO_RATE_LIMIT = int(os.getenv("COINGECKO_RATE_LIMIT", "30"))  # requests per minute
+    CRYPTO_UPDATE_INTERVAL = int(os.getenv("CRYPTO_UPDATE_INTERVAL", "300"))  # 5 minutes, also the price feed poll interval
+    
+    # Background Price Feed (answers watched symbols from memory)
+    PRICE_FEED_ENABLED = os.getenv("PRICE_FEED_ENABLED", "false").lower() == "true"
+    PRICE_FEED_CRYPTO = os.getenv("PRICE_FEED_CRYPTO", "BTC,ETH,ADA,DOT")
+    PRICE_FEED_STOCKS = os.getenv("PRICE_FEED_STOCKS", "AAPL,GOOGL,MSFT,TSLA")
+    PRICE_FEED_SAMPLES = int(os.getenv("PRICE_FEED_SAMPLES", "288"))  # ring buffer size per symbol (a day at 5 minutes)
+    
+    # Action Result Cache Configuration (TTLs in seconds)
+    ACTION_CACHE_ENABLED = os.getenv("ACTION_CACHE_ENABLED", "true").lower() == "true"
+    ACTION_CACHE_MAX_SIZE = int(os.getenv("ACTION_CACHE_MAX_SIZE", "1024"))
+    WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", "600"))  # 10 minutes
+    STOCK_CACHE_TTL = int(os.getenv("STOCK_CACHE_TTL", "60"))
+    QUOTE_FRESHNESS = int(os.getenv("QUOTE_FRESHNESS", "60"))  # seconds a shared per-symbol quote is served
+    QUOTE_CACHE_MAX_SIZE = int(os.getenv("QUOTE_CACHE_MAX_SIZE", "1000"))  # symbols kept in the quote cache
+    QUOTE_MAX_SYMBOLS = int(os.getenv("QUOTE_MAX_SYMBOLS", "25"))  # per get_stock_prices call
+    TIMESERIES_DIR = os.getenv("TIMESERIES_DIR", ".timeseries")  # on-disk daily price history
+    TIMESERIES_REFRESH = int(os.getenv("TIMESERIES_REFRESH", "43200"))  # seconds before a symbol's history is topped up
+    PORTFOLIO_WINDOW = int(os.getenv("PORTFOLIO_WINDOW", "252"))  # daily returns analyzed by analyze_portfolio
+    PORTFOLIO_MAX_SYMBOLS = int(os.getenv("PORTFOLIO_MAX_SYMBOLS", "500"))  # holdings per analyze_portfolio call
+    NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", "300"))
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+    GITHUB_CACHE_TTL = int(os.getenv("GITHUB_CACHE_TTL", "600"))
+    WEBSITE_CACHE_TTL = int(os.getenv("WEBSITE_CACHE_TTL", "300"))
     
     # Sentiment Analysis Configuration
     SENTIMENT_POSITIVE_THRESHOLD = float(os.getenv("SENTIMENT_POSITIVE_THRESHOLD", "0.1"))
@@ -57,6 +145,19 @@ class Config:
     # Website Analysis Configuration
     MAX_WEBSITE_SIZE = int(os.getenv("MAX_WEBSITE_SIZE", "10485760"))  # 10MB
     MAX_ANALYSIS_TIME = int(os.getenv("MAX_ANALYSIS_TIME", "30"))  # seconds
+    HTML_PARSER = os.getenv("HTML_PARSER", "auto")  # auto (lxml if installed), lxml, html.parser
+    PROBE_SAMPLES = int(os.getenv("PROBE_SAMPLES", "3"))  # requests per URL in bulk latency probes
+    PROBE_CONCURRENCY = int(os.getenv("PROBE_CONCURRENCY", "100"))  # URLs probed at once
+    PROBE_MAX_URLS = int(os.getenv("PROBE_MAX_URLS", "50"))  # per get_response_times action call
+    CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "25"))  # default pages per crawl_site call
+    CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "3"))  # link hops from the root URL
+    CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))  # pages fetched at once
+    CRAWL_PER_HOST = int(os.getenv("CRAWL_PER_HOST", "4"))  # pages fetched at once from one host
+    CRAWL_PAGE_LIMIT = int(os.getenv("CRAWL_PAGE_LIMIT", "200"))  # hard cap on max_pages
+    PAGE_WEIGHT_MAX_ASSETS = int(os.getenv("PAGE_WEIGHT_MAX_ASSETS", "100"))  # subresources sized per page
+    PAGE_WEIGHT_CONCURRENCY = int(os.getenv("PAGE_WEIGHT_CONCURRENCY", "16"))  # subresources fetched at once
+    PAGE_WEIGHT_PER_HOST = int(os.getenv("PAGE_WEIGHT_PER_HOST", "6"))  # subresources fetched at once from one host
+    PAGE_WEIGHT_SLOW_MS = int(os.getenv("PAGE_WEIGHT_SLOW_MS", "1000"))  # assets slower than this are reported
     
     @classmethod
     def validate_config(cls):
@@ -71,6 +172,7 @@ class Config:
             "OPENWEATHER_API_KEY",
             "NEWS_API_KEY", 
             "ALPHA_VANTAGE_API_KEY",
+            "COINGECKO_API_KEY",
             "GITHUB_API_TOKEN"
         ]
         
@@ -98,6 +200,7 @@ class Config:
             "weather": bool(cls.OPENWEATHER_API_KEY),
             "news": bool(cls.NEWS_API_KEY),
             "stocks": bool(cls.ALPHA_VANTAGE_API_KEY),
+            "crypto": bool(cls.COINGECKO_API_KEY),
             "github": bool(cls.GITHUB_API_TOKEN)
         }
         return status
@@ -111,6 +214,7 @@ OPENAI_API_KEY=your_openai_api_key_here
 OPENWEATHER_API_KEY=your_openweather_api_key_here
 NEWS_API_KEY=your_news_api_key_here
 ALPHA_VANTAGE_API_KEY=your_alpha_vantage_api_key_here
+COINGECKO_API_KEY=your_coingecko_demo_key_here
 GITHUB_API_TOKEN=your_github_token_here
 
 # Configuration Options
@@ -121,6 +225,18 @@ WEATHER_UNITS=imperial
 NEWS_DEFAULT_COUNTRY=us
 REQUEST_TIMEOUT=10
 DEFAULT_TARGET_LANGUAGE=es
+
+# Upstream base URLs (point at fake_upstreams.py for offline load tests)
+# OPENWEATHER_BASE_URL=http://127.0.0.1:8900/openweather
+# DUCKDUCKGO_BASE_URL=http://127.0.0.1:8900/duckduckgo
+# ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8900/alphavantage
+# NEWS_API_BASE_URL=http://127.0.0.1:8900/newsapi
+# GITHUB_API_BASE_URL=http://127.0.0.1:8900/github
+# COINGECKO_BASE_URL=http://127.0.0.1:8900/coingecko
+
+# LLM endpoints (point at fake_llm_server.py for offline load tests)
+# OPENAI_BASE_URL=http://127.0.0.1:11500/v1
+# OLLAMA_HOST=http://127.0.0.1:11500
 """
 
 def create_env_template():
@@ -0,0 +1,263 @@
+"""
+Bounded async site crawler for the SEO auditor agent.
+Breadth-first from a root URL over the same site (www. and bare host count as
+one site), with a deduplicating URL frontier, robots.txt rules, a per-host
+concurrency limit, and max page / depth bounds. Each page is streamed through
+the single-pass HTML analyzer, and the per-page SEO metrics are folded into
+one compact report, so a whole audit takes a single tool call.
+"""
+
+import asyncio
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+from config import Config
+from html_analysis import StreamingPageAnalyzer
+from transport import transport
+
+# Pages listed per issue in the report
+ISSUE_EXAMPLES = 5
+
+# Below this many words a page counts as thin content
+THIN_CONTENT_WORDS = 300
+
+SKIPPED_EXTENSIONS = (
+    ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico", ".pdf", ".zip", ".gz", ".mp3", ".mp4",
+    ".avi", ".mov", ".css", ".js", ".json", ".xml", ".woff", ".woff2", ".ttf", ".eot", ".exe", ".dmg"
+)
+
+def normalize_link(base: str, href: str) -> Optional[str]:
+    """Absolute http(s) URL for href without fragment, default port or empty path; None to skip."""
+    href = href.strip()
+    if not href or href.startswith(("mailto:", "tel:", "javascript:", "data:", "#")):
+        return None
+    url, _ = urldefrag(urljoin(base, href))
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if parts.port and parts.port != {"http": 80, "https": 443}[parts.scheme]:
+        netloc += f":{parts.port}"
+    return urlunsplit((parts.scheme, netloc, parts.path or "/", parts.query, ""))
+
+def site_of(url: str) -> str:
+    """Site key: host without a leading www."""
+    host = urlsplit(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+class RobotsCache:
+    """robots.txt rules per scheme and host, fetched once per crawl."""
+
+    def __init__(self, user_agent: str = Config.USER_AGENT):
+        self.user_agent = user_agent
+        self._rules = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        async with self._locks[origin]:
+            if origin not in self._rules:
+                self._rules[origin] = await self._fetch(origin)
+        return self._rules[origin].can_fetch(self.user_agent, url)
+
+    async def _fetch(self, origin: str) -> RobotFileParser:
+        rules = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = await transport.get_async(f"{origin}/robots.txt")
+        except Exception:
+            # Unreachable robots.txt: crawl as if there were none
+            rules.allow_all = True
+            return rules
+        if response.status_code in (401, 403):
+            rules.disallow_all = True
+        elif response.status_code >= 400:
+            rules.allow_all = True
+        else:
+            rules.parse(response.content.decode("utf-8", errors="replace").splitlines())
+        return rules
+
+class SiteCrawler:
+    """One crawl: frontier, seen set, per-host limits and the collected pages."""
+
+    def __init__(self, root: str, max_pages: int = Config.CRAWL_MAX_PAGES, max_depth: int = Config.CRAWL_MAX_DEPTH,
+                 concurrency: int = Config.CRAWL_CONCURRENCY, per_host: int = Config.CRAWL_PER_HOST,
+                 respect_robots: bool = True):
+        self.root = root
+        self.site = site_of(root)
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.robots = RobotsCache() if respect_robots else None
+        self.frontier = deque([(root, 0, None)])
+        self.seen = {root}
+        self.pages = []
+        self.blocked = []
+        self.external_links = set()
+        self._host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host))
+        self._claimed = 0
+        self._active = 0
+        self._wakeup = asyncio.Event()
+
+    async def run(self) -> List[Dict[str, Any]]:
+        workers = [asyncio.ensure_future(self._worker()) for _ in range(max(1, self.concurrency))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return self.pages
+
+    async def _worker(self):
+        while True:
+            if not self.frontier:
+                if self._active == 0 or self._claimed >= self.max_pages:
+                    # Nothing queued and nothing in flight that could queue more
+                    self._wakeup.set()
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if self._claimed >= self.max_pages:
+                self._wakeup.set()
+                return
+            url, depth, referrer = self.frontier.popleft()
+            self._claimed += 1
+            self._active += 1
+            try:
+                await self._visit(url, depth, referrer)
+            finally:
+                self._active -= 1
+                self._wakeup.set()
+
+    async def _visit(self, url: str, depth: int, referrer: Optional[str]):
+        if self.robots is not None and not await self.robots.allowed(url):
+            self._claimed -= 1
+            self.blocked.append(url)
+            return
+        async with self._host_slots[urlsplit(url).netloc]:
+            page, links = await self._fetch(url)
+        page.update({"depth": depth, "referrer": referrer})
+        self.pages.append(page)
+
+        if depth >= self.max_depth or "nofollow" in page.pop("robots", ""):
+            return
+        for link in links:
+            if site_of(link) != self.site:
+                self.external_links.add(link)
+            elif link not in self.seen and not urlsplit(link).path.lower().endswith(SKIPPED_EXTENSIONS):
+                self.seen.add(link)
+                self.frontier.append((link, depth + 1, url))
+
+    async def _fetch(self, url: str) -> Tuple[Dict[str, Any], List[str]]:
+        start = time.perf_counter()
+        try:
+            async with transport.stream_async(url) as response:
+                page = {"url": url, "status_code": response.status, "final_url": str(response.url)}
+                content_type = response.headers.get("Content-Type", "")
+                if response.status >= 400 or "html" not in content_type.lower():
+                    page.update({"response_time_ms": round((time.perf_counter() - start) * 1000),
+                                 "content_type": content_type.split(";")[0] or "unknown"})
+                    return page, []
+                analyzer = StreamingPageAnalyzer(content_type, collect_links=True)
+                async for chunk in response.content.iter_chunked(65536):
+                    if not await asyncio.to_thread(analyzer.feed, chunk):
+                        break
+                analysis = await asyncio.to_thread(analyzer.close)
+        except Exception as e:
+            return {"url": url, "error": str(e) or type(e).__name__,
+                    "response_time_ms": round((time.perf_counter() - start) * 1000)}, []
+
+        metrics = analyzer.metrics
+        page.update({
+            "response_time_ms": round((time.perf_counter() - start) * 1000),
+            "bytes": analysis["content_length"],
+            "title": analysis["title"] if metrics.title is not None else None,
+            "description": analysis["description"] if metrics.description is not None else None,
+            "h1": analysis["headings"]["h1"],
+            "word_count": analysis["word_count"],
+            "images": analysis["images"],
+            "links": analysis["links"],
+            "canonical": metrics.canonical,
+            "noindex": "noindex" in metrics.robots,
+            "robots": metrics.robots
+        })
+        base = urljoin(page["final_url"], metrics.base_href) if metrics.base_href else page["final_url"]
+        links = [link for link in (normalize_link(base, href) for href in metrics.hrefs) if link]
+        return page, links
+
+def _examples(urls: List[str]) -> Dict[str, Any]:
+    return {"count": len(urls), "examples": urls[:ISSUE_EXAMPLES]}
+
+def build_report(crawler: SiteCrawler, elapsed: float) -> Dict[str, Any]:
+    """Fold per-page metrics into one compact audit report."""
+    pages = crawler.pages
+    html_pages = [page for page in pages if "word_count" in page]
+    failed = [page for page in pages if "error" in page]
+    broken = [page for page in pages if page.get("status_code", 0) >= 400]
+
+    titles = defaultdict(list)
+    for page in html_pages:
+        if page["title"]:
+            titles[page["title"]].append(page["url"])
+    duplicate_titles = {title: urls[:ISSUE_EXAMPLES] for title, urls in titles.items() if len(urls) > 1}
+
+    issues = {
+        "missing_title": _examples([page["url"] for page in html_pages if not page["title"]]),
+        "missing_description": _examples([page["url"] for page in html_pages if not page["description"]]),
+        "missing_h1": _examples([page["url"] for page in html_pages if page["h1"] == 0]),
+        "multiple_h1": _examples([page["url"] for page in html_pages if page["h1"] > 1]),
+        "thin_content": _examples([page["url"] for page in html_pages if page["word_count"] < THIN_CONTENT_WORDS]),
+        "noindex": _examples([page["url"] for page in html_pages if page["noindex"]]),
+        "slow_pages": _examples([page["url"] for page in html_pages if page["response_time_ms"] > 1000]),
+        "broken_links": {
+            "count": len(broken),
+            "examples": [{"url": page["url"], "status": page["status_code"], "linked_from": page["referrer"]}
+                         for page in broken[:ISSUE_EXAMPLES]]
+        },
+        "duplicate_titles": {"count": len(duplicate_titles), "examples": dict(list(duplicate_titles.items())[:ISSUE_EXAMPLES])}
+    }
+
+    report = {
+        "root": crawler.root,
+        "pages_crawled": len(pages),
+        "html_pages": len(html_pages),
+        "max_depth_reached": max((page["depth"] for page in pages), default=0),
+        "crawl_seconds": round(elapsed, 2),
+        "status_codes": dict(Counter(str(page["status_code"]) for page in pages if "status_code" in page)),
+        "unvisited_urls": len(crawler.frontier),
+        "external_links": len(crawler.external_links),
+        "issues": {name: issue for name, issue in issues.items() if issue["count"]}
+    }
+    if failed:
+        report["fetch_errors"] = _examples([f"{page['url']}: {page['error']}" for page in failed])
+    if crawler.blocked:
+        report["blocked_by_robots"] = _examples(crawler.blocked)
+    if html_pages:
+        report["averages"] = {
+            "response_time_ms": round(sum(page["response_time_ms"] for page in html_pages) / len(html_pages)),
+            "word_count": round(sum(page["word_count"] for page in html_pages) / len(html_pages)),
+            "page_kb": round(sum(page["bytes"] for page in html_pages) / len(html_pages) / 1024, 1)
+        }
+        slowest = sorted(html_pages, key=lambda page: page["response_time_ms"], reverse=True)[:3]
+        report["slowest_pages"] = [{"url": page["url"], "response_time_ms": page["response_time_ms"]} for page in slowest]
+    return report
+
+async def crawl(root: str, max_pages: int = Config.CRAWL_MAX_PAGES, max_depth: int = Config.CRAWL_MAX_DEPTH,
+                concurrency: int = Config.CRAWL_CONCURRENCY, per_host: int = Config.CRAWL_PER_HOST,
+                respect_robots: bool = True) -> Dict[str, Any]:
+    """Crawl a site breadth-first from root and return the audit report."""
+    root = root.strip()
+    if not root.startswith(("http://", "https://")):
+        root = "https://" + root
+    root = normalize_link(root, root)
+    if root is None:
+        raise ValueError("Invalid root URL")
+    crawler = SiteCrawler(root, max_pages, max_depth, concurrency, per_host, respect_robots)
+    start = time.perf_counter()
+    await crawler.run()
+    return build_report(crawler, time.perf_counter() - start)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Fake LLM Server
+Local stand-in for the OpenAI chat completions API and the Ollama generate /
+chat API. It answers with scripted ReAct turns (Thought + action JSON + PAUSE,
+then an Answer once an Action_Response comes back) at a configurable
+time-to-first-token and tokens-per-second, so the real OpenAI and
+ollama.Client code paths, streaming early stop and concurrency can be
+load-tested without a GPU or an API key.
+
+Usage:
+    python fake_llm_server.py --port 11500 --ttft-ms 250 --tokens-per-second 40
+    OPENAI_BASE_URL=http://127.0.0.1:11500/v1 OPENAI_API_KEY=fake python main.py
+    OLLAMA_HOST=http://127.0.0.1:11500 python main_ollama.py
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+from collections import Counter
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+# (pattern in the question, action name, parameters built from the match)
+REACT_SCRIPT = [
+    (r"weather (?:in|for) ([a-z ]+?)(?:\?|$|,| and)", "get_weather_info", lambda m: {"city": m.group(1).strip()}),
+    (r"\b([A-Z]{1,5})\b (?:stock|share)", "get_stock_price", lambda m: {"symbol": m.group(1)}),
+    (r"stock price (?:of|for) ([A-Za-z]{1,5})\b", "get_stock_price", lambda m: {"symbol": m.group(1).upper()}),
+    (r"(?:calculate|compute) (.+?)\??$", "calculate_math_expression", lambda m: {"expression": m.group(1)}),
+    (r"response time (?:of|for) ([\w.-]+\.[a-z]{2,})", "get_response_time", lambda m: {"url": m.group(1)}),
+    (r"github\.com/([\w.-]+/[\w.-]+)", "get_github_repo_info", lambda m: {"repo_name": m.group(1)}),
+    (r"\bnews\b", "get_news_headlines", lambda m: {"category": "general"}),
+    (r"\btime\b", "get_current_time", lambda m: {"timezone": "UTC"}),
+]
+
+TOKEN_PATTERN = re.compile(r"\s*\S+|\s+")
+
+# How main.py and main_ollama.py label tool results fed back to the model
+OBSERVATION_PREFIXES = ("Action_Response", "Function result")
+
+class ModelTiming:
+    """Generation speed of one fake model."""
+
+    def __init__(self, ttft_ms: float = 200.0, tokens_per_second: float = 50.0):
+        self.ttft = ttft_ms / 1000
+        self.tokens_per_second = tokens_per_second
+
+    def token_interval(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+def tokenize(text: str) -> List[str]:
+    """Split text into word-sized pieces that concatenate back to the original."""
+    return TOKEN_PATTERN.findall(text)
+
+def count_tokens(text: str) -> int:
+    """Rough prompt size (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+def scripted_turn(question: str, last_user: str, ramble: int = 0) -> str:
+    """
+    The next ReAct turn: an action for a new question, or an Answer once the
+    last user message is a tool result. `ramble` filler words follow
+    PAUSE, as real models tend to keep going until max_tokens.
+    """
+    if last_user.lstrip().startswith(OBSERVATION_PREFIXES):
+        observation = last_user.split(":", 1)[1].strip() if ":" in last_user else last_user
+        if len(observation) > 200:
+            observation = observation[:200] + "..."
+        return f"Answer: Based on the action results, here is what I found: {observation}"
+
+    action = {"function_name": "search_web", "function_parms": {"query": question.strip()}}
+    for pattern, name, parameters in REACT_SCRIPT:
+        match = re.search(pattern, question, re.IGNORECASE)
+        if match:
+            action = {"function_name": name, "function_parms": parameters(match)}
+            break
+    turn = (f"Thought: I should use {action['function_name']} to answer this.\n"
+            f"Action: \n\n{json.dumps(action, indent=2)}\n\nPAUSE")
+    if ramble:
+        turn += "\n\nAction_Response:" + " and then" * ramble
+    return turn
+
+def conversation_from_messages(messages: List[Dict[str, str]]) -> Tuple[str, str]:
+    """(first user question, last user message) of a chat history."""
+    user_messages = [message.get("content") or "" for message in messages if message.get("role") == "user"]
+    if not user_messages:
+        return "", ""
+    return user_messages[0], user_messages[-1]
+
+def conversation_from_prompt(prompt: str) -> Tuple[str, str]:
+    """(first user question, last user message) of a prompt flattened by main_ollama.build_prompt."""
+    user_turns = re.findall(r"User: (.*?)\n\n(?=Assistant: |User: |$)", prompt, re.DOTALL)
+    if not user_turns:
+        return prompt.strip(), prompt.strip()
+    return user_turns[0], user_turns[-1]
+
+class FakeLLM:
+    """Per-model timings, an optional cap on concurrent generations, and counters."""
+
+    def __init__(self, timing: Optional[ModelTiming] = None, model_timings: Optional[Dict[str, ModelTiming]] = None,
+                 parallel: int = 0, ramble: int = 0):
+        self.timing = timing or ModelTiming()
+        self.model_timings = model_timings or {}
+        self.ramble = ramble
+        self._slots = asyncio.Semaphore(parallel) if parallel > 0 else None
+        self.active = 0
+        self.counts = Counter()
+
+    def timing_for(self, model: str) -> ModelTiming:
+        return self.model_timings.get(model, self.timing)
+
+    async def generate(self, model: str, text: str, max_tokens: Optional[int]):
+        """
+        Yield (token, done_reason) pairs at the model's speed; done_reason is
+        None until the last token. Consume it inside aclosing() so a client
+        disconnect frees the slot at once; it is counted as cancelled.
+        """
+        tokens = tokenize(text)
+        reason = "stop"
+        if max_tokens and len(tokens) > max_tokens:
+            tokens, reason = tokens[:max_tokens], "length"
+        timing = self.timing_for(model)
+
+        if self._slots is not None:
+            await self._slots.acquire()
+        self.active += 1
+        self.counts["requests"] += 1
+        try:
+            await asyncio.sleep(timing.ttft)
+            for index, token in enumerate(tokens):
+                if index:
+                    await asyncio.sleep(timing.token_interval())
+                self.counts["tokens"] += 1
+                yield token, reason if index == len(tokens) - 1 else None
+            if not tokens:
+                yield "", reason
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client hung up mid-generation (e.g. a streaming early stop)
+            self.counts["cancelled"] += 1
+            raise
+        finally:
+            self.active -= 1
+            if self._slots is not None:
+                self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counts, "active": self.active}
+
+def _now_iso() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime())
+
+LLM = web.AppKey("llm", FakeLLM)
+
+# OpenAI-compatible endpoint
+
+async def chat_completions(request: web.Request) -> web.StreamResponse:
+    llm = request.app[LLM]
+    body = await request.json()
+    model = body.get("model", "gpt-3.5-turbo")
+    messages = body.get("messages", [])
+    text = scripted_turn(*conversation_from_messages(messages), ramble=llm.ramble)
+    max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    prompt_tokens = count_tokens("".join(message.get("content") or "" for message in messages))
+
+    if not body.get("stream"):
+        content, finish_reason, completion_tokens = "", "stop", 0
+        async with aclosing(llm.generate(model, text, max_tokens)) as generation:
+            async for token, reason in generation:
+                content += token
+                completion_tokens += 1
+                finish_reason = reason or finish_reason
+        return web.json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+    await response.prepare(request)
+
+    async def send(delta, finish_reason=None):
+        chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                 "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+    try:
+        await send({"role": "assistant", "content": ""})
+        async with aclosing(llm.generate(model, text, max_tokens)) as generation:
+            async for token, reason in generation:
+                await send({"content": token})
+                if reason:
+                    await send({}, reason)
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+    except ConnectionResetError:
+        # Client stopped reading (streaming early stop)
+        pass
+    return response
+
+# Ollama-compatible endpoints
+
+async def _ollama_reply(request: web.Request, body: Dict[str, Any], text: str, prompt_tokens: int,
+                        chat: bool) -> web.StreamResponse:
+    llm = request.app[LLM]
+    model = body.get("model", "")
+    options = body.get("options") or {}
+    # Ollama streams unless the request says otherwise
+    stream = body.get("stream", True)
+    start = time.monotonic_ns()
+
+    def payload(content, done, done_reason=None, eval_count=0):
+        message = {"model": model, "created_at": _now_iso()}
+        if chat:
+            message["message"] = {"role": "assistant", "content": content}
+        else:
+            message["response"] = content
+        message["done"] = done
+        if done:
+            elapsed = time.monotonic_ns() - start
+            message.update({"done_reason": done_reason, "total_duration": elapsed, "load_duration": 0,
+                            "prompt_eval_count": prompt_tokens, "prompt_eval_duration": 0,
+                            "eval_count": eval_count, "eval_duration": elapsed})
+            if not chat:
+                message["context"] = []
+        return message
+
+    generation = aclosing(llm.generate(model, text, options.get("num_predict")))
+    if not stream:
+        content, done_reason, eval_count = "", "stop", 0
+        async with generation as tokens:
+            async for token, reason in tokens:
+                content += token
+                eval_count += 1
+                done_reason = reason or done_reason
+        return web.json_response(payload(content, True, done_reason, eval_count))
+
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+    eval_count = 0
+    try:
+        async with generation as tokens:
+            async for token, reason in tokens:
+                eval_count += 1
+                await response.write((json.dumps(payload(token, False)) + "\n").encode())
+                if reason:
+                    await response.write((json.dumps(payload("", True, reason, eval_count)) + "\n").encode())
+        await response.write_eof()
+    except ConnectionResetError:
+        pass
+    return response
+
+async def ollama_generate(request: web.Request) -> web.StreamResponse:
+    body = await request.json()
+    prompt = body.get("prompt", "")
+    text = scripted_turn(*conversation_from_prompt(prompt), ramble=request.app[LLM].ramble)
+    return await _ollama_reply(request, body, text, count_tokens(prompt), chat=False)
+
+async def ollama_chat(request: web.Request) -> web.StreamResponse:
+    body = await request.json()
+    messages = body.get("messages", [])
+    text = scripted_turn(*conversation_from_messages(messages), ramble=request.app[LLM].ramble)
+    prompt_tokens = count_tokens("".join(message.get("content") or "" for message in messages))
+    return await _ollama_reply(request, body, text, prompt_tokens, chat=True)
+
+async def stats(request: web.Request) -> web.Response:
+    return web.json_response(request.app[LLM].stats())
+
+def create_app(llm: Optional[FakeLLM] = None) -> web.Application:
+    """Build the fake LLM app (OpenAI under /v1, Ollama under /api)."""
+    app = web.Application(client_max_size=32 * 1024 * 1024)
+    app[LLM] = llm or FakeLLM()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/api/generate", ollama_generate)
+    app.router.add_post("/api/chat", ollama_chat)
+    app.router.add_get("/_stats", stats)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI / Ollama LLM with scripted ReAct turns")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--ttft-ms", type=float, default=200.0, help="Time to first token in milliseconds")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Generation speed after the first token")
+    parser.add_argument("--parallel", type=int, default=0, help="Concurrent generations (0 = unlimited)")
+    parser.add_argument("--ramble", type=int, default=0, help="Filler words generated after PAUSE")
+    parser.add_argument("--config", help='JSON file of per-model timings, e.g. {"llama3.1:70b": {"ttft_ms": 800, '
+                                         '"tokens_per_second": 12}}')
+    args = parser.parse_args()
+
+    model_timings = {}
+    if args.config:
+        with open(args.config) as f:
+            model_timings = {model: ModelTiming(**timing) for model, timing in json.load(f).items()}
+    llm = FakeLLM(ModelTiming(args.ttft_ms, args.tokens_per_second), model_timings, args.parallel, args.ramble)
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"🧪 Fake LLM on {base} (TTFT {args.ttft_ms:g}ms, {args.tokens_per_second:g} tokens/s)")
+    print(f"  OPENAI_BASE_URL={base}/v1")
+    print(f"  OLLAMA_HOST={base}")
+    web.run_app(create_app(llm), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Fake Upstream Server
+Offline stand-in for every third-party API the network actions call
+(OpenWeatherMap, DuckDuckGo, Alpha Vantage, NewsAPI, GitHub, CoinGecko).
+Responses follow each provider's schema, and every provider has a
+configurable latency distribution, error rate and rate limit, so load tests
+exercise the real HTTP path (pool, cache, limiter, breakers) without leaving
+the machine.
+
+Usage:
+    python fake_upstreams.py --port 8900 --latency lognormal --median-ms 120 --spread 0.6 --error-rate 0.02
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8900/openweather python main.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import zlib
+from collections import Counter
+from email.utils import formatdate
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+
+# URL prefix each provider is served under; set <SETTING>=http://host:port/<prefix>
+PROVIDER_SETTINGS = {
+    "openweather": "OPENWEATHER_BASE_URL",
+    "duckduckgo": "DUCKDUCKGO_BASE_URL",
+    "alphavantage": "ALPHA_VANTAGE_BASE_URL",
+    "newsapi": "NEWS_API_BASE_URL",
+    "github": "GITHUB_API_BASE_URL",
+    "coingecko": "COINGECKO_BASE_URL"
+}
+
+# Published quotas as (requests, per seconds); None means unlimited
+DEFAULT_RATE_LIMITS = {
+    "openweather": (60, 60),
+    "duckduckgo": None,
+    "alphavantage": (5, 60),
+    "newsapi": (100, 86400),
+    "github": (60, 3600),
+    "coingecko": (30, 60)
+}
+
+LATENCY_KINDS = ("fixed", "uniform", "lognormal")
+
+# Trading days in an outputsize=full TIME_SERIES_DAILY response
+FULL_HISTORY_DAYS = 1500
+
+class LatencyModel:
+    """
+    Response delay distribution. `spread` is the +/- fraction of the median
+    for uniform, and the sigma of the underlying normal for lognormal.
+    """
+
+    def __init__(self, kind: str = "fixed", median_ms: float = 0.0, spread: float = 0.0):
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.median_ms = median_ms
+        self.spread = spread
+
+    def sample(self, rng: random.Random) -> float:
+        """Delay in seconds."""
+        if self.kind == "uniform":
+            delay = rng.uniform(self.median_ms * (1 - self.spread), self.median_ms * (1 + self.spread))
+        elif self.kind == "lognormal":
+            delay = self.median_ms * math.exp(rng.gauss(0.0, self.spread))
+        else:
+            delay = self.median_ms
+        return max(0.0, delay) / 1000
+
+class FixedWindow:
+    """Fixed-window request quota, like most providers enforce."""
+
+    def __init__(self, allowed: int, period: float):
+        self.allowed = allowed
+        self.period = period
+        self.window_start = time.monotonic()
+        self.used = 0
+
+    def take(self) -> Optional[float]:
+        """Count a request; None if allowed, else seconds until the window resets."""
+        now = time.monotonic()
+        if now - self.window_start >= self.period:
+            self.window_start = now
+            self.used = 0
+        if self.used >= self.allowed:
+            return self.period - (now - self.window_start)
+        self.used += 1
+        return None
+
+    def remaining(self) -> int:
+        return max(0, self.allowed - self.used)
+
+    def reset_at(self) -> int:
+        """Window reset as a Unix timestamp (for X-RateLimit-Reset)."""
+        return int(time.time() + self.period - (time.monotonic() - self.window_start))
+
+class FakeProvider:
+    """Behavior of one fake upstream: latency, injected 5xx errors and its quota."""
+
+    def __init__(self, name: str, latency: Optional[LatencyModel] = None, error_rate: float = 0.0,
+                 rate_limit: Optional[tuple] = None):
+        self.name = name
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.quota = FixedWindow(*rate_limit) if rate_limit else None
+        self.counts = Counter()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts,
+            "latency": {"kind": self.latency.kind, "median_ms": self.latency.median_ms, "spread": self.latency.spread},
+            "error_rate": self.error_rate,
+            "quota_remaining": self.quota.remaining() if self.quota else None
+        }
+
+def _seeded(*parts) -> random.Random:
+    """Deterministic RNG per request input, so the same query always gets the same data."""
+    return random.Random(zlib.crc32("|".join(str(part).lower() for part in parts).encode()))
+
+# Provider response bodies
+
+def weather_body(city: str) -> Dict[str, Any]:
+    rng = _seeded("weather", city)
+    condition = rng.choice(["Clear", "Clouds", "Rain", "Drizzle", "Snow", "Mist"])
+    today = int(time.time()) // 86400 * 86400
+    return {
+        "coord": {"lon": round(rng.uniform(-180, 180), 4), "lat": round(rng.uniform(-60, 70), 4)},
+        "weather": [{"id": 800, "main": condition, "description": condition.lower(), "icon": "01d"}],
+        "base": "stations",
+        "main": {
+            "temp": round(rng.uniform(20, 95), 2),
+            "feels_like": round(rng.uniform(20, 95), 2),
+            "pressure": rng.randint(990, 1035),
+            "humidity": rng.randint(20, 95)
+        },
+        "visibility": rng.choice([4000, 8000, 10000]),
+        "wind": {"speed": round(rng.uniform(0, 25), 2), "deg": rng.randint(0, 359)},
+        "dt": int(time.time()),
+        "sys": {"country": "XX", "sunrise": today + 6 * 3600, "sunset": today + 19 * 3600},
+        "name": city.title(),
+        "cod": 200
+    }
+
+def search_body(query: str) -> Dict[str, Any]:
+    slug = query.strip().replace(" ", "_")
+    return {
+        "Abstract": f"{query} is the subject of this offline fake search result.",
+        "AbstractSource": "Wikipedia",
+        "AbstractURL": f"https://en.wikipedia.org/wiki/{slug}",
+        "Answer": "",
+        "Definition": "",
+        "Heading": query.title(),
+        "RelatedTopics": [
+            {"Text": f"{query} - related topic {index}", "FirstURL": f"https://duckduckgo.com/{slug}_{index}"}
+            for index in range(1, 9)
+        ],
+        "Type": "A"
+    }
+
+def quote_body(symbol: str) -> Dict[str, Any]:
+    rng = _seeded("quote", symbol)
+    previous = round(rng.uniform(5, 900), 2)
+    price = round(previous * (1 + rng.uniform(-0.05, 0.05)), 2)
+    change = round(price - previous, 2)
+    return {
+        "Global Quote": {
+            "01. symbol": symbol.upper(),
+            "02. open": f"{previous:.4f}",
+            "03. high": f"{max(price, previous) * 1.01:.4f}",
+            "04. low": f"{min(price, previous) * 0.99:.4f}",
+            "05. price": f"{price:.4f}",
+            "06. volume": str(rng.randint(10_000, 90_000_000)),
+            "07. latest trading day": time.strftime("%Y-%m-%d"),
+            "08. previous close": f"{previous:.4f}",
+            "09. change": f"{change:.4f}",
+            "10. change percent": f"{change / previous * 100:.4f}%"
+        }
+    }
+
+def daily_series_body(symbol: str, outputsize: str = "compact") -> Dict[str, Any]:
+    """TIME_SERIES_DAILY: a seeded random walk over weekdays that ends at the quote_body price."""
+    rng = _seeded("daily", symbol)
+    close = float(quote_body(symbol)["Global Quote"]["05. price"])
+    day = int(time.time()) // 86400
+    series = {}
+    while len(series) < (FULL_HISTORY_DAYS if outputsize == "full" else 100):
+        # 1970-01-01 was a Thursday, so (day + 3) % 7 >= 5 is a weekend
+        if (day + 3) % 7 < 5:
+            previous = close / (1 + rng.gauss(0.0004, 0.018))
+            high = max(close, previous) * (1 + rng.uniform(0, 0.01))
+            low = min(close, previous) * (1 - rng.uniform(0, 0.01))
+            series[time.strftime("%Y-%m-%d", time.gmtime(day * 86400))] = {
+                "1. open": f"{previous:.4f}",
+                "2. high": f"{high:.4f}",
+                "3. low": f"{low:.4f}",
+                "4. close": f"{close:.4f}",
+                "5. volume": str(rng.randint(10_000, 90_000_000))
+            }
+            close = previous
+        day -= 1
+    return {
+        "Meta Data": {"1. Information": "Daily Prices (open, high, low, close) and Volumes", "2. Symbol": symbol.upper(),
+                      "3. Last Refreshed": next(iter(series)), "4. Output Size": outputsize.title()},
+        "Time Series (Daily)": series
+    }
+
+def coin_prices_body(ids: str) -> Dict[str, Any]:
+    """CoinGecko /simple/price with market cap, 24h volume and change; prices drift slowly over time."""
+    body = {}
+    for coin in filter(None, (coin.strip().lower() for coin in ids.split(","))):
+        rng = _seeded("coin", coin)
+        price = rng.uniform(0.05, 60000) * (1 + 0.02 * math.sin(time.time() / 900 + rng.uniform(0, 2 * math.pi)))
+        body[coin] = {
+            "usd": round(price, 6),
+            "usd_market_cap": round(price * rng.uniform(1e7, 2e10), 2),
+            "usd_24h_vol": round(price * rng.uniform(1e5, 1e9), 2),
+            "usd_24h_change": round(rng.uniform(-8, 8), 4)
+        }
+    return body
+
+def news_body(category: str, country: str) -> Dict[str, Any]:
+    rng = _seeded("news", category, country)
+    sources = ["Reuters", "Associated Press", "BBC News", "Bloomberg", "The Verge"]
+    articles = []
+    for index in range(1, 21):
+        articles.append({
+            "source": {"id": None, "name": rng.choice(sources)},
+            "author": "Staff",
+            "title": f"{category.title()} headline {index} ({country.upper()})",
+            "description": f"Offline fake {category} story number {index}.",
+            "url": f"https://news.example.com/{country}/{category}/{index}",
+            "urlToImage": None,
+            "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - index * 1800)),
+            "content": None
+        })
+    return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+def repo_body(owner: str, repo: str) -> Dict[str, Any]:
+    rng = _seeded("repo", owner, repo)
+    return {
+        "id": rng.randint(1, 10**8),
+        "name": repo,
+        "full_name": f"{owner}/{repo}",
+        "description": f"Offline fake repository {owner}/{repo}",
+        "language": rng.choice(["Python", "Go", "Rust", "TypeScript", "C++"]),
+        "stargazers_count": rng.randint(0, 200_000),
+        "forks_count": rng.randint(0, 50_000),
+        "open_issues_count": rng.randint(0, 5_000),
+        "size": rng.randint(100, 500_000),
+        "created_at": "2015-01-01T00:00:00Z",
+        "updated_at": time.strftime("%Y-%m-%dT00:00:00Z", time.gmtime()),
+        "html_url": f"https://github.com/{owner}/{repo}"
+    }
+
+# Per-provider error shapes
+
+def rate_limited(provider: FakeProvider, retry_after: float) -> web.Response:
+    """The provider's own rate-limit response."""
+    seconds = str(max(1, math.ceil(retry_after)))
+    if provider.name == "alphavantage":
+        # Alpha Vantage answers 200 with a note instead of an error status
+        return web.json_response({"Note": "Thank you for using Alpha Vantage! Our standard API rate limit "
+                                          "has been reached."})
+    if provider.name == "github":
+        return web.json_response({"message": "API rate limit exceeded."}, status=403, headers={
+            "X-RateLimit-Limit": str(provider.quota.allowed),
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(provider.quota.reset_at()),
+            "Retry-After": seconds
+        })
+    if provider.name == "newsapi":
+        body = {"status": "error", "code": "rateLimited", "message": "You have made too many requests recently."}
+    elif provider.name == "openweather":
+        body = {"cod": 429, "message": "Your account is temporarily blocked due to exceeding of requests limitation."}
+    else:
+        body = {"error": "Too Many Requests"}
+    return web.json_response(body, status=429, headers={"Retry-After": seconds})
+
+def server_error(rng: random.Random) -> web.Response:
+    status = rng.choice([500, 503])
+    return web.json_response({"error": "injected failure"}, status=status)
+
+# Application
+
+def _route(provider: FakeProvider, rng: random.Random, respond):
+    """Wrap a provider handler with its latency, quota and error injection."""
+    async def handler(request: web.Request) -> web.Response:
+        provider.counts["requests"] += 1
+        await asyncio.sleep(provider.latency.sample(rng))
+        if provider.error_rate and rng.random() < provider.error_rate:
+            provider.counts["errors"] += 1
+            return server_error(rng)
+        response = respond(request)
+        # Conditional hits are free, as on GitHub
+        if response.status == 304:
+            provider.counts["not_modified"] += 1
+            return response
+        if provider.quota:
+            retry_after = provider.quota.take()
+            if retry_after is not None:
+                provider.counts["rate_limited"] += 1
+                return rate_limited(provider, retry_after)
+            if provider.name == "github":
+                response.headers["X-RateLimit-Limit"] = str(provider.quota.allowed)
+                response.headers["X-RateLimit-Remaining"] = str(provider.quota.remaining())
+                response.headers["X-RateLimit-Reset"] = str(provider.quota.reset_at())
+        return response
+    return handler
+
+def _weather(request: web.Request) -> web.Response:
+    city = request.query.get("q")
+    if not city:
+        return web.json_response({"cod": "400", "message": "Nothing to geocode"}, status=400)
+    if not request.query.get("appid"):
+        return web.json_response({"cod": 401, "message": "Invalid API key."}, status=401)
+    return web.json_response(weather_body(city))
+
+def _search(request: web.Request) -> web.Response:
+    return web.json_response(search_body(request.query.get("q", "")))
+
+def _query(request: web.Request) -> web.Response:
+    function = request.query.get("function")
+    symbol = request.query.get("symbol", "")
+    if function == "TIME_SERIES_DAILY":
+        if not symbol.isalpha():
+            return web.json_response({"Error Message": "Invalid API call."})
+        return web.json_response(daily_series_body(symbol, request.query.get("outputsize", "compact")))
+    if function != "GLOBAL_QUOTE":
+        return web.json_response({"Error Message": "Invalid API call."})
+    if not symbol.isalpha():
+        return web.json_response({"Global Quote": {}})
+    return web.json_response(quote_body(symbol))
+
+def _coin_prices(request: web.Request) -> web.Response:
+    return web.json_response(coin_prices_body(request.query.get("ids", "")))
+
+def _headlines(request: web.Request) -> web.Response:
+    if not request.query.get("apiKey"):
+        return web.json_response({"status": "error", "code": "apiKeyMissing",
+                                  "message": "Your API key is missing."}, status=401)
+    return web.json_response(news_body(request.query.get("category", "general"), request.query.get("country", "us")))
+
+def _repository(request: web.Request) -> web.Response:
+    owner, repo = request.match_info["owner"], request.match_info["repo"]
+    body = json.dumps(repo_body(owner, repo)).encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60, s-maxage=60",
+               "Date": formatdate(usegmt=True)}
+    if request.headers.get("If-None-Match") == etag:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type="application/json", headers=headers)
+
+def default_providers(latency: Optional[LatencyModel] = None, error_rate: float = 0.0,
+                      rate_limits: bool = True) -> Dict[str, FakeProvider]:
+    """One FakeProvider per upstream, sharing the given latency and error rate."""
+    return {
+        name: FakeProvider(name, latency, error_rate, DEFAULT_RATE_LIMITS[name] if rate_limits else None)
+        for name in PROVIDER_SETTINGS
+    }
+
+def load_overrides(providers: Dict[str, FakeProvider], overrides: Dict[str, Any]):
+    """
+    Apply per-provider settings, e.g.
+    {"alphavantage": {"latency": {"kind": "lognormal", "median_ms": 400, "spread": 0.8},
+                      "error_rate": 0.05, "rate_limit": [5, 60]}}
+    """
+    for name, settings in overrides.items():
+        if name not in providers:
+            raise ValueError(f"Unknown provider: {name}")
+        provider = providers[name]
+        if "latency" in settings:
+            provider.latency = LatencyModel(**settings["latency"])
+        if "error_rate" in settings:
+            provider.error_rate = float(settings["error_rate"])
+        if "rate_limit" in settings:
+            provider.quota = FixedWindow(*settings["rate_limit"]) if settings["rate_limit"] else None
+
+PROVIDERS = web.AppKey("providers", Dict[str, FakeProvider])
+
+def create_app(providers: Optional[Dict[str, FakeProvider]] = None, seed: Optional[int] = None) -> web.Application:
+    """Build the fake upstream app; providers default to instant, error-free, real quotas."""
+    providers = default_providers() if providers is None else providers
+    rng = random.Random(seed)
+    routes = {
+        "openweather": [("/openweather/data/2.5/weather", _weather)],
+        "duckduckgo": [("/duckduckgo/", _search)],
+        "alphavantage": [("/alphavantage/query", _query)],
+        "newsapi": [("/newsapi/v2/top-headlines", _headlines)],
+        "github": [("/github/repos/{owner}/{repo}", _repository)],
+        "coingecko": [("/coingecko/api/v3/simple/price", _coin_prices)]
+    }
+
+    app = web.Application()
+    app[PROVIDERS] = providers
+    for name, provider in providers.items():
+        for path, respond in routes[name]:
+            app.router.add_get(path, _route(provider, rng, respond))
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response({name: provider.stats() for name, provider in providers.items()})
+
+    app.router.add_get("/_stats", stats)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve offline fakes of the upstream APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", choices=LATENCY_KINDS, default="fixed", help="Latency distribution")
+    parser.add_argument("--median-ms", type=float, default=0.0, help="Median response delay in milliseconds")
+    parser.add_argument("--spread", type=float, default=0.0,
+                        help="Uniform: +/- fraction of the median. Lognormal: sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered 500/503")
+    parser.add_argument("--no-rate-limits", action="store_true", help="Disable the providers' quotas")
+    parser.add_argument("--config", help="JSON file with per-provider overrides")
+    parser.add_argument("--seed", type=int, help="Seed for latency and error injection")
+    args = parser.parse_args()
+
+    providers = default_providers(LatencyModel(args.latency, args.median_ms, args.spread), args.error_rate,
+                                  not args.no_rate_limits)
+    if args.config:
+        with open(args.config) as f:
+            load_overrides(providers, json.load(f))
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"🧪 Fake upstreams on {base}")
+    for name, setting in PROVIDER_SETTINGS.items():
+        print(f"  {setting}={base}/{name}")
+    web.run_app(create_app(providers, args.seed), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
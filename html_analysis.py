@@ -0,0 +1,269 @@
+"""
+Streaming, single-pass HTML analysis for get_website_info.
+Pages are decoded and parsed chunk by chunk as they download, every metric is
+collected from the same stream of parser events (no tree is built or walked),
+and reading stops at Config.MAX_WEBSITE_SIZE. lxml is used when installed
+(HTML_PARSER=auto or lxml), otherwise the standard library parser.
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, Optional
+
+from config import Config
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+HEADINGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+# Elements whose text get_text() leaves out
+NON_TEXT_TAGS = ("script", "style", "template")
+
+# Bytes inspected for a BOM or <meta charset> when the headers name none
+SNIFF_BYTES = 2048
+
+_HEADER_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+_BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+def available_backend(requested: str = Config.HTML_PARSER) -> str:
+    """The parser backend to use: "lxml" if requested (or auto) and installed, else "html.parser"."""
+    if requested in ("auto", "lxml") and etree is not None:
+        return "lxml"
+    return "html.parser"
+
+def sniff_encoding(head: bytes, content_type: Optional[str] = None) -> str:
+    """Encoding from a BOM, the Content-Type charset, or <meta charset>; utf-8 otherwise."""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    candidates = []
+    match = _HEADER_CHARSET.search(content_type or "")
+    if match:
+        candidates.append(match.group(1))
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+    for candidate in candidates:
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+class PageMetrics:
+    """
+    Collects the get_website_info metrics from start / end / data events.
+    Words are counted like BeautifulSoup's get_text().split(): text from
+    adjacent nodes joins up, so "foo<b>bar</b>" is one word, and script,
+    style and template contents are skipped.
+    With collect_links=True, link targets are kept in `hrefs` for crawling, and
+    with collect_assets=True (kind, url) pairs for images, scripts and
+    stylesheets are kept in `assets` for page weight measurement.
+    """
+
+    def __init__(self, collect_links: bool = False, collect_assets: bool = False):
+        self.title = None
+        self.description = None
+        self.language = None
+        self.headings = dict.fromkeys(HEADINGS, 0)
+        self.images = 0
+        self.links = 0
+        self.word_count = 0
+        self.hrefs = [] if collect_links else None
+        self.assets = [] if collect_assets else None
+        self.base_href = None
+        self.canonical = None
+        self.robots = ""
+        self._in_title = False
+        self._title_parts = []
+        self._mid_word = False
+        self._skip_depth = 0
+
+    def start(self, tag: str, attrs: Dict[str, Optional[str]]):
+        if tag in NON_TEXT_TAGS:
+            self._skip_depth += 1
+            if tag == "script" and self.assets is not None and attrs.get("src"):
+                self.assets.append(("script", attrs["src"]))
+        elif tag in self.headings:
+            self.headings[tag] += 1
+        elif tag == "a":
+            self.links += 1
+            if self.hrefs is not None and attrs.get("href"):
+                self.hrefs.append(attrs["href"])
+        elif tag == "img":
+            self.images += 1
+            if self.assets is not None and attrs.get("src"):
+                self.assets.append(("image", attrs["src"]))
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+        elif tag == "meta":
+            name = attrs.get("name")
+            if name == "description" and self.description is None:
+                self.description = attrs.get("content") or ""
+            elif name and name.lower() == "robots":
+                self.robots = (attrs.get("content") or "").lower()
+        elif tag == "link":
+            rel = (attrs.get("rel") or "").lower().split()
+            if "canonical" in rel and self.canonical is None:
+                self.canonical = attrs.get("href")
+            elif "stylesheet" in rel and self.assets is not None and attrs.get("href"):
+                self.assets.append(("stylesheet", attrs["href"]))
+        elif tag == "base" and self.base_href is None and attrs.get("href"):
+            self.base_href = attrs["href"]
+        elif tag == "html" and self.language is None and attrs.get("lang"):
+            self.language = attrs["lang"]
+
+    def end(self, tag: str):
+        if tag in NON_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self.title = "".join(self._title_parts)
+
+    def data(self, text: str):
+        if not text or self._skip_depth:
+            return
+        if self._in_title:
+            self._title_parts.append(text)
+        words = len(text.split())
+        if words and self._mid_word and not text[0].isspace():
+            words -= 1
+        self.word_count += words
+        self._mid_word = not text[-1].isspace()
+
+    def result(self) -> Dict[str, Any]:
+        if self._in_title:
+            self.title = "".join(self._title_parts)
+        return {
+            "title": (self.title if self.title is not None else "No title found").strip(),
+            "description": (self.description if self.description is not None else "No description found").strip(),
+            "word_count": self.word_count,
+            "headings": {
+                "h1": self.headings["h1"],
+                "h2": self.headings["h2"],
+                "h3": self.headings["h3"],
+                "total": sum(self.headings.values())
+            },
+            "images": self.images,
+            "links": self.links,
+            "language": self.language or "Unknown"
+        }
+
+class _StdlibParser(HTMLParser):
+    """html.parser front end forwarding events to PageMetrics."""
+
+    def __init__(self, metrics: PageMetrics):
+        super().__init__(convert_charrefs=True)
+        self.metrics = metrics
+
+    def handle_starttag(self, tag, attrs):
+        self.metrics.start(tag, dict(attrs))
+
+    def handle_startendtag(self, tag, attrs):
+        self.metrics.start(tag, dict(attrs))
+        self.metrics.end(tag)
+
+    def handle_endtag(self, tag):
+        self.metrics.end(tag)
+
+    def handle_data(self, data):
+        self.metrics.data(data)
+
+class _LxmlTarget:
+    """lxml parser target forwarding events to PageMetrics."""
+
+    def __init__(self, metrics: PageMetrics):
+        self.metrics = metrics
+
+    def start(self, tag, attrib):
+        self.metrics.start(tag, dict(attrib))
+
+    def end(self, tag):
+        self.metrics.end(tag)
+
+    def data(self, data):
+        self.metrics.data(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        return None
+
+class StreamingPageAnalyzer:
+    """
+    Feed raw body chunks as they arrive; feed() returns False once
+    max_bytes have been read, and the caller should stop downloading.
+    """
+
+    def __init__(self, content_type: Optional[str] = None, max_bytes: int = Config.MAX_WEBSITE_SIZE,
+                 backend: str = Config.HTML_PARSER, collect_links: bool = False, collect_assets: bool = False):
+        self.content_type = content_type
+        self.max_bytes = max_bytes
+        self.backend = available_backend(backend)
+        self.metrics = PageMetrics(collect_links, collect_assets)
+        self.bytes_read = 0
+        self.truncated = False
+        self.encoding = None
+        self._head = b""
+        self._decoder = None
+        self._parser = None
+
+    def _start(self, head: bytes):
+        self.encoding = sniff_encoding(head, self.content_type)
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        if self.backend == "lxml":
+            self._parser = etree.HTMLParser(target=_LxmlTarget(self.metrics), recover=True)
+        else:
+            self._parser = _StdlibParser(self.metrics)
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.truncated:
+            return False
+        room = self.max_bytes - self.bytes_read
+        if len(chunk) > room:
+            chunk, self.truncated = chunk[:room], True
+        self.bytes_read += len(chunk)
+
+        if self._parser is None:
+            # Hold the first bytes back until the encoding can be sniffed
+            self._head += chunk
+            if len(self._head) < SNIFF_BYTES and not self.truncated:
+                return True
+            chunk, self._head = self._head, b""
+            self._start(chunk)
+        text = self._decoder.decode(chunk)
+        if text:
+            self._parser.feed(text)
+        return not self.truncated
+
+    def close(self) -> Dict[str, Any]:
+        """Finish parsing and return the page metrics."""
+        if self._parser is None:
+            self._start(self._head)
+            self._parser.feed(self._decoder.decode(self._head))
+        text = self._decoder.decode(b"", final=True)
+        if text:
+            self._parser.feed(text)
+        try:
+            self._parser.close()
+        except Exception:
+            # lxml raises on documents with no content; the metrics are still valid
+            pass
+        result = self.metrics.result()
+        result.update({"content_length": self.bytes_read, "charset": self.encoding})
+        if self.truncated:
+            result["truncated"] = True
+        return result
+
+def analyze_html(content: bytes, content_type: Optional[str] = None, max_bytes: int = Config.MAX_WEBSITE_SIZE,
+                 backend: str = Config.HTML_PARSER) -> Dict[str, Any]:
+    """Analyze an already downloaded page in one pass."""
+    analyzer = StreamingPageAnalyzer(content_type, max_bytes, backend)
+    analyzer.feed(content)
+    return analyzer.close()
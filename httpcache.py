@@ -0,0 +1,205 @@
+"""
+HTTP-level response cache used by the shared transport.
+Stores response bodies with their validators (ETag / Last-Modified), serves
+them while fresh per Cache-Control max-age / Expires, and revalidates stale
+entries with If-None-Match / If-Modified-Since so an unchanged upstream answers
+304 (which GitHub does not count against its rate limit).
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from requests.structures import CaseInsensitiveDict
+
+from cache import MISS, TTLCache
+from config import Config
+
+# Response headers kept with a cached body
+STORED_HEADERS = (
+    "Content-Type", "Cache-Control", "Expires", "Date", "ETag", "Last-Modified", "Server", "Content-Language"
+)
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into {directive: argument or None}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, sep, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if sep else None
+    return directives
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def freshness_lifetime(headers, heuristic_max: float = Config.HTTP_CACHE_HEURISTIC_MAX) -> Optional[float]:
+    """
+    Seconds a response stays fresh, 0 if it must be revalidated before reuse,
+    or None if it must not be stored at all.
+    """
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+
+    try:
+        age = float(headers.get("Age") or 0)
+    except ValueError:
+        age = 0.0
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]) - age)
+        except (TypeError, ValueError):
+            return 0.0
+
+    date = _http_date(headers.get("Date")) or time.time()
+    expires = _http_date(headers.get("Expires"))
+    if headers.get("Expires") is not None:
+        return max(0.0, expires - date) if expires is not None else 0.0
+
+    # Heuristic freshness: 10% of the time since last modification
+    last_modified = _http_date(headers.get("Last-Modified"))
+    if last_modified is not None:
+        return min(max(0.0, (date - last_modified) * 0.1), heuristic_max)
+    return 0.0
+
+class CachedResponse:
+    """
+    A stored response body with its validators. Exposes the parts of
+    requests.Response the actions use, so hits can be returned in its place.
+    """
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str, encoding: Optional[str], lifetime: float):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict({name: headers[name] for name in STORED_HEADERS if headers.get(name) is not None})
+        self.content = content
+        self.url = url
+        self.encoding = encoding
+        self.fresh_until = time.monotonic() + lifetime
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.fresh_until
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.headers.get("ETag"):
+            headers["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def refresh(self, headers, lifetime: float):
+        """Apply the headers of a 304 Not Modified to this entry."""
+        for name in STORED_HEADERS:
+            if headers.get(name) is not None and name != "Content-Type":
+                self.headers[name] = headers[name]
+        self.fresh_until = time.monotonic() + lifetime
+
+class HTTPCache:
+    """
+    Bounded in-memory HTTP cache. Entries are kept for `retention` seconds
+    after their last store so stale bodies can still be revalidated.
+    Counts fresh hits, revalidations (304) and misses.
+    """
+
+    def __init__(self, max_entries: int = Config.HTTP_CACHE_MAX_ENTRIES, max_body: int = Config.HTTP_CACHE_MAX_BODY,
+                 retention: float = Config.HTTP_CACHE_RETENTION, enabled: bool = Config.HTTP_CACHE_ENABLED):
+        self.max_body = max_body
+        self.retention = retention
+        self.enabled = enabled
+        self._store = TTLCache(max_size=max_entries, eviction="lru")
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> str:
+        """Cache key from everything that selects the representation."""
+        return json.dumps([url, sorted((params or {}).items()), sorted((headers or {}).items())], default=str)
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        """Return the entry for key (fresh or stale), or None."""
+        if not self.enabled:
+            return None
+        entry = self._store.get(key, allow_stale=True)
+        return None if entry is MISS else entry
+
+    def serve(self, entry: CachedResponse) -> CachedResponse:
+        """Record and return a fresh hit."""
+        self._count("hits")
+        return entry
+
+    def serve_stale(self, entry: CachedResponse) -> CachedResponse:
+        """Record and return a stale entry served because the upstream is unavailable."""
+        self._count("stale")
+        return entry
+
+    def complete(self, key: str, entry: Optional[CachedResponse], response):
+        """
+        Handle the upstream response to a (possibly conditional) request:
+        a 304 refreshes and returns the stored entry, a cacheable 200 is stored.
+        """
+        lifetime = freshness_lifetime(response.headers)
+        if entry is not None and response.status_code == 304:
+            entry.refresh(response.headers, lifetime or 0.0)
+            self._store.set(key, entry, self.retention)
+            self._count("revalidated")
+            return entry
+
+        self._count("misses")
+        if response.status_code != 200 or lifetime is None or len(response.content or b"") > self.max_body:
+            if lifetime is None:
+                self._store.delete(key)
+            return response
+        if lifetime <= 0 and not (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            return response
+
+        stored = CachedResponse(response.status_code, response.headers, response.content, str(response.url),
+                                response.encoding, lifetime)
+        self._store.set(key, stored, self.retention)
+        self._count("stores")
+        return response
+
+    def clear(self):
+        self._store.clear()
+        with self._lock:
+            self._counts.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, revalidated, misses = self._counts["hits"], self._counts["revalidated"], self._counts["misses"]
+            stores, stale = self._counts["stores"], self._counts["stale"]
+        requests = hits + revalidated + misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._store),
+            "hits": hits,
+            "revalidated": revalidated,
+            "misses": misses,
+            "stale": stale,
+            "stores": stores,
+            "hit_rate": round((hits + revalidated) / requests, 3) if requests else 0.0
+        }
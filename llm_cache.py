@@ -0,0 +1,137 @@
+"""
+Content-addressed, disk-backed cache for LLM completions.
+With low temperature and fixed prompts, the same message history produces the
+same completion, so repeated batch runs can skip inference entirely.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+class CompletionCache:
+    """
+    Stores completions as one JSON file per key under a directory, sharded by
+    the first two hex digits. Reads refresh the file's mtime, so trimming the
+    oldest mtimes evicts the least recently used entries.
+    Disabled unless LLM_CACHE_ENABLED is set (opt-in).
+    """
+
+    def __init__(self, directory: str = Config.LLM_CACHE_DIR, max_entries: int = Config.LLM_CACHE_MAX_ENTRIES,
+                 enabled: bool = Config.LLM_CACHE_ENABLED):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entry_count = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(backend: str, model: str, options: Dict[str, Any], messages: List[Dict[str, str]]) -> str:
+        """Hash everything that determines the completion."""
+        payload = json.dumps(
+            {"backend": backend, "model": model, "options": options, "messages": messages},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                completion = json.load(f)["completion"]
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return completion
+
+    def put(self, key: str, completion: str, **metadata):
+        if not self.enabled or completion is None or completion.startswith("Error:"):
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so concurrent readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"completion": completion, "created": time.time(), **metadata}, f)
+            existed = os.path.exists(path)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        if not existed:
+            self._on_insert()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+    def _on_insert(self):
+        with self._lock:
+            if self._entry_count is None:
+                self._entry_count = sum(1 for _ in self._entries())
+            else:
+                self._entry_count += 1
+            if self._entry_count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        """Trim to 90% of max_entries so eviction scans are amortized over many inserts."""
+        entries = []
+        for path in self._entries():
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort()
+        target = int(self.max_entries * 0.9)
+        for _, path in entries[:max(0, len(entries) - target)]:
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+        self._entry_count = min(len(entries), target)
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._entries()):
+                os.remove(path)
+            self._entry_count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            "enabled": self.enabled,
+            "directory": self.directory,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "evictions": evictions,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0
+        }
+
+# Shared cache used by generate_text_with_conversation in main.py and main_ollama.py
+completion_cache = CompletionCache()
@@ -1,23 +1,40 @@
 import json
 import re
 import os
-from openai import OpenAI
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
 from actions import (
     get_response_time, 
+    get_response_times,
     get_weather_info, 
     calculate_math_expression, 
     get_current_time, 
     search_web,
     get_stock_price,
+    get_stock_prices,
+    get_price_history,
+    analyze_portfolio,
     get_news_headlines,
     analyze_text_sentiment,
     get_website_info,
+    get_page_weight,
+    crawl_site,
     perform_data_analysis,
     translate_text,
     get_crypto_price,
-    get_github_repo_info
+    get_github_repo_info,
+    async_available_actions,
+    price_feed,
+    fallback_actions
 )
+from config import Config
+from cache import action_cache
+from llm_cache import completion_cache
+from answer_cache import answer_cache
+from cascade import cascade_stats, check_turn, parse_models
+from streaming import ActionStreamMonitor
 from prompts import (
     basic_system_prompt, 
     advanced_system_prompt, 
@@ -31,30 +48,130 @@ load_dotenv()
 
 # Create an instance of the OpenAI class (will be initialized when needed)
 openai_client = None
+async_openai_client = None
 
-def generate_text_with_conversation(messages, model="gpt-3.5-turbo"):
+def _completion_key(messages, model, stream):
+    """Cache key for an OpenAI completion with this module's fixed sampling options."""
+    options = {"temperature": 0.1, "max_tokens": 1000, "stream": stream}
+    return completion_cache.key("openai", model, options, messages)
+
+def generate_text_with_conversation(messages, model="gpt-3.5-turbo", stream=False, use_cache=True):
     """
     Generate text using OpenAI API with conversation context.
+    With stream=True, tokens are parsed as they arrive and generation is
+    cancelled as soon as the action JSON or PAUSE is complete.
+    When the completion cache is enabled, use_cache=False bypasses it.
     """
     global openai_client
     
+    # Serve identical requests from the completion cache (opt-in via LLM_CACHE_ENABLED)
+    cache_key = _completion_key(messages, model, stream)
+    if use_cache:
+        cached = completion_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
     # Initialize OpenAI client if not already done
     if openai_client is None:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             return "Error: OPENAI_API_KEY not found in environment variables"
-        openai_client = OpenAI(api_key=api_key)
+        openai_client = OpenAI(api_key=api_key, base_url=Config.OPENAI_BASE_URL)
+    
+    try:
+        if stream:
+            text = _generate_streaming(messages, model)
+        else:
+            response = openai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,  # Lower temperature for more consistent function calling
+                max_tokens=1000
+            )
+            text = response.choices[0].message.content
+    except Exception as e:
+        return f"Error: {str(e)}"
+    
+    if use_cache:
+        completion_cache.put(cache_key, text, backend="openai", model=model)
+    return text
+
+def _generate_streaming(messages, model):
+    """
+    Stream a completion and stop reading once the action turn is complete.
+    """
+    monitor = ActionStreamMonitor()
+    stream = openai_client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=0.1,
+        max_tokens=1000,
+        stream=True
+    )
+    try:
+        for chunk in stream:
+            if chunk.choices and monitor.feed(chunk.choices[0].delta.content):
+                break
+    finally:
+        # Closing the connection cancels generation server-side
+        stream.response.close()
+    return monitor.result()
+
+async def generate_text_with_conversation_async(messages, model="gpt-3.5-turbo", stream=False, use_cache=True):
+    """
+    Async variant of generate_text_with_conversation using AsyncOpenAI.
+    """
+    global async_openai_client
+    
+    cache_key = _completion_key(messages, model, stream)
+    if use_cache:
+        cached = completion_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    if async_openai_client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return "Error: OPENAI_API_KEY not found in environment variables"
+        async_openai_client = AsyncOpenAI(api_key=api_key, base_url=Config.OPENAI_BASE_URL)
     
     try:
-        response = openai_client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=0.1,  # Lower temperature for more consistent function calling
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
+        if stream:
+            text = await _generate_streaming_async(messages, model)
+        else:
+            response = await async_openai_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=1000
+            )
+            text = response.choices[0].message.content
     except Exception as e:
         return f"Error: {str(e)}"
+    
+    if use_cache:
+        completion_cache.put(cache_key, text, backend="openai", model=model)
+    return text
+
+async def _generate_streaming_async(messages, model):
+    """
+    Async variant of _generate_streaming.
+    """
+    monitor = ActionStreamMonitor()
+    stream = await async_openai_client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=0.1,
+        max_tokens=1000,
+        stream=True
+    )
+    try:
+        async for chunk in stream:
+            if chunk.choices and monitor.feed(chunk.choices[0].delta.content):
+                break
+    finally:
+        await stream.response.aclose()
+    return monitor.result()
 
 def extract_json(response):
     """
@@ -84,46 +201,143 @@ def extract_json(response):
     
     return None
 
+# Map of action names the LLM may call to their implementations
+available_actions = {
+    "get_response_time": get_response_time,
+    "get_response_times": get_response_times,
+    "get_weather_info": get_weather_info,
+    "calculate_math_expression": calculate_math_expression,
+    "get_current_time": get_current_time,
+    "search_web": search_web,
+    "get_stock_price": get_stock_price,
+    "get_stock_prices": get_stock_prices,
+    "get_price_history": get_price_history,
+    "analyze_portfolio": analyze_portfolio,
+    "get_news_headlines": get_news_headlines,
+    "analyze_text_sentiment": analyze_text_sentiment,
+    "get_website_info": get_website_info,
+    "get_page_weight": get_page_weight,
+    "crawl_site": crawl_site,
+    "perform_data_analysis": perform_data_analysis,
+    "translate_text": translate_text,
+    "get_crypto_price": get_crypto_price,
+    "get_github_repo_info": get_github_repo_info
+}
+
+def extract_actions(response):
+    """
+    Extract every JSON function call from the LLM response.
+    Accepts a single action object, several action objects, or a JSON list of them.
+    """
+    decoder = json.JSONDecoder()
+    function_calls = []
+    index = 0
+    
+    while True:
+        match = re.compile(r'[\[{]').search(response, index)
+        if not match:
+            break
+        try:
+            value, end = decoder.raw_decode(response, match.start())
+        except json.JSONDecodeError:
+            index = match.start() + 1
+            continue
+        
+        candidates = value if isinstance(value, list) else [value]
+        found = [c for c in candidates if isinstance(c, dict) and "function_name" in c]
+        function_calls.extend(found)
+        # Skip past a matched action, otherwise keep scanning inside the value
+        index = end if found else match.start() + 1
+    
+    if not function_calls:
+        # Fall back to the single-action contract
+        json_function = extract_json(response)
+        if json_function:
+            function_calls.append(json_function)
+    
+    return function_calls
+
 def execute_function(function_name, function_params):
     """
     Execute the specified function with the given parameters.
     """
-    available_actions = {
-        "get_response_time": get_response_time,
-        "get_weather_info": get_weather_info,
-        "calculate_math_expression": calculate_math_expression,
-        "get_current_time": get_current_time,
-        "search_web": search_web,
-        "get_stock_price": get_stock_price,
-        "get_news_headlines": get_news_headlines,
-        "analyze_text_sentiment": analyze_text_sentiment,
-        "get_website_info": get_website_info,
-        "perform_data_analysis": perform_data_analysis,
-        "translate_text": translate_text,
-        "get_crypto_price": get_crypto_price,
-        "get_github_repo_info": get_github_repo_info
-    }
-    
     if function_name in available_actions:
         try:
-            if function_params:
-                result = available_actions[function_name](**function_params)
-            else:
-                result = available_actions[function_name]()
+            # Served from the shared per-tool TTL cache when fresh, with a stale or
+            # offline fallback when the upstream is unavailable
+            result = action_cache.call(function_name, available_actions[function_name], function_params,
+                                       fallback_actions.get(function_name))
             return str(result)
         except Exception as e:
             return f"Error executing {function_name}: {str(e)}"
     else:
         return f"Function {function_name} not found"
 
-def run_ai_agent(user_question, system_prompt=basic_system_prompt, model="gpt-3.5-turbo"):
+def execute_functions(function_calls):
     """
-    Run the AI agent with the ReAct loop.
+    Execute several function calls concurrently, returning results in call order.
     """
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_question}
-    ]
+    def run(call):
+        return execute_function(call.get("function_name"), call.get("function_parms", {}))
+    
+    if len(function_calls) == 1:
+        return [run(function_calls[0])]
+    
+    max_workers = min(len(function_calls), Config.MAX_PARALLEL_ACTIONS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, function_calls))
+
+def format_action_response(function_calls, function_results):
+    """
+    Combine the results of one LLM turn's function calls into a single message.
+    """
+    if len(function_results) == 1:
+        return f"Action_Response: {function_results[0]}"
+    
+    lines = [f"{call.get('function_name')}: {result}" for call, result in zip(function_calls, function_results)]
+    return "Action_Response:\n" + "\n".join(lines)
+
+async def execute_function_async(function_name, function_params):
+    """
+    Execute the specified function without blocking the event loop.
+    Network actions use their aiohttp variants; the rest run in a worker thread.
+    """
+    if function_name not in available_actions:
+        return f"Function {function_name} not found"
+    
+    function_params = function_params or {}
+    try:
+        if function_name in async_available_actions:
+            result = await action_cache.call_async(function_name, async_available_actions[function_name], function_params,
+                                                   fallback_actions.get(function_name))
+        else:
+            result = await asyncio.to_thread(action_cache.call, function_name, available_actions[function_name], function_params,
+                                             fallback_actions.get(function_name))
+        return str(result)
+    except Exception as e:
+        return f"Error executing {function_name}: {str(e)}"
+
+async def execute_functions_async(function_calls):
+    """
+    Execute several function calls concurrently on the event loop, returning results in call order.
+    """
+    semaphore = asyncio.Semaphore(Config.MAX_PARALLEL_ACTIONS)
+    
+    async def run(call):
+        async with semaphore:
+            return await execute_function_async(call.get("function_name"), call.get("function_parms", {}))
+    
+    return await asyncio.gather(*(run(call) for call in function_calls))
+
+def _agent_loop(messages, model, stream=False, use_cache=True, strict=False):
+    """
+    Drive the ReAct loop over messages until the LLM gives a final answer.
+    Returns (response, failure, tools_used), where failure is one of
+    cascade.ESCALATION_REASONS, or None when the response is a usable answer.
+    With strict=True, a turn naming an unknown function ends the loop instead
+    of reporting the error back to the LLM.
+    """
+    tools_used = set()
     
     max_iterations = 5  # Prevent infinite loops
     iteration = 0
@@ -133,35 +347,172 @@ def run_ai_agent(user_question, system_prompt=basic_system_prompt, model="gpt-3.
         print(f"\n--- Iteration {iteration} ---")
         
         # Generate response from LLM
-        response = generate_text_with_conversation(messages, model)
+        response = generate_text_with_conversation(messages, model, stream, use_cache)
         print(f"LLM Response: {response}")
         
         # Check if response contains PAUSE (indicating function execution needed)
         if "PAUSE" in response:
-            # Extract function call
-            json_function = extract_json(response)
+            # Extract function calls (the LLM may request several at once)
+            function_calls = extract_actions(response)
+            failure = check_turn(response, function_calls, available_actions)
             
-            if json_function:
-                function_name = json_function.get("function_name")
-                function_params = json_function.get("function_parms", {})
+            if function_calls and not (strict and failure):
+                for call in function_calls:
+                    print(f"Executing function: {call.get('function_name')} with params: {call.get('function_parms', {})}")
                 
-                print(f"Executing function: {function_name} with params: {function_params}")
+                # Execute the functions concurrently
+                function_results = execute_functions(function_calls)
+                tools_used.update(call.get("function_name") for call in function_calls)
+                for function_result in function_results:
+                    print(f"Function result: {function_result}")
                 
-                # Execute the function
-                function_result = execute_function(function_name, function_params)
-                print(f"Function result: {function_result}")
-                
-                # Add the function result to messages for next iteration
-                function_result_message = f"Action_Response: {function_result}"
+                # Add all function results to messages for next iteration
+                function_result_message = format_action_response(function_calls, function_results)
                 messages.append({"role": "assistant", "content": response})
                 messages.append({"role": "user", "content": function_result_message})
+            elif function_calls:
+                print("Unknown function requested")
+                return response, failure, tools_used
             else:
                 print("No valid function call found in response")
-                break
+                return response, failure, tools_used
         else:
             # No PAUSE found, agent has provided final answer
             print("Final answer received!")
-            break
+            return response, check_turn(response, [], available_actions), tools_used
+    
+    return response, "max_iterations", tools_used
+
+def run_ai_agent(user_question, system_prompt=basic_system_prompt, model="gpt-3.5-turbo", stream=False, use_cache=True):
+    """
+    Run the AI agent with the ReAct loop.
+    Pass stream=True to stop each generation as soon as its action is complete,
+    and use_cache=False to bypass the completion and answer caches.
+    """
+    # Near-duplicate questions can reuse a stored answer (opt-in via ANSWER_CACHE_ENABLED)
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            print("Answer served from cache!")
+            return cached_answer
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_question}
+    ]
+    response, failure, tools_used = _agent_loop(messages, model, stream, use_cache)
+    
+    if failure is None and use_cache:
+        answer_cache.store(user_question, system_prompt, response, tools_used)
+    return response
+
+def run_ai_agent_cascade(user_question, system_prompt=basic_system_prompt, models=None, stream=False, use_cache=True):
+    """
+    Run the AI agent on a cascade of models, smallest first (OPENAI_CASCADE_MODELS).
+    A tier's answer is returned unless it produced an unparsable action, named an
+    unknown function or hit the iteration limit; then the question starts over on
+    the next tier (repeated tool calls are served by the action cache).
+    Per-tier outcomes are recorded in cascade.cascade_stats.
+    """
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            print("Answer served from cache!")
+            return cached_answer
+    
+    models = models or parse_models(Config.OPENAI_CASCADE_MODELS)
+    for tier, model in enumerate(models, 1):
+        print(f"\n=== Cascade tier {tier}/{len(models)}: {model} ===")
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_question}
+        ]
+        response, failure, tools_used = _agent_loop(messages, model, stream, use_cache, strict=True)
+        cascade_stats.record(model, failure)
+        
+        if failure is None:
+            if use_cache:
+                answer_cache.store(user_question, system_prompt, response, tools_used)
+            return response
+        print(f"Escalating from {model}: {failure}")
+    
+    return response
+
+async def _agent_loop_async(messages, model, stream=False, use_cache=True, strict=False):
+    """
+    Async variant of _agent_loop.
+    """
+    tools_used = set()
+    
+    max_iterations = 5  # Prevent infinite loops
+    iteration = 0
+    
+    while iteration < max_iterations:
+        iteration += 1
+        
+        response = await generate_text_with_conversation_async(messages, model, stream, use_cache)
+        
+        if "PAUSE" in response:
+            function_calls = extract_actions(response)
+            failure = check_turn(response, function_calls, available_actions)
+            
+            if function_calls and not (strict and failure):
+                function_results = await execute_functions_async(function_calls)
+                tools_used.update(call.get("function_name") for call in function_calls)
+                
+                function_result_message = format_action_response(function_calls, function_results)
+                messages.append({"role": "assistant", "content": response})
+                messages.append({"role": "user", "content": function_result_message})
+            else:
+                return response, failure, tools_used
+        else:
+            return response, check_turn(response, [], available_actions), tools_used
+    
+    return response, "max_iterations", tools_used
+
+async def run_ai_agent_async(user_question, system_prompt=basic_system_prompt, model="gpt-3.5-turbo", stream=False, use_cache=True):
+    """
+    Run the AI agent with the ReAct loop without blocking the event loop.
+    Many sessions can be driven concurrently from one process, e.g. with asyncio.gather().
+    """
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            return cached_answer
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_question}
+    ]
+    response, failure, tools_used = await _agent_loop_async(messages, model, stream, use_cache)
+    
+    if failure is None and use_cache:
+        answer_cache.store(user_question, system_prompt, response, tools_used)
+    return response
+
+async def run_ai_agent_cascade_async(user_question, system_prompt=basic_system_prompt, models=None, stream=False,
+                                     use_cache=True):
+    """
+    Async variant of run_ai_agent_cascade.
+    """
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            return cached_answer
+    
+    models = models or parse_models(Config.OPENAI_CASCADE_MODELS)
+    for model in models:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_question}
+        ]
+        response, failure, tools_used = await _agent_loop_async(messages, model, stream, use_cache, strict=True)
+        cascade_stats.record(model, failure)
+        
+        if failure is None:
+            if use_cache:
+                answer_cache.store(user_question, system_prompt, response, tools_used)
+            return response
     
     return response
 
@@ -250,8 +601,10 @@ def interactive_mode():
                 continue
             
             # Model selection
-            model_choice = input("Select model (1: gpt-4, 2: gpt-3.5-turbo, 3: gpt-4-turbo): ").strip()
-            if model_choice == "1":
+            model_choice = input("Select model (1: gpt-4, 2: gpt-3.5-turbo, 3: gpt-4-turbo, 4: cascade): ").strip()
+            if model_choice == "4":
+                model = "cascade"
+            elif model_choice == "1":
                 model = "gpt-4"
             elif model_choice == "2":
                 model = "gpt-3.5-turbo"
@@ -265,7 +618,10 @@ def interactive_mode():
             if question.lower() in ['quit', 'exit', 'q']:
                 break
                 
-            result = run_ai_agent(question, system_prompt, model)
+            if model == "cascade":
+                result = run_ai_agent_cascade(question, system_prompt)
+            else:
+                result = run_ai_agent(question, system_prompt, model)
             print(f"\nFinal Answer: {result}")
             
         except KeyboardInterrupt:
@@ -281,14 +637,20 @@ def show_available_functions():
     print("=== Available Functions ===")
     functions = {
         "get_response_time": "Get website response time and performance metrics",
+        "get_response_times": "Probe many websites at once with DNS/connect/TLS/TTFB timings",
         "get_weather_info": "Get weather information for a city",
         "calculate_math_expression": "Calculate mathematical expressions with analysis",
         "get_current_time": "Get current time with timezone info",
         "search_web": "Search the web using DuckDuckGo",
         "get_stock_price": "Get real-time stock prices",
+        "get_stock_prices": "Get quotes for several stock symbols in one table",
+        "get_price_history": "Price trend with moving averages, RSI, volatility and drawdown",
+        "analyze_portfolio": "Portfolio returns, correlation, VaR/CVaR and per-position risk contribution",
         "get_news_headlines": "Get latest news headlines",
         "analyze_text_sentiment": "Analyze text sentiment",
         "get_website_info": "Get comprehensive website information",
+        "get_page_weight": "Measure total page weight with the largest and slowest assets",
+        "crawl_site": "Crawl a whole site and aggregate its SEO issues into one report",
         "perform_data_analysis": "Analyze JSON/CSV data",
         "translate_text": "Translate text to different languages",
         "get_crypto_price": "Get cryptocurrency prices",
@@ -316,6 +678,10 @@ if __name__ == "__main__":
     # Show available functions
     show_available_functions()
     
+    # Keep watched stock and crypto prices in memory
+    if Config.PRICE_FEED_ENABLED:
+        price_feed.start()
+    
     # Run tests
     try:
         test_basic_agent()
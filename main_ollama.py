@@ -7,23 +7,41 @@ This provides unlimited AI responses without OpenAI quota limits.
 import json
 import re
 import os
-from ollama import Client
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from ollama import Client, AsyncClient
 from dotenv import load_dotenv
 from actions import (
     get_response_time, 
+    get_response_times,
     get_weather_info, 
     calculate_math_expression, 
     get_current_time, 
     search_web,
     get_stock_price,
+    get_stock_prices,
+    get_price_history,
+    analyze_portfolio,
     get_news_headlines,
     analyze_text_sentiment,
     get_website_info,
+    get_page_weight,
+    crawl_site,
     perform_data_analysis,
     translate_text,
     get_crypto_price,
-    get_github_repo_info
+    get_github_repo_info,
+    async_available_actions,
+    price_feed,
+    fallback_actions
 )
+from config import Config
+from cache import action_cache
+from llm_cache import completion_cache
+from answer_cache import answer_cache
+from scheduler import model_scheduler
+from cascade import cascade_stats, check_turn, parse_models
+from streaming import ActionStreamMonitor
 from prompts import (
     basic_system_prompt, 
     advanced_system_prompt, 
@@ -35,30 +53,95 @@ from prompts import (
 # Load environment variables
 load_dotenv()
 
-# Create Ollama client
-ollama_client = Client(host='http://localhost:11434')
+# Create Ollama clients
+ollama_client = Client(host=Config.OLLAMA_HOST)
+async_ollama_client = AsyncClient(host=Config.OLLAMA_HOST)
 
-def generate_text_with_conversation(messages, model="llama3.1:8b"):
+def build_prompt(messages):
+    """
+    Convert OpenAI format messages to a single Ollama prompt string.
+    """
+    prompt = ""
+    for msg in messages:
+        if msg["role"] == "system":
+            prompt += f"System: {msg['content']}\n\n"
+        elif msg["role"] == "user":
+            prompt += f"User: {msg['content']}\n\n"
+        elif msg["role"] == "assistant":
+            prompt += f"Assistant: {msg['content']}\n\n"
+    
+    prompt += "Assistant: "
+    return prompt
+
+def _completion_backend(incremental):
+    """Completion cache backend tag; chat and generate completions are kept apart."""
+    return "ollama-chat" if incremental else "ollama"
+
+def _completion_key(messages, model, stream, incremental):
+    """Cache key for an Ollama completion with this module's fixed sampling options."""
+    options = {"temperature": 0.1, "num_predict": 1000, "stream": stream}
+    return completion_cache.key(_completion_backend(incremental), model, options, messages)
+
+def generate_text_with_conversation(messages, model="llama3.1:8b", stream=False, incremental=False, use_cache=True,
+                                    priority="default"):
     """
     Generate text using Ollama with conversation context.
+    With stream=True, tokens are parsed as they arrive and generation is
+    cancelled as soon as the action JSON or PAUSE is complete.
+    With incremental=True, the chat endpoint is used so only new messages are prefilled.
+    When the completion cache is enabled, use_cache=False bypasses it.
+    Requests wait in model_scheduler for a slot on their model; priority is
+    "interactive", "default" or "batch".
+    """
+    # Serve identical requests from the completion cache (opt-in via LLM_CACHE_ENABLED)
+    cache_key = _completion_key(messages, model, stream, incremental)
+    if use_cache:
+        cached = completion_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    with model_scheduler.slot(model, priority):
+        if incremental:
+            text = chat_with_conversation(messages, model, stream)
+        else:
+            text = _generate_with_prompt(messages, model, stream)
+    
+    if use_cache:
+        completion_cache.put(cache_key, text, backend=_completion_backend(incremental), model=model)
+    return text
+
+def _generate_with_prompt(messages, model, stream):
+    """
+    Generate through Ollama's generate endpoint with the history flattened into one prompt.
     """
     try:
         # Convert OpenAI format to Ollama format
-        prompt = ""
-        for msg in messages:
-            if msg["role"] == "system":
-                prompt += f"System: {msg['content']}\n\n"
-            elif msg["role"] == "user":
-                prompt += f"User: {msg['content']}\n\n"
-            elif msg["role"] == "assistant":
-                prompt += f"Assistant: {msg['content']}\n\n"
-        
-        prompt += "Assistant: "
+        prompt = build_prompt(messages)
         
         # Debug output
         print(f"Debug: Using model: {model}")
         print(f"Debug: Prompt length: {len(prompt)} characters")
         
+        if stream:
+            monitor = ActionStreamMonitor()
+            chunks = ollama_client.generate(
+                model=model,
+                prompt=prompt,
+                options={
+                    'temperature': 0.1,
+                    'num_predict': 1000
+                },
+                stream=True
+            )
+            try:
+                for chunk in chunks:
+                    if monitor.feed(chunk['response']):
+                        break
+            finally:
+                # Closing the stream drops the connection, which stops Ollama generating
+                chunks.close()
+            return monitor.result()
+        
         response = ollama_client.generate(
             model=model,
             prompt=prompt,
@@ -71,6 +154,144 @@ def generate_text_with_conversation(messages, model="llama3.1:8b"):
     except Exception as e:
         return f"Error: {str(e)}"
 
+def chat_with_conversation(messages, model="llama3.1:8b", stream=False):
+    """
+    Generate the next turn through Ollama's chat endpoint.
+    The message history is sent unchanged from turn to turn and the model is kept
+    loaded (keep_alive), so Ollama reuses the KV cache for the shared prefix and
+    only prefills the newly appended Action_Response text.
+    """
+    try:
+        print(f"Debug: Using model: {model} (incremental, {len(messages)} messages)")
+        
+        if stream:
+            monitor = ActionStreamMonitor()
+            chunks = ollama_client.chat(
+                model=model,
+                messages=messages,
+                options={
+                    'temperature': 0.1,
+                    'num_predict': 1000
+                },
+                keep_alive=Config.OLLAMA_KEEP_ALIVE,
+                stream=True
+            )
+            try:
+                for chunk in chunks:
+                    if monitor.feed(chunk['message']['content']):
+                        break
+            finally:
+                chunks.close()
+            return monitor.result()
+        
+        response = ollama_client.chat(
+            model=model,
+            messages=messages,
+            options={
+                'temperature': 0.1,
+                'num_predict': 1000
+            },
+            keep_alive=Config.OLLAMA_KEEP_ALIVE
+        )
+        return response.message.content
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+async def chat_with_conversation_async(messages, model="llama3.1:8b", stream=False):
+    """
+    Async variant of chat_with_conversation.
+    """
+    try:
+        if stream:
+            monitor = ActionStreamMonitor()
+            chunks = await async_ollama_client.chat(
+                model=model,
+                messages=messages,
+                options={
+                    'temperature': 0.1,
+                    'num_predict': 1000
+                },
+                keep_alive=Config.OLLAMA_KEEP_ALIVE,
+                stream=True
+            )
+            try:
+                async for chunk in chunks:
+                    if monitor.feed(chunk['message']['content']):
+                        break
+            finally:
+                await chunks.aclose()
+            return monitor.result()
+        
+        response = await async_ollama_client.chat(
+            model=model,
+            messages=messages,
+            options={
+                'temperature': 0.1,
+                'num_predict': 1000
+            },
+            keep_alive=Config.OLLAMA_KEEP_ALIVE
+        )
+        return response.message.content
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+async def generate_text_with_conversation_async(messages, model="llama3.1:8b", stream=False, incremental=False, use_cache=True,
+                                                priority="default"):
+    """
+    Async variant of generate_text_with_conversation using the Ollama AsyncClient.
+    """
+    cache_key = _completion_key(messages, model, stream, incremental)
+    if use_cache:
+        cached = completion_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    async with model_scheduler.slot_async(model, priority):
+        if incremental:
+            text = await chat_with_conversation_async(messages, model, stream)
+        else:
+            text = await _generate_with_prompt_async(messages, model, stream)
+    
+    if use_cache:
+        completion_cache.put(cache_key, text, backend=_completion_backend(incremental), model=model)
+    return text
+
+async def _generate_with_prompt_async(messages, model, stream):
+    """
+    Async variant of _generate_with_prompt.
+    """
+    try:
+        if stream:
+            monitor = ActionStreamMonitor()
+            chunks = await async_ollama_client.generate(
+                model=model,
+                prompt=build_prompt(messages),
+                options={
+                    'temperature': 0.1,
+                    'num_predict': 1000
+                },
+                stream=True
+            )
+            try:
+                async for chunk in chunks:
+                    if monitor.feed(chunk['response']):
+                        break
+            finally:
+                await chunks.aclose()
+            return monitor.result()
+        
+        response = await async_ollama_client.generate(
+            model=model,
+            prompt=build_prompt(messages),
+            options={
+                'temperature': 0.1,
+                'num_predict': 1000
+            }
+        )
+        return response.response
+    except Exception as e:
+        return f"Error: {str(e)}"
+
 def extract_json(response):
     """
     Extract JSON function calls from the LLM response.
@@ -99,46 +320,143 @@ def extract_json(response):
     
     return None
 
+# Map of action names the LLM may call to their implementations
+available_actions = {
+    "get_response_time": get_response_time,
+    "get_response_times": get_response_times,
+    "get_weather_info": get_weather_info,
+    "calculate_math_expression": calculate_math_expression,
+    "get_current_time": get_current_time,
+    "search_web": search_web,
+    "get_stock_price": get_stock_price,
+    "get_stock_prices": get_stock_prices,
+    "get_price_history": get_price_history,
+    "analyze_portfolio": analyze_portfolio,
+    "get_news_headlines": get_news_headlines,
+    "analyze_text_sentiment": analyze_text_sentiment,
+    "get_website_info": get_website_info,
+    "get_page_weight": get_page_weight,
+    "crawl_site": crawl_site,
+    "perform_data_analysis": perform_data_analysis,
+    "translate_text": translate_text,
+    "get_crypto_price": get_crypto_price,
+    "get_github_repo_info": get_github_repo_info
+}
+
+def extract_actions(response):
+    """
+    Extract every JSON function call from the LLM response.
+    Accepts a single action object, several action objects, or a JSON list of them.
+    """
+    decoder = json.JSONDecoder()
+    function_calls = []
+    index = 0
+    
+    while True:
+        match = re.compile(r'[\[{]').search(response, index)
+        if not match:
+            break
+        try:
+            value, end = decoder.raw_decode(response, match.start())
+        except json.JSONDecodeError:
+            index = match.start() + 1
+            continue
+        
+        candidates = value if isinstance(value, list) else [value]
+        found = [c for c in candidates if isinstance(c, dict) and "function_name" in c]
+        function_calls.extend(found)
+        # Skip past a matched action, otherwise keep scanning inside the value
+        index = end if found else match.start() + 1
+    
+    if not function_calls:
+        # Fall back to the single-action contract
+        json_function = extract_json(response)
+        if json_function:
+            function_calls.append(json_function)
+    
+    return function_calls
+
 def execute_function(function_name, function_params):
     """
     Execute the specified function with the given parameters.
     """
-    available_actions = {
-        "get_response_time": get_response_time,
-        "get_weather_info": get_weather_info,
-        "calculate_math_expression": calculate_math_expression,
-        "get_current_time": get_current_time,
-        "search_web": search_web,
-        "get_stock_price": get_stock_price,
-        "get_news_headlines": get_news_headlines,
-        "analyze_text_sentiment": analyze_text_sentiment,
-        "get_website_info": get_website_info,
-        "perform_data_analysis": perform_data_analysis,
-        "translate_text": translate_text,
-        "get_crypto_price": get_crypto_price,
-        "get_github_repo_info": get_github_repo_info
-    }
-    
     if function_name in available_actions:
         try:
-            if function_params:
-                result = available_actions[function_name](**function_params)
-            else:
-                result = available_actions[function_name]()
+            # Served from the shared per-tool TTL cache when fresh, with a stale or
+            # offline fallback when the upstream is unavailable
+            result = action_cache.call(function_name, available_actions[function_name], function_params,
+                                       fallback_actions.get(function_name))
             return str(result)
         except Exception as e:
             return f"Error executing {function_name}: {str(e)}"
     else:
         return f"Function {function_name} not found"
 
-def run_ai_agent(user_question, system_prompt=basic_system_prompt, model="llama3.1:8b"):
+def execute_functions(function_calls):
     """
-    Run the AI agent with the ReAct loop using Ollama.
+    Execute several function calls concurrently, returning results in call order.
     """
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_question}
-    ]
+    def run(call):
+        return execute_function(call.get("function_name"), call.get("function_parms", {}))
+    
+    if len(function_calls) == 1:
+        return [run(function_calls[0])]
+    
+    max_workers = min(len(function_calls), Config.MAX_PARALLEL_ACTIONS)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run, function_calls))
+
+def format_action_response(function_calls, function_results):
+    """
+    Combine the results of one LLM turn's function calls into a single message.
+    """
+    if len(function_results) == 1:
+        return f"Function result: {function_results[0]}"
+    
+    lines = [f"{call.get('function_name')}: {result}" for call, result in zip(function_calls, function_results)]
+    return "Function result:\n" + "\n".join(lines)
+
+async def execute_function_async(function_name, function_params):
+    """
+    Execute the specified function without blocking the event loop.
+    Network actions use their aiohttp variants; the rest run in a worker thread.
+    """
+    if function_name not in available_actions:
+        return f"Function {function_name} not found"
+    
+    function_params = function_params or {}
+    try:
+        if function_name in async_available_actions:
+            result = await action_cache.call_async(function_name, async_available_actions[function_name], function_params,
+                                                   fallback_actions.get(function_name))
+        else:
+            result = await asyncio.to_thread(action_cache.call, function_name, available_actions[function_name], function_params,
+                                             fallback_actions.get(function_name))
+        return str(result)
+    except Exception as e:
+        return f"Error executing {function_name}: {str(e)}"
+
+async def execute_functions_async(function_calls):
+    """
+    Execute several function calls concurrently on the event loop, returning results in call order.
+    """
+    semaphore = asyncio.Semaphore(Config.MAX_PARALLEL_ACTIONS)
+    
+    async def run(call):
+        async with semaphore:
+            return await execute_function_async(call.get("function_name"), call.get("function_parms", {}))
+    
+    return await asyncio.gather(*(run(call) for call in function_calls))
+
+def _agent_loop(messages, model, stream=False, incremental=False, use_cache=True, priority="default", strict=False):
+    """
+    Drive the ReAct loop over messages until the LLM gives a final answer.
+    Returns (response, failure, tools_used), where failure is one of
+    cascade.ESCALATION_REASONS, or None when the response is a usable answer.
+    With strict=True, a turn naming an unknown function ends the loop instead
+    of reporting the error back to the LLM.
+    """
+    tools_used = set()
     
     max_iterations = 5  # Prevent infinite loops
     iteration = 0
@@ -148,32 +466,175 @@ def run_ai_agent(user_question, system_prompt=basic_system_prompt, model="llama3
         print(f"\n--- Iteration {iteration} ---")
         
         # Generate response from Ollama
-        llm_response = generate_text_with_conversation(messages, model)
+        llm_response = generate_text_with_conversation(messages, model, stream, incremental, use_cache, priority)
         print(f"LLM Response: {llm_response}")
         
-        # Extract function call
-        function_call = extract_json(llm_response)
+        # Extract function calls (the LLM may request several at once)
+        function_calls = [call for call in extract_actions(llm_response) if "function_name" in call]
+        failure = check_turn(llm_response, function_calls, available_actions)
         
-        if function_call and "function_name" in function_call:
-            function_name = function_call["function_name"]
-            function_params = function_call.get("function_parms", {})
+        if function_calls and not (strict and failure):
+            for call in function_calls:
+                print(f"Executing function: {call['function_name']} with params: {call.get('function_parms', {})}")
             
-            print(f"Executing function: {function_name} with params: {function_params}")
+            # Execute the functions concurrently
+            results = execute_functions(function_calls)
+            tools_used.update(call["function_name"] for call in function_calls)
+            for result in results:
+                print(f"Function result: {result}")
             
-            # Execute the function
-            result = execute_function(function_name, function_params)
-            print(f"Function result: {result}")
-            
-            # Add assistant and function result to conversation
+            # Add assistant and all function results to conversation
             messages.append({"role": "assistant", "content": llm_response})
-            messages.append({"role": "user", "content": f"Function result: {result}"})
+            messages.append({"role": "user", "content": format_action_response(function_calls, results)})
             
+        elif function_calls:
+            print("Unknown function requested")
+            return llm_response, failure, tools_used
         else:
             print("No function call detected, providing final answer")
             print("Final answer received!")
+            return llm_response, failure, tools_used
+    
+    return "Maximum iterations reached. Please try a simpler question.", "max_iterations", tools_used
+
+def run_ai_agent(user_question, system_prompt=basic_system_prompt, model="llama3.1:8b", stream=False, incremental=False,
+                 use_cache=True, priority="default"):
+    """
+    Run the AI agent with the ReAct loop using Ollama.
+    Pass stream=True to stop each generation as soon as its action is complete,
+    incremental=True to reuse Ollama's KV cache across iterations,
+    use_cache=False to bypass the completion and answer caches,
+    and priority="interactive" or "batch" to order requests in model_scheduler.
+    """
+    # Near-duplicate questions can reuse a stored answer (opt-in via ANSWER_CACHE_ENABLED)
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            print("Answer served from cache!")
+            return cached_answer
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_question}
+    ]
+    llm_response, failure, tools_used = _agent_loop(messages, model, stream, incremental, use_cache, priority)
+    
+    if failure is None and use_cache:
+        answer_cache.store(user_question, system_prompt, llm_response, tools_used)
+    return llm_response
+
+def run_ai_agent_cascade(user_question, system_prompt=basic_system_prompt, models=None, stream=False, incremental=False,
+                         use_cache=True, priority="default"):
+    """
+    Run the AI agent on a cascade of models, smallest first (OLLAMA_CASCADE_MODELS).
+    A tier's answer is returned unless it produced an unparsable action, named an
+    unknown function or hit the iteration limit; then the question starts over on
+    the next tier (repeated tool calls are served by the action cache).
+    Per-tier outcomes are recorded in cascade.cascade_stats.
+    """
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            print("Answer served from cache!")
+            return cached_answer
+    
+    models = models or parse_models(Config.OLLAMA_CASCADE_MODELS)
+    for tier, model in enumerate(models, 1):
+        print(f"\n=== Cascade tier {tier}/{len(models)}: {model} ===")
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_question}
+        ]
+        llm_response, failure, tools_used = _agent_loop(messages, model, stream, incremental, use_cache, priority,
+                                                        strict=True)
+        cascade_stats.record(model, failure)
+        
+        if failure is None:
+            if use_cache:
+                answer_cache.store(user_question, system_prompt, llm_response, tools_used)
+            return llm_response
+        print(f"Escalating from {model}: {failure}")
+    
+    return llm_response
+
+async def _agent_loop_async(messages, model, stream=False, incremental=False, use_cache=True, priority="default",
+                            strict=False):
+    """
+    Async variant of _agent_loop.
+    """
+    tools_used = set()
+    
+    max_iterations = 5  # Prevent infinite loops
+    iteration = 0
+    
+    while iteration < max_iterations:
+        iteration += 1
+        
+        llm_response = await generate_text_with_conversation_async(messages, model, stream, incremental, use_cache,
+                                                                   priority)
+        
+        function_calls = [call for call in extract_actions(llm_response) if "function_name" in call]
+        failure = check_turn(llm_response, function_calls, available_actions)
+        
+        if function_calls and not (strict and failure):
+            results = await execute_functions_async(function_calls)
+            tools_used.update(call["function_name"] for call in function_calls)
+            
+            messages.append({"role": "assistant", "content": llm_response})
+            messages.append({"role": "user", "content": format_action_response(function_calls, results)})
+            
+        else:
+            return llm_response, failure, tools_used
+    
+    return "Maximum iterations reached. Please try a simpler question.", "max_iterations", tools_used
+
+async def run_ai_agent_async(user_question, system_prompt=basic_system_prompt, model="llama3.1:8b", stream=False,
+                             incremental=False, use_cache=True, priority="default"):
+    """
+    Run the AI agent with the ReAct loop using Ollama without blocking the event loop.
+    Many sessions can be driven concurrently from one process, e.g. with asyncio.gather().
+    """
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            return cached_answer
+    
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_question}
+    ]
+    llm_response, failure, tools_used = await _agent_loop_async(messages, model, stream, incremental, use_cache, priority)
+    
+    if failure is None and use_cache:
+        answer_cache.store(user_question, system_prompt, llm_response, tools_used)
+    return llm_response
+
+async def run_ai_agent_cascade_async(user_question, system_prompt=basic_system_prompt, models=None, stream=False,
+                                     incremental=False, use_cache=True, priority="default"):
+    """
+    Async variant of run_ai_agent_cascade.
+    """
+    if use_cache:
+        cached_answer = answer_cache.lookup(user_question, system_prompt)
+        if cached_answer is not None:
+            return cached_answer
+    
+    models = models or parse_models(Config.OLLAMA_CASCADE_MODELS)
+    for model in models:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_question}
+        ]
+        llm_response, failure, tools_used = await _agent_loop_async(messages, model, stream, incremental, use_cache,
+                                                                    priority, strict=True)
+        cascade_stats.record(model, failure)
+        
+        if failure is None:
+            if use_cache:
+                answer_cache.store(user_question, system_prompt, llm_response, tools_used)
             return llm_response
     
-    return "Maximum iterations reached. Please try a simpler question."
+    return llm_response
 
 def test_basic_agent():
     """Test the basic AI agent."""
@@ -249,8 +710,10 @@ def interactive_mode():
                 continue
             
             # Model selection
-            model_choice = input("Select model (1: llama3.1:8b, 2: llama3.1:70b, 3: mistral:7b): ").strip()
-            if model_choice == "1":
+            model_choice = input("Select model (1: llama3.1:8b, 2: llama3.1:70b, 3: mistral:7b, 4: cascade): ").strip()
+            if model_choice == "4":
+                model = "cascade"
+            elif model_choice == "1":
                 model = "llama3.1:8b"
             elif model_choice == "2":
                 model = "llama3.1:70b"
@@ -264,7 +727,10 @@ def interactive_mode():
             if question.lower() in ['quit', 'exit', 'q']:
                 break
                 
-            result = run_ai_agent(question, system_prompt, model)
+            if model == "cascade":
+                result = run_ai_agent_cascade(question, system_prompt, priority="interactive")
+            else:
+                result = run_ai_agent(question, system_prompt, model, priority="interactive")
             print(f"\nFinal Answer: {result}")
             
         except KeyboardInterrupt:
@@ -280,14 +746,20 @@ def show_available_functions():
     print("=== Available Functions ===")
     functions = {
         "get_response_time": "Get website response time and performance metrics",
+        "get_response_times": "Probe many websites at once with DNS/connect/TLS/TTFB timings",
         "get_weather_info": "Get weather information for a city",
         "calculate_math_expression": "Calculate mathematical expressions with analysis",
         "get_current_time": "Get current time with timezone info",
         "search_web": "Search the web using DuckDuckGo",
         "get_stock_price": "Get real-time stock prices",
+        "get_stock_prices": "Get quotes for several stock symbols in one table",
+        "get_price_history": "Price trend with moving averages, RSI, volatility and drawdown",
+        "analyze_portfolio": "Portfolio returns, correlation, VaR/CVaR and per-position risk contribution",
         "get_news_headlines": "Get latest news headlines",
         "analyze_text_sentiment": "Analyze text sentiment",
         "get_website_info": "Get comprehensive website information",
+        "get_page_weight": "Measure total page weight with the largest and slowest assets",
+        "crawl_site": "Crawl a whole site and aggregate its SEO issues into one report",
         "perform_data_analysis": "Analyze JSON/CSV data",
         "translate_text": "Translate text to different languages",
         "get_crypto_price": "Get cryptocurrency prices",
@@ -324,6 +796,10 @@ if __name__ == "__main__":
     # Show available functions
     show_available_functions()
     
+    # Keep watched stock and crypto prices in memory
+    if Config.PRICE_FEED_ENABLED:
+        price_feed.start()
+    
     # Run tests
     try:
         test_basic_agent()
@@ -0,0 +1,173 @@
+"""
+Page weight analysis for get_page_weight.
+The page is streamed through the single-pass HTML analyzer, which collects its
+images, scripts and stylesheets; those are then sized concurrently (at most
+PAGE_WEIGHT_CONCURRENCY at once and PAGE_WEIGHT_PER_HOST per host) and folded
+into one summary of total bytes, largest assets and slow assets.
+Scripts and stylesheets are sized with HEAD. Images are downloaded only until
+Pillow has read their dimensions from the partial data, unless the server
+sends no Content-Length, in which case the body has to be counted.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from PIL import ImageFile
+
+from config import Config
+from crawler import normalize_link
+from html_analysis import StreamingPageAnalyzer
+from transport import transport
+
+ASSET_TYPES = ("image", "script", "stylesheet")
+
+# Assets listed in the largest / slow / failed sections of the report
+REPORT_EXAMPLES = 5
+
+READ_CHUNK = 65536
+
+# Give up on reading image dimensions after this many bytes (SVG, unknown formats)
+IMAGE_HEADER_LIMIT = 262144
+
+def _content_length(response) -> Optional[int]:
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+def _kb(size: int) -> float:
+    return round(size / 1024, 1)
+
+async def measure_asset(asset_type: str, url: str) -> Dict[str, Any]:
+    """Size, status, load time and (for images) dimensions of one asset."""
+    asset = {"url": url, "type": asset_type}
+    start = time.perf_counter()
+    try:
+        if asset_type != "image":
+            async with transport.stream_async(url, method="HEAD") as response:
+                size = _content_length(response)
+                asset["status_code"] = response.status
+                if response.status < 400 and size is not None:
+                    asset["bytes"] = size
+                elif response.status >= 400 and response.status not in (405, 501):
+                    asset["error"] = f"HTTP {response.status}"
+        if "bytes" not in asset and "error" not in asset:
+            await _download(url, asset)
+    except Exception as e:
+        asset["error"] = str(e) or type(e).__name__
+    asset["ms"] = round((time.perf_counter() - start) * 1000)
+    return asset
+
+async def _download(url: str, asset: Dict[str, Any]):
+    """GET fallback: stop once the size (and image dimensions) are known."""
+    async with transport.stream_async(url) as response:
+        asset["status_code"] = response.status
+        if response.status >= 400:
+            asset["error"] = f"HTTP {response.status}"
+            return
+        size = _content_length(response)
+        parser = ImageFile.Parser() if asset["type"] == "image" else None
+        read = 0
+        async for chunk in response.content.iter_chunked(READ_CHUNK):
+            read += len(chunk)
+            if parser is not None:
+                try:
+                    parser.feed(chunk)
+                except Exception:
+                    # Not an image format Pillow understands, or a decompression bomb
+                    parser = None
+                else:
+                    if parser.image is not None:
+                        asset["dimensions"] = "%dx%d" % parser.image.size
+                        parser = None
+                    elif read >= IMAGE_HEADER_LIMIT:
+                        parser = None
+            if parser is None and size is not None:
+                break
+        asset["bytes"] = size if size is not None else read
+
+def build_report(url: str, page: Dict[str, Any], assets: List[Dict[str, Any]], found: int,
+                 elapsed: float, slow_ms: int = Config.PAGE_WEIGHT_SLOW_MS) -> Dict[str, Any]:
+    """Fold the page and per-asset measurements into one compact summary."""
+    sized = [asset for asset in assets if "bytes" in asset]
+    failed = [asset for asset in assets if "error" in asset]
+    slow = sorted((asset for asset in assets if asset["ms"] > slow_ms), key=lambda asset: asset["ms"], reverse=True)
+    largest = sorted(sized, key=lambda asset: asset["bytes"], reverse=True)[:REPORT_EXAMPLES]
+
+    by_type = {"html": {"count": 1, "kb": _kb(page["bytes"])}}
+    for asset_type in ASSET_TYPES:
+        of_type = [asset for asset in sized if asset["type"] == asset_type]
+        if of_type:
+            by_type[asset_type] = {"count": len(of_type), "kb": _kb(sum(asset["bytes"] for asset in of_type))}
+
+    host = urlsplit(page["final_url"]).netloc
+    third_party = [asset for asset in sized if urlsplit(asset["url"]).netloc != host]
+    total = page["bytes"] + sum(asset["bytes"] for asset in sized)
+
+    report = {
+        "url": url,
+        "total_kb": _kb(total),
+        "requests": 1 + len(assets),
+        "html_ms": page["ms"],
+        "measured_in_seconds": round(elapsed, 2),
+        "by_type": by_type,
+        "largest_assets": [
+            {**{key: asset[key] for key in ("url", "type", "dimensions") if key in asset}, "kb": _kb(asset["bytes"])}
+            for asset in largest
+        ],
+        "third_party": {"hosts": len({urlsplit(asset["url"]).netloc for asset in third_party}),
+                        "kb": _kb(sum(asset["bytes"] for asset in third_party))}
+    }
+    if slow:
+        report["slow_assets"] = {
+            "threshold_ms": slow_ms,
+            "count": len(slow),
+            "examples": [{"url": asset["url"], "type": asset["type"], "ms": asset["ms"]} for asset in slow[:REPORT_EXAMPLES]]
+        }
+    if failed:
+        report["failed_assets"] = {"count": len(failed),
+                                   "examples": [{"url": asset["url"], "error": asset["error"]} for asset in failed[:REPORT_EXAMPLES]]}
+    if found > len(assets):
+        report["assets_not_measured"] = found - len(assets)
+    if page.get("truncated"):
+        report["html_truncated"] = True
+    return report
+
+async def measure_page(url: str, max_assets: int = Config.PAGE_WEIGHT_MAX_ASSETS,
+                       concurrency: int = Config.PAGE_WEIGHT_CONCURRENCY,
+                       per_host: int = Config.PAGE_WEIGHT_PER_HOST) -> Dict[str, Any]:
+    """Fetch a page, size all of its images, scripts and stylesheets, and summarize."""
+    start = time.perf_counter()
+    async with transport.stream_async(url) as response:
+        response.raise_for_status()
+        final_url = str(response.url)
+        analyzer = StreamingPageAnalyzer(response.headers.get("Content-Type"), collect_assets=True)
+        async for chunk in response.content.iter_chunked(READ_CHUNK):
+            # HTML parsing is CPU-bound, keep it off the event loop
+            if not await asyncio.to_thread(analyzer.feed, chunk):
+                break
+        analysis = await asyncio.to_thread(analyzer.close)
+    page = {"final_url": final_url, "bytes": analysis["content_length"], "truncated": analysis.get("truncated"),
+            "ms": round((time.perf_counter() - start) * 1000)}
+
+    metrics = analyzer.metrics
+    base = urljoin(final_url, metrics.base_href) if metrics.base_href else final_url
+    targets = {}
+    for asset_type, href in metrics.assets:
+        link = normalize_link(base, href)
+        if link and link not in targets:
+            targets[link] = asset_type
+
+    overall = asyncio.Semaphore(max(1, concurrency))
+    hosts = defaultdict(lambda: asyncio.Semaphore(max(1, per_host)))
+
+    async def bounded(link: str, asset_type: str) -> Dict[str, Any]:
+        # Host slot first, so tasks queued on a busy host don't hold global slots
+        async with hosts[urlsplit(link).netloc], overall:
+            return await measure_asset(asset_type, link)
+
+    assets = await asyncio.gather(*(bounded(link, asset_type) for link, asset_type in list(targets.items())[:max_assets]))
+    return build_report(url, page, list(assets), len(targets), time.perf_counter() - start)
@@ -0,0 +1,175 @@
+"""
+Vectorized portfolio analytics for analyze_portfolio.
+Daily closes for all holdings are aligned on a shared calendar into one
+days x symbols matrix (a holding without a price on some day keeps its last
+close), and everything else is batched NumPy over it: the
+return matrix, covariance and correlation (one matrix product), portfolio
+returns, historical VaR / CVaR, and each position's share of return, variance
+and tail loss. Large portfolios get a correlation summary instead of the full
+matrix so the result stays readable.
+"""
+
+import re
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from timeseries import TRADING_DAYS, drawdowns, to_iso
+
+CONFIDENCE_LEVELS = (0.95, 0.99)
+
+# Fewer overlapping daily returns than this make VaR and correlations meaningless
+MIN_OBSERVATIONS = 20
+
+# Up to this many holdings the full correlation and covariance matrices are returned
+MATRIX_MAX_SYMBOLS = 10
+
+# Positions listed in the table (largest risk contribution first) and correlation pairs shown
+TABLE_ROWS = 25
+PAIR_EXAMPLES = 5
+
+POSITION_COLUMNS = ["symbol", "weight_pct", "annual_return_pct", "volatility_pct",
+                    "return_contribution_pct", "risk_contribution_pct", "cvar_contribution_pct"]
+
+def parse_holdings(holdings) -> Dict[str, Optional[float]]:
+    """
+    {symbol: shares} from a dict, a list of symbols or a string like
+    "AAPL:10, MSFT:5". Holdings given without share counts are equal-weighted.
+    """
+    if isinstance(holdings, str):
+        holdings = re.split(r"[,\s]+", holdings.strip())
+    if isinstance(holdings, dict):
+        items = list(holdings.items())
+    else:
+        items = [str(item).split(":", 1) if ":" in str(item) else (item, None) for item in holdings]
+    parsed = {}
+    for symbol, shares in items:
+        symbol = str(symbol).strip().upper()
+        if symbol:
+            parsed[symbol] = None if shares in (None, "") else float(shares)
+    counts = [shares for shares in parsed.values() if shares is not None]
+    if counts and len(counts) != len(parsed):
+        raise ValueError("Give a share count for every holding or for none")
+    if any(shares <= 0 for shares in counts):
+        raise ValueError("Share counts must be positive")
+    return parsed
+
+def align_closes(series: Dict[str, Dict[str, np.ndarray]], days: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The last `days` dates any symbol traded on (from the first day every
+    symbol has a price) and the matching days x symbols close matrix. A symbol
+    without a close on some day carries its previous close over.
+    """
+    first = max(int(columns["date"][0]) for columns in series.values())
+    stacked = np.concatenate([columns["date"][-days:] for columns in series.values()])
+    # Dates are small day numbers, so a presence mask dedupes them without sorting
+    seen = np.zeros(int(stacked.max() - stacked.min()) + 1, dtype=bool)
+    seen[stacked - stacked.min()] = True
+    dates = np.flatnonzero(seen) + stacked.min()
+    dates = dates[dates >= first][-days:]
+    closes = np.column_stack([
+        np.asarray(columns["close"], dtype=np.float64)[np.searchsorted(columns["date"], dates, side="right") - 1]
+        for columns in series.values()
+    ])
+    return dates, closes
+
+def _pct(value: float) -> float:
+    return round(float(value) * 100, 2)
+
+def _correlation_report(symbols, correlation: np.ndarray, covariance: np.ndarray) -> Dict[str, Any]:
+    """Full matrices for small portfolios, otherwise the average and the extreme pairs."""
+    upper = np.triu_indices(len(symbols), 1)
+    pairs = correlation[upper]
+    report = {"average": round(float(pairs.mean()), 3) if len(pairs) else None}
+    if len(symbols) <= MATRIX_MAX_SYMBOLS:
+        report.update({
+            "symbols": symbols,
+            "matrix": np.round(correlation, 3).tolist(),
+            "annual_covariance": np.round(covariance * TRADING_DAYS, 5).tolist()
+        })
+        return report
+    order = np.argsort(pairs)
+
+    def listed(indices):
+        return [[symbols[upper[0][i]], symbols[upper[1][i]], round(float(pairs[i]), 3)] for i in indices]
+
+    report.update({"most_correlated": listed(order[::-1][:PAIR_EXAMPLES]),
+                   "least_correlated": listed(order[:PAIR_EXAMPLES])})
+    return report
+
+def analyze(holdings: Dict[str, Optional[float]], series: Dict[str, Dict[str, np.ndarray]],
+            window: int = Config.PORTFOLIO_WINDOW) -> Dict[str, Any]:
+    """Risk and return summary over the last `window` daily returns of the holdings."""
+    symbols = list(series)
+    dates, closes = align_closes(series, max(MIN_OBSERVATIONS, int(window)) + 1)
+    if len(dates) <= MIN_OBSERVATIONS:
+        raise ValueError(f"Only {max(len(dates) - 1, 0)} common daily returns, need at least {MIN_OBSERVATIONS}")
+
+    returns = closes[1:] / closes[:-1] - 1
+    observations = len(returns)
+    shares = [holdings[symbol] for symbol in symbols]
+    if shares[0] is None:
+        values = None
+        weights = np.full(len(symbols), 1 / len(symbols))
+    else:
+        values = np.array(shares) * closes[-1]
+        weights = values / values.sum()
+
+    mean = returns.mean(axis=0)
+    centered = returns - mean
+    covariance = centered.T @ centered / (observations - 1)
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.nan_to_num(covariance / np.outer(std, std))
+    np.fill_diagonal(correlation, 1.0)
+
+    portfolio = returns @ weights
+    marginal = covariance @ weights
+    variance = float(weights @ marginal)
+    volatility = np.sqrt(variance * TRADING_DAYS)
+    annual_return = float(portfolio.mean()) * TRADING_DAYS
+
+    losses = -portfolio
+    risk = {}
+    for level in CONFIDENCE_LEVELS:
+        threshold = np.quantile(losses, level)
+        tail = losses >= threshold
+        name = str(round(level * 100))
+        risk[f"var_{name}"] = {"daily_pct": _pct(threshold)}
+        risk[f"cvar_{name}"] = {"daily_pct": _pct(losses[tail].mean())}
+        if values is not None:
+            total = float(values.sum())
+            risk[f"var_{name}"]["value"] = round(float(threshold) * total, 2)
+            risk[f"cvar_{name}"]["value"] = round(float(losses[tail].mean()) * total, 2)
+
+    # Each position's average loss on the portfolio's worst days; these sum to the first CVaR
+    worst = losses >= np.quantile(losses, CONFIDENCE_LEVELS[0])
+    tail_losses = -(returns[worst] * weights).mean(axis=0)
+    tail_share = tail_losses / tail_losses.sum() if tail_losses.sum() else np.zeros(len(symbols))
+    risk_share = weights * marginal / variance if variance else np.zeros(len(symbols))
+    table = np.column_stack([weights, mean * TRADING_DAYS, std * np.sqrt(TRADING_DAYS),
+                             weights * mean * TRADING_DAYS, risk_share, tail_share]) * 100
+    order = np.argsort(-risk_share, kind="stable")[:TABLE_ROWS]
+    rows = [[symbols[i]] + np.round(table[i], 2).tolist() for i in order]
+
+    report = {
+        "holdings": len(symbols),
+        "weighting": "equal" if values is None else "value",
+        "from": to_iso(dates[0]),
+        "to": to_iso(dates[-1]),
+        "trading_days": observations,
+        "annual_return_pct": _pct(annual_return),
+        "annual_volatility_pct": _pct(volatility),
+        "sharpe": round(annual_return / volatility, 2) if volatility else None,
+        "max_drawdown_pct": _pct(drawdowns(np.cumprod(1 + portfolio)).min()),
+        "diversification_ratio": round(float(weights @ std) / np.sqrt(variance), 2) if variance else None,
+        "risk": risk,
+        "positions": {"columns": POSITION_COLUMNS, "rows": rows},
+        "correlation": _correlation_report(symbols, correlation, covariance)
+    }
+    if values is not None:
+        report["value"] = round(float(values.sum()), 2)
+    if len(symbols) > TABLE_ROWS:
+        report["positions"]["not_listed"] = len(symbols) - TABLE_ROWS
+    return report
@@ -0,0 +1,161 @@
+"""
+Optional background price refresher for the stock and crypto actions.
+A daemon thread polls a configured watchlist every CRYPTO_UPDATE_INTERVAL
+seconds (one batched CoinGecko call for the coins, a fresh quote per stock)
+into fixed-size NumPy ring buffers per symbol. While the feed is
+fresh, get_crypto_price and get_stock_price answer from memory, with
+short-window change statistics from the buffered samples.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from config import Config
+from transport import transport
+
+# Samples older than this many refresh intervals are not served
+STALE_INTERVALS = 2
+
+def watchlist(setting: str) -> List[str]:
+    """Comma separated symbols from a config setting, upper-cased."""
+    return [symbol.strip().upper() for symbol in setting.split(",") if symbol.strip()]
+
+class RingBuffer:
+    """Fixed-size buffer of (timestamp, price) samples; the oldest is overwritten when full."""
+
+    def __init__(self, capacity: int = Config.PRICE_FEED_SAMPLES):
+        self.capacity = max(2, capacity)
+        self.times = np.zeros(self.capacity)
+        self.prices = np.zeros(self.capacity)
+        self.count = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def append(self, timestamp: float, price: float):
+        with self._lock:
+            self.times[self._next] = timestamp
+            self.prices[self._next] = price
+            self._next = (self._next + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+
+    def samples(self):
+        """(times, prices) oldest first."""
+        with self._lock:
+            if self.count < self.capacity:
+                return self.times[:self.count].copy(), self.prices[:self.count].copy()
+            order = np.r_[self._next:self.capacity, 0:self._next]
+            return self.times[order], self.prices[order]
+
+    def latest(self) -> Optional[tuple]:
+        with self._lock:
+            if not self.count:
+                return None
+            index = (self._next - 1) % self.capacity
+            return float(self.times[index]), float(self.prices[index])
+
+    def window_stats(self) -> Dict[str, Any]:
+        """Change, range and sample count over everything buffered."""
+        times, prices = self.samples()
+        stats = {"samples": len(prices), "minutes": round(float(times[-1] - times[0]) / 60, 1) if len(times) else 0.0}
+        if len(prices) >= 2:
+            stats.update({
+                "change_pct": round(float(prices[-1] / prices[0] - 1) * 100, 3),
+                "high": float(prices.max()),
+                "low": float(prices.min())
+            })
+        return stats
+
+class PriceFeed:
+    """
+    Watchlist poller. fetch_crypto(symbols) and fetch_stocks(symbols) are
+    coroutines returning {symbol: quote}; quotes with an "error" are skipped.
+    """
+
+    def __init__(self, fetch_crypto: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]],
+                 fetch_stocks: Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]],
+                 crypto: Optional[List[str]] = None, stocks: Optional[List[str]] = None,
+                 interval: float = Config.CRYPTO_UPDATE_INTERVAL, capacity: int = Config.PRICE_FEED_SAMPLES):
+        self.fetchers = {"crypto": fetch_crypto, "stock": fetch_stocks}
+        self.watchlists = {
+            "crypto": watchlist(Config.PRICE_FEED_CRYPTO) if crypto is None else [symbol.upper() for symbol in crypto],
+            "stock": watchlist(Config.PRICE_FEED_STOCKS) if stocks is None else [symbol.upper() for symbol in stocks]
+        }
+        self.interval = interval
+        self.buffers = {kind: {symbol: RingBuffer(capacity) for symbol in symbols}
+                        for kind, symbols in self.watchlists.items()}
+        self._quotes = {"crypto": {}, "stock": {}}
+        self._stop = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start polling in a daemon thread (no-op if already running)."""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="price-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                transport.run_sync(self.refresh())
+            except Exception:
+                self.errors += 1
+            self._stop.wait(self.interval)
+
+    async def refresh(self):
+        """Poll every watchlist once and append the new prices."""
+        kinds = [kind for kind, symbols in self.watchlists.items() if symbols]
+        results = await asyncio.gather(*(self.fetchers[kind](self.watchlists[kind]) for kind in kinds),
+                                       return_exceptions=True)
+        now = time.time()
+        for kind, quotes in zip(kinds, results):
+            if isinstance(quotes, BaseException):
+                self.errors += 1
+                continue
+            for symbol, quote in quotes.items():
+                if "error" in quote or quote.get("stale") or symbol not in self.buffers[kind] or quote.get("price") is None:
+                    continue
+                self.buffers[kind][symbol].append(now, float(quote["price"]))
+                self._quotes[kind][symbol] = quote
+        self.refreshes += 1
+
+    def lookup(self, kind: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """The buffered quote with window stats, or None if the symbol is not watched or its data is stale."""
+        symbol = symbol.strip().upper()
+        buffer = self.buffers.get(kind, {}).get(symbol)
+        latest = buffer.latest() if buffer is not None else None
+        if latest is None or time.time() - latest[0] > STALE_INTERVALS * self.interval:
+            return None
+        return {
+            **self._quotes[kind][symbol],
+            "as_of": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(latest[0])),
+            "age_s": round(time.time() - latest[0], 1),
+            "window": buffer.window_stats()
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "symbols": {kind: {symbol: buffer.count for symbol, buffer in buffers.items()}
+                        for kind, buffers in self.buffers.items()}
+        }
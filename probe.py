@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Bulk Website Latency Probe
+Probes many URLs concurrently and breaks each request down into DNS lookup,
+TCP connect, TLS handshake, time to first byte and total time, over several
+samples per URL (min / median / p95). Each sample opens a fresh connection and
+bodies are drained without being kept, so thousands of URLs can be probed in
+constant memory. Results are yielded (and written as JSONL or CSV) as soon as
+each URL finishes.
+
+Usage:
+    python probe.py urls.txt --samples 3 --concurrency 200 --format csv --output latency.csv
+    cat urls.txt | python probe.py - --format jsonl
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import socket
+import ssl
+import statistics
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List
+from urllib.parse import urlsplit
+
+from config import Config
+
+# Timings per sample: dns, connect and tls are setup phases, ttfb runs from
+# sending the request to the first response byte, total covers the whole sample
+PHASES = ("dns", "connect", "tls", "ttfb", "total")
+
+READ_CHUNK = 65536
+
+def _normalize_url(url: str) -> str:
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    return url
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    # Rounded first so float noise (0.95 * 20 = 19.000000000000004) doesn't skip a rank
+    index = max(0, min(len(values) - 1, math.ceil(round(fraction * len(values), 9)) - 1))
+    return values[index]
+
+async def probe_once(url: str, timeout: float = Config.REQUEST_TIMEOUT,
+                     user_agent: str = Config.USER_AGENT) -> Dict[str, Any]:
+    """
+    Time one GET over a new connection. Returns the phase timings in seconds
+    with status, headers of interest and body bytes, or an "error" naming the
+    phase that failed. Redirects are reported, not followed.
+    """
+    state = {"phase": "dns", "writer": None}
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(_sample(urlsplit(_normalize_url(url)), user_agent, state), timeout)
+    except (OSError, ssl.SSLError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError, ValueError) as e:
+        return {"error": f"{state['phase']}: {str(e) or type(e).__name__}",
+                "elapsed": round(time.perf_counter() - start, 3)}
+    finally:
+        if state["writer"] is not None:
+            state["writer"].close()
+
+async def _sample(parts, user_agent: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    secure = parts.scheme == "https"
+    host = parts.hostname or ""
+    port = parts.port or (443 if secure else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    loop = asyncio.get_running_loop()
+    timings = {}
+
+    start = time.perf_counter()
+    addresses = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    family, _, proto, _, address = addresses[0]
+    mark = time.perf_counter()
+    timings["dns"] = mark - start
+
+    state["phase"] = "connect"
+    sock = socket.socket(family, socket.SOCK_STREAM, proto)
+    sock.setblocking(False)
+    try:
+        await loop.sock_connect(sock, address)
+    except BaseException:
+        sock.close()
+        raise
+    now = time.perf_counter()
+    timings["connect"], mark = now - mark, now
+
+    state["phase"] = "tls" if secure else "request"
+    reader, state["writer"] = await asyncio.open_connection(
+        sock=sock, ssl=ssl.create_default_context() if secure else None, server_hostname=host if secure else None)
+    now = time.perf_counter()
+    timings["tls"], mark = (now - mark if secure else 0.0), now
+
+    state["phase"] = "ttfb"
+    host_header = host if parts.port is None else f"{host}:{parts.port}"
+    state["writer"].write((f"GET {path} HTTP/1.1\r\nHost: {host_header}\r\nUser-Agent: {user_agent}\r\n"
+                           "Accept: */*\r\nAccept-Encoding: gzip, deflate\r\nConnection: close\r\n\r\n").encode())
+    await state["writer"].drain()
+    mark = time.perf_counter()
+    first = await reader.read(1)
+    if not first:
+        raise ConnectionError("connection closed before the response")
+    timings["ttfb"] = time.perf_counter() - mark
+
+    # Drain the body without keeping it (Connection: close ends it at EOF)
+    state["phase"] = "body"
+    status, headers = _parse_head(first + await reader.readuntil(b"\r\n\r\n"))
+    size = 0
+    while True:
+        chunk = await reader.read(READ_CHUNK)
+        if not chunk:
+            break
+        size += len(chunk)
+    timings["total"] = time.perf_counter() - start
+
+    return {
+        **timings,
+        "status_code": status,
+        "bytes": size,
+        "server": headers.get("server", "unknown"),
+        "location": headers.get("location")
+    }
+
+def _parse_head(head: bytes):
+    lines = head.decode("iso-8859-1").split("\r\n")
+    status_line = lines[0].split(" ", 2)
+    if len(status_line) < 2 or not status_line[0].startswith("HTTP/"):
+        raise ValueError(f"not an HTTP response: {lines[0][:60]!r}")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return int(status_line[1]), headers
+
+def summarize(url: str, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-phase min / median / p95 in milliseconds over a URL's successful samples."""
+    ok = [sample for sample in samples if "error" not in sample]
+    summary = {"url": url, "samples": len(samples), "errors": len(samples) - len(ok)}
+    if not ok:
+        summary["error"] = samples[-1]["error"] if samples else "no samples"
+        return summary
+
+    last = ok[-1]
+    summary.update({"status_code": last["status_code"], "bytes": last["bytes"], "server": last["server"]})
+    if last["location"]:
+        summary["location"] = last["location"]
+    for phase in PHASES:
+        values = sorted(sample[phase] * 1000 for sample in ok)
+        summary[phase] = {
+            "min": round(values[0], 1),
+            "median": round(statistics.median(values), 1),
+            "p95": round(percentile(values, 0.95), 1)
+        }
+    if summary["errors"]:
+        summary["error"] = next(sample["error"] for sample in samples if "error" in sample)
+    return summary
+
+async def probe_url(url: str, samples: int = Config.PROBE_SAMPLES,
+                    timeout: float = Config.REQUEST_TIMEOUT) -> Dict[str, Any]:
+    """Probe one URL `samples` times in a row and summarize the timings."""
+    results = [await probe_once(url, timeout) for _ in range(max(1, samples))]
+    return summarize(_normalize_url(url), results)
+
+async def probe_urls(urls: Iterable[str], samples: int = Config.PROBE_SAMPLES,
+                     concurrency: int = Config.PROBE_CONCURRENCY,
+                     timeout: float = Config.REQUEST_TIMEOUT) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Probe URLs with at most `concurrency` in flight, yielding each summary as
+    soon as its URL finishes (completion order, not input order). `urls` is
+    consumed lazily, so it can be a file or generator of any length.
+    """
+    pending = iter(urls)
+    results = asyncio.Queue(maxsize=concurrency)
+    done = object()
+
+    async def worker():
+        for url in pending:
+            if not url.strip():
+                continue
+            try:
+                summary = await probe_url(url, samples, timeout)
+            except Exception as e:
+                summary = {"url": _normalize_url(url), "samples": 0, "errors": 1, "error": str(e) or type(e).__name__}
+            await results.put(summary)
+        await results.put(done)
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+    try:
+        remaining = len(workers)
+        while remaining:
+            result = await results.get()
+            if result is done:
+                remaining -= 1
+            else:
+                yield result
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+async def probe_all(urls: Iterable[str], samples: int = Config.PROBE_SAMPLES,
+                    concurrency: int = Config.PROBE_CONCURRENCY,
+                    timeout: float = Config.REQUEST_TIMEOUT) -> List[Dict[str, Any]]:
+    """Collect probe_urls results in input order."""
+    urls = [url for url in urls if url.strip()]
+    order = {_normalize_url(url): index for index, url in enumerate(urls)}
+    results = [summary async for summary in probe_urls(urls, samples, concurrency, timeout)]
+    return sorted(results, key=lambda summary: order.get(summary["url"], len(order)))
+
+CSV_FIELDS = ["url", "status_code", "samples", "errors", "bytes", "server"] + [
+    f"{phase}_{stat}_ms" for phase in PHASES for stat in ("min", "median", "p95")
+] + ["location", "error"]
+
+def csv_row(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a summary into one CSV_FIELDS row."""
+    row = {field: summary.get(field) for field in CSV_FIELDS if field in summary}
+    for phase in PHASES:
+        for stat, value in summary.get(phase, {}).items():
+            row[f"{phase}_{stat}_ms"] = value
+    return row
+
+async def _write(urls, args, out):
+    if args.format == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+    async for summary in probe_urls(urls, args.samples, args.concurrency, args.timeout):
+        if args.format == "csv":
+            writer.writerow(csv_row(summary))
+        else:
+            out.write(json.dumps(summary) + "\n")
+        out.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe website latency in bulk")
+    parser.add_argument("urls", help="File with one URL per line, or - for stdin")
+    parser.add_argument("--samples", type=int, default=Config.PROBE_SAMPLES, help="Requests per URL")
+    parser.add_argument("--concurrency", type=int, default=Config.PROBE_CONCURRENCY, help="URLs probed at once")
+    parser.add_argument("--timeout", type=float, default=Config.REQUEST_TIMEOUT, help="Seconds per request")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--output", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.urls == "-" else open(args.urls)
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        asyncio.run(_write(source, args, out))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+
+if __name__ == "__main__":
+    main()
@@ -46,7 +46,8 @@ At the end of the loop you output an Answer.
 
 Use Thought to understand the question you have been asked.
 Use Action to run one of the actions available to you - then return PAUSE.
-Action_Response will be the result of running those actions.
+If you need several independent actions, return them together as a JSON list of action objects - then return PAUSE.
+Action_Response will be the result of running those actions, one line per action when you ran several.
 
 Your available actions are:
 
@@ -54,6 +55,10 @@ get_response_time:
 e.g. get_response_time: learnwithhasan.com
 Returns the response time and performance metrics of a website
 
+get_response_times:
+e.g. get_response_times: ["learnwithhasan.com", "google.com", "github.com"]
+Probes several websites at once and returns DNS, connect, TLS, time-to-first-byte and total times (min/median/p95) per URL
+
 get_weather_info:
 e.g. get_weather_info: new york
 Returns weather information for a city including temperature, humidity, wind speed, and more
@@ -86,6 +91,14 @@ get_website_info:
 e.g. get_website_info: github.com
 Returns comprehensive website information including metadata and content analysis
 
+get_page_weight:
+e.g. get_page_weight: github.com
+Returns the total size of a page and its images, scripts and stylesheets, with the largest and slowest assets
+
+crawl_site:
+e.g. crawl_site: github.com
+Crawls a website and returns an aggregated SEO report covering all crawled pages
+
 perform_data_analysis:
 e.g. perform_data_analysis: [{"name": "John", "age": 30}, {"name": "Jane", "age": 25}]
 Performs data analysis on JSON or CSV data
@@ -105,35 +118,31 @@ Returns GitHub repository information
 Example session:
 
 Question: what is the weather like in Tokyo and what time is it now?
-Thought: I need to get weather information for Tokyo and the current time.
+Thought: I need to get weather information for Tokyo and the current time. These are independent, so I can request both at once.
 Action: 
 
-{
-  "function_name": "get_weather_info",
-  "function_parms": {
-    "city": "tokyo"
+[
+  {
+    "function_name": "get_weather_info",
+    "function_parms": {
+      "city": "tokyo"
+    }
+  },
+  {
+    "function_name": "get_current_time",
+    "function_parms": {
+      "timezone": "JST"
+    }
   }
-}
+]
 
 PAUSE
 
 You will be called again with this:
 
-Action_Response: {"temperature": 75, "condition": "rainy", "humidity": 70, "wind_speed": 15}
-
-Now I need to get the current time.
-Action:
-
-{
-  "function_name": "get_current_time",
-  "function_parms": {}
-}
-
-PAUSE
-
-You will be called again with this:
-
-Action_Response: {"utc_time": "2024-01-15 14:30:25", "local_time": "2024-01-15 23:30:25", "timezone": "JST"}
+Action_Response:
+get_weather_info: {"temperature": 75, "condition": "rainy", "humidity": 70, "wind_speed": 15}
+get_current_time: {"utc_time": "2024-01-15 14:30:25", "local_time": "2024-01-15 23:30:25", "timezone": "JST"}
 
 You then output:
 
@@ -147,7 +156,8 @@ At the end of the loop you output an Answer.
 
 Use Thought to understand the question you have been asked.
 Use Action to run one of the actions available to you - then return PAUSE.
-Action_Response will be the result of running those actions.
+If you need several independent actions, return them together as a JSON list of action objects - then return PAUSE.
+Action_Response will be the result of running those actions, one line per action when you ran several.
 
 Your available actions are:
 
@@ -155,10 +165,22 @@ get_response_time:
 e.g. get_response_time: learnwithhasan.com
 Returns the response time and performance metrics of a website
 
+get_response_times:
+e.g. get_response_times: ["learnwithhasan.com", "learnwithhasan.com/blog", "learnwithhasan.com/tools"]
+Probes many pages at once and returns DNS, connect, TLS, time-to-first-byte and total times (min/median/p95) per URL
+
 get_website_info:
 e.g. get_website_info: learnwithhasan.com
 Returns comprehensive website information including metadata, content analysis, and SEO elements
 
+get_page_weight:
+e.g. get_page_weight: learnwithhasan.com
+Returns the total download size of a page with its images, scripts and stylesheets: size per type, the largest assets, slow assets and failed ones
+
+crawl_site:
+e.g. crawl_site: {"url": "learnwithhasan.com", "max_pages": 25}
+Crawls the site from that page (same site only, robots.txt respected) and returns one report with status codes, broken links, missing titles / descriptions / H1s, duplicate titles, thin content and slow pages
+
 search_web:
 e.g. search_web: seo best practices
 Returns search results for SEO-related queries
@@ -210,7 +232,8 @@ At the end of the loop you output an Answer.
 
 Use Thought to understand the question you have been asked.
 Use Action to run one of the actions available to you - then return PAUSE.
-Action_Response will be the result of running those actions.
+If you need several independent actions, return them together as a JSON list of action objects - then return PAUSE.
+Action_Response will be the result of running those actions, one line per action when you ran several.
 
 Your available actions are:
 
@@ -218,6 +241,18 @@ get_stock_price:
 e.g. get_stock_price: AAPL
 Returns real-time stock price information for a given symbol
 
+get_stock_prices:
+e.g. get_stock_prices: ["AAPL", "GOOGL", "MSFT", "TSLA"]
+Returns quotes for several symbols at once as one table (columns: symbol, price, change, change_percent, volume, age_s). Use it instead of several get_stock_price calls when comparing stocks or checking a portfolio
+
+get_price_history:
+e.g. get_price_history: {"symbol": "AAPL", "window": 90}
+Returns the trend over the last `window` trading days: return, high/low, SMA 20/50/200, EMA 12/26, RSI 14, annualized volatility and max/current drawdown
+
+analyze_portfolio:
+e.g. analyze_portfolio: {"holdings": {"AAPL": 10, "MSFT": 5, "TSLA": 8}, "window": 252}
+Returns portfolio risk and return over the last `window` trading days: annual return and volatility, Sharpe ratio, max drawdown, historical VaR/CVaR at 95% and 99% (daily, and in dollars when share counts are given), correlations, and a positions table with each holding's weight and share of return, risk and tail loss. A plain list of symbols is equal-weighted
+
 get_crypto_price:
 e.g. get_crypto_price: BTC
 Returns cryptocurrency price information
@@ -277,7 +312,8 @@ At the end of the loop you output an Answer.
 
 Use Thought to understand the question you have been asked.
 Use Action to run one of the actions available to you - then return PAUSE.
-Action_Response will be the result of running those actions.
+If you need several independent actions, return them together as a JSON list of action objects - then return PAUSE.
+Action_Response will be the result of running those actions, one line per action when you ran several.
 
 Your available actions are:
 
@@ -293,6 +329,10 @@ calculate_math_expression:
 e.g. calculate_math_expression: 2 + 3 * 4
 Returns mathematical results with expression analysis
 
+analyze_portfolio:
+e.g. analyze_portfolio: {"holdings": {"AAPL": 10, "MSFT": 5, "TSLA": 8}, "window": 252}
+Returns portfolio risk and return over the last `window` trading days: annual return and volatility, Sharpe ratio, max drawdown, historical VaR/CVaR at 95% and 99% (daily, and in dollars when share counts are given), correlations, and a positions table with each holding's weight and share of return, risk and tail loss. A plain list of symbols is equal-weighted
+
 get_current_time:
 e.g. get_current_time: 
 Returns the current date and time for data timestamping
@@ -0,0 +1,103 @@
+"""
+Shared in-process quote cache for get_stock_price and get_stock_prices.
+Quotes are kept per symbol and served while younger than QUOTE_FRESHNESS
+seconds, so a batch call reuses quotes fetched by single calls and the other
+way round. Missing symbols are fetched concurrently; the transport's Alpha
+Vantage token bucket paces them, and concurrent misses for the same symbol
+share one request.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from cache import MISS, TTLCache
+from config import Config
+from singleflight import AsyncSingleFlight
+
+# Quote fields shown in the get_stock_prices table, in column order
+TABLE_COLUMNS = ["symbol", "price", "change", "change_percent", "volume", "age_s"]
+
+def parse_symbols(symbols) -> List[str]:
+    """Accept a list or a comma/space separated string; upper-cased, deduplicated, in order."""
+    if isinstance(symbols, str):
+        symbols = re.split(r"[,\s]+", symbols)
+    seen = []
+    for symbol in symbols:
+        symbol = str(symbol).strip().upper()
+        if symbol and symbol not in seen:
+            seen.append(symbol)
+    return seen
+
+class QuoteCache:
+    """Per-symbol quotes with the time they were fetched."""
+
+    def __init__(self, freshness: float = Config.QUOTE_FRESHNESS, max_size: int = Config.QUOTE_CACHE_MAX_SIZE):
+        self.freshness = freshness
+        self._cache = TTLCache(max_size=max_size)
+        self._flights = AsyncSingleFlight()
+
+    def get(self, symbol: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """The cached quote with its age in seconds, or None when missing (or expired unless allow_stale)."""
+        entry = self._cache.get(symbol.upper(), allow_stale=allow_stale)
+        if entry is MISS:
+            return None
+        fetched_at, quote = entry
+        return {**quote, "age_s": round(time.time() - fetched_at, 1)}
+
+    def put(self, symbol: str, quote: Dict[str, Any]):
+        if "error" not in quote:
+            self._cache.set(symbol.upper(), (time.time(), quote), self.freshness)
+
+    async def get_many(self, symbols: List[str],
+                       fetch: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Quotes for all symbols: fresh ones from the cache, the rest fetched
+        concurrently with fetch(symbol). A failed fetch is answered with the
+        last known quote, marked stale, when there is one.
+        """
+        quotes = {symbol: self.get(symbol) for symbol in symbols}
+        missing = [symbol for symbol, quote in quotes.items() if quote is None]
+
+        async def load(symbol: str) -> Dict[str, Any]:
+            try:
+                quote = await fetch(symbol)
+            except Exception as e:
+                quote = {"error": str(e) or type(e).__name__}
+            if "error" in quote:
+                last = self.get(symbol, allow_stale=True)
+                return {**last, "stale": True} if last is not None else quote
+            self.put(symbol, quote)
+            return {**quote, "age_s": 0.0}
+
+        fetched = await asyncio.gather(*(self._flights.do(symbol, lambda symbol=symbol: load(symbol))
+                                         for symbol in missing))
+        quotes.update(zip(missing, fetched))
+        return quotes
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "freshness": self.freshness}
+
+def quote_table(quotes: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Compact table: one row per symbol in TABLE_COLUMNS order, errors listed separately."""
+    rows, errors, stale = [], {}, []
+    for symbol, quote in quotes.items():
+        if "error" in quote:
+            errors[symbol] = quote["error"]
+            continue
+        rows.append([symbol] + [quote.get(column) for column in TABLE_COLUMNS[1:]])
+        if quote.get("stale"):
+            stale.append(symbol)
+    table = {"columns": TABLE_COLUMNS, "rows": rows}
+    if stale:
+        table["stale"] = stale
+    if errors:
+        table["errors"] = errors
+    return table
+
+# Shared by the stock actions
+quote_cache = QuoteCache()
@@ -0,0 +1,124 @@
+"""
+Client-side rate limiting per upstream provider.
+Each provider gets a token bucket sized to its published quota. Calls queue
+for the next free token instead of hitting the upstream and getting an error,
+up to a maximum wait (or the caller's deadline, whichever is sooner).
+"""
+
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from circuit import UpstreamUnavailable
+from config import Config
+
+# Absolute time.monotonic() deadline of the request being served, if any
+# (set by server.py; rate-limit waits never run past it)
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# Upstream base URL -> (provider, requests allowed, per seconds)
+PROVIDER_LIMITS = {
+    Config.OPENWEATHER_BASE_URL: ("openweather", Config.OPENWEATHER_RATE_LIMIT, 60),
+    Config.ALPHA_VANTAGE_BASE_URL: ("alphavantage", Config.ALPHA_VANTAGE_RATE_LIMIT, 60),
+    Config.NEWS_API_BASE_URL: ("newsapi", Config.NEWS_RATE_LIMIT, 86400),
+    Config.DUCKDUCKGO_BASE_URL: ("duckduckgo", Config.SEARCH_RATE_LIMIT, 60),
+    Config.GITHUB_API_BASE_URL: ("github", Config.GITHUB_RATE_LIMIT, 3600),
+    Config.COINGECKO_BASE_URL: ("coingecko", Config.COINGECKO_RATE_LIMIT, 60)
+}
+
+class RateLimitExceeded(UpstreamUnavailable):
+    """Raised when the next token is further away than the caller can wait."""
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Waiting callers reserve a token up front, so
+    they are served in arrival order and the bucket can run into debt.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> float:
+        """Take a token and return how long to wait before using it, or raise RateLimitExceeded."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > max_wait:
+                raise RateLimitExceeded(f"next request slot in {wait:.1f}s")
+            self.tokens -= 1
+            return wait
+
+class RateLimiter:
+    """Per-provider token buckets keyed by upstream base URL."""
+
+    def __init__(self, limits: Optional[Dict[str, tuple]] = None, max_wait: float = Config.RATE_LIMIT_MAX_WAIT):
+        self.max_wait = max_wait
+        self._buckets = {}
+        self._providers = {}
+        for base_url, (provider, allowed, period) in (PROVIDER_LIMITS if limits is None else limits).items():
+            if allowed > 0:
+                self._providers[base_url.rstrip("/")] = provider
+                self._buckets.setdefault(provider, TokenBucket(allowed / period, allowed))
+        self._lock = threading.Lock()
+        self.waited = 0.0
+        self.delayed = 0
+        self.rejected = 0
+
+    def _allowed_wait(self) -> float:
+        deadline = request_deadline.get()
+        if deadline is None:
+            return self.max_wait
+        return max(0.0, min(self.max_wait, deadline - time.monotonic()))
+
+    def provider_for(self, url: str) -> Optional[str]:
+        for base_url, provider in self._providers.items():
+            if url == base_url or url.startswith(base_url + "/"):
+                return provider
+        return None
+
+    def _reserve(self, url: str) -> float:
+        provider = self.provider_for(url)
+        if provider is None:
+            return 0.0
+        try:
+            wait = self._buckets[provider].reserve(self._allowed_wait())
+        except RateLimitExceeded as e:
+            with self._lock:
+                self.rejected += 1
+            raise RateLimitExceeded(f"Rate limit for {provider} reached, {e}") from None
+        if wait:
+            with self._lock:
+                self.delayed += 1
+                self.waited += wait
+        return wait
+
+    def acquire(self, url: str):
+        """Block until the provider behind url allows another request."""
+        wait = self._reserve(url)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        """Async variant of acquire."""
+        wait = self._reserve(url)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "providers": {
+                    provider: round(bucket.tokens, 2) for provider, bucket in self._buckets.items()
+                },
+                "delayed": self.delayed,
+                "rejected": self.rejected,
+                "total_wait": round(self.waited, 3)
+            }
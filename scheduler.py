@@ -0,0 +1,191 @@
+"""
+Per-model request scheduler for the local Ollama backend.
+Limits concurrent requests per model, orders waiting requests by priority
+class, and groups them by model so a loaded model drains its queue before
+Ollama is asked to swap in another one.
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+from config import Config
+
+# Lower value runs first
+PRIORITIES = {
+    "interactive": 0,
+    "default": 1,
+    "batch": 2
+}
+
+def parse_model_limits(spec: str) -> Dict[str, int]:
+    """Parse "llama3.1:8b=2,llama3.1:70b=1" into {model: limit}."""
+    limits = {}
+    for item in (spec or "").split(","):
+        model, sep, limit = item.strip().rpartition("=")
+        if sep and model and limit.isdigit():
+            limits[model] = max(1, int(limit))
+    return limits
+
+class _Waiter:
+    """A request waiting for a slot, woken by a threading.Event or an asyncio future."""
+
+    def __init__(self, model: str, priority: int, seq: int, loop=None):
+        self.model = model
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self._loop = loop
+        self._event = None if loop else threading.Event()
+        self._future = loop.create_future() if loop else None
+
+    def grant(self):
+        self.granted = True
+        if self._loop is None:
+            self._event.set()
+        else:
+            self._loop.call_soon_threadsafe(lambda: self._future.done() or self._future.set_result(None))
+
+class ModelScheduler:
+    """
+    Admission control in front of the Ollama client, shared by threads and
+    asyncio tasks. A request may start when its model is below its concurrency
+    limit and either already loaded or there is room to load it (at most
+    max_loaded models run at once). Waiting requests are ranked by priority
+    class, then by whether their model is loaded, then by arrival. After
+    max_batch consecutive grants to loaded models while another model waits,
+    the waiting model is let in so it cannot starve.
+    """
+
+    def __init__(self, model_limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = Config.OLLAMA_MODEL_CONCURRENCY_DEFAULT,
+                 max_loaded: int = Config.OLLAMA_MAX_LOADED_MODELS,
+                 max_batch: int = Config.OLLAMA_SCHEDULER_MAX_BATCH):
+        self.model_limits = dict(parse_model_limits(Config.OLLAMA_MODEL_CONCURRENCY) if model_limits is None else model_limits)
+        self.default_limit = max(1, default_limit)
+        self.max_loaded = max(1, max_loaded)
+        self.max_batch = max(1, max_batch)
+        self._lock = threading.Lock()
+        self._waiters = []
+        self._running = Counter()
+        self._loaded = OrderedDict()  # models Ollama is assumed to hold in memory, oldest first
+        self._streak = 0
+        self._seq = itertools.count()
+        self.granted = Counter()
+        self.swaps = 0
+        self.wait_time = 0.0
+
+    def limit_for(self, model: str) -> int:
+        return self.model_limits.get(model, self.default_limit)
+
+    def _active_models(self) -> int:
+        return sum(1 for count in self._running.values() if count > 0)
+
+    def _rank(self, waiter: _Waiter):
+        swap = waiter.model not in self._loaded or self._streak >= self.max_batch
+        return waiter.priority, swap, waiter.seq
+
+    def _dispatch(self):
+        """Grant slots to waiting requests in rank order. Caller holds the lock."""
+        for waiter in sorted(self._waiters, key=self._rank):
+            if self._running[waiter.model] >= self.limit_for(waiter.model):
+                continue
+            needs_swap = waiter.model not in self._loaded
+            if needs_swap and self._active_models() >= self.max_loaded:
+                # Stop here so lower-ranked requests for loaded models do not
+                # keep them busy forever; the swap happens once they drain.
+                break
+            self._waiters.remove(waiter)
+            self._start(waiter.model, needs_swap)
+            self.wait_time += time.monotonic() - waiter.enqueued_at
+            waiter.grant()
+
+    def _start(self, model: str, needs_swap: bool):
+        waiting_elsewhere = any(w.model != model for w in self._waiters)
+        if needs_swap:
+            self._loaded[model] = None
+            while len(self._loaded) > self.max_loaded:
+                idle = next((name for name in self._loaded if not self._running[name]), None)
+                if idle is None:
+                    break
+                del self._loaded[idle]
+                self.swaps += 1
+            self._streak = 0
+        elif waiting_elsewhere:
+            self._streak += 1
+        else:
+            self._streak = 0
+        self._loaded.move_to_end(model)
+        self._running[model] += 1
+        self.granted[model] += 1
+
+    def _enqueue(self, model: str, priority: str, loop=None) -> _Waiter:
+        waiter = _Waiter(model, PRIORITIES.get(priority, PRIORITIES["default"]), next(self._seq), loop)
+        with self._lock:
+            self._waiters.append(waiter)
+            self._dispatch()
+        return waiter
+
+    def _cancel(self, waiter: _Waiter):
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                self._dispatch()
+                return
+        # Granted while being cancelled; hand the slot back
+        if waiter.granted:
+            self.release(waiter.model)
+
+    def release(self, model: str):
+        with self._lock:
+            self._running[model] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, model: str, priority: str = "default"):
+        """Block the calling thread until a slot for this model is free."""
+        waiter = self._enqueue(model, priority)
+        try:
+            waiter._event.wait()
+        except BaseException:
+            self._cancel(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    @asynccontextmanager
+    async def slot_async(self, model: str, priority: str = "default"):
+        """Wait on the event loop until a slot for this model is free."""
+        waiter = self._enqueue(model, priority, asyncio.get_running_loop())
+        try:
+            await waiter._future
+        except BaseException:
+            self._cancel(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self.release(model)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting = Counter(w.model for w in self._waiters)
+            total = sum(self.granted.values())
+            return {
+                "loaded": list(self._loaded),
+                "running": {model: count for model, count in self._running.items() if count},
+                "waiting": dict(waiting),
+                "granted": dict(self.granted),
+                "swaps": self.swaps,
+                "avg_wait_ms": round(self.wait_time / total * 1000, 1) if total else 0.0
+            }
+
+# Shared scheduler used by generate_text_with_conversation in main_ollama.py
+model_scheduler = ModelScheduler()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+HTTP Agent Service
+Exposes run_ai_agent_async per agent profile over HTTP with a bounded worker
+pool, an admission queue that rejects work when full, and per-request deadlines.
+
+Usage:
+    python server.py --backend ollama --port 8080
+    curl -X POST localhost:8080/agents/advanced -d '{"question": "What time is it?"}'
+"""
+
+import argparse
+import asyncio
+import importlib
+import math
+import time
+
+from aiohttp import web
+
+from actions import price_feed
+from cascade import parse_models
+from config import Config
+from ratelimit import request_deadline
+from transport import transport
+from prompts import (
+    basic_system_prompt,
+    advanced_system_prompt,
+    seo_auditor_prompt,
+    financial_analyst_prompt,
+    data_scientist_prompt
+)
+
+# Agent profiles exposed as /agents/{profile}
+AGENT_PROFILES = {
+    "basic": basic_system_prompt,
+    "advanced": advanced_system_prompt,
+    "seo": seo_auditor_prompt,
+    "financial": financial_analyst_prompt,
+    "data_scientist": data_scientist_prompt
+}
+
+# Engine module, default model and the other models clients may pick per backend;
+# both modules provide run_ai_agent_async
+BACKENDS = {
+    "openai": {"module": "main", "model": "gpt-3.5-turbo", "models": Config.OPENAI_CASCADE_MODELS},
+    "ollama": {"module": "main_ollama", "model": "llama3.1:8b", "models": Config.OLLAMA_CASCADE_MODELS}
+}
+
+class AgentJob:
+    """One admitted request waiting for, or running on, a worker."""
+
+    def __init__(self, profile, question, model, stream, deadline):
+        self.profile = profile
+        self.question = question
+        self.model = model
+        self.stream = stream
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.future = asyncio.get_running_loop().create_future()
+
+class AgentService:
+    """
+    Fixed pool of worker tasks draining a bounded admission queue.
+    Memory and concurrency stay bounded: at most `workers` agent sessions run
+    at once and at most `queue_depth` requests wait; the rest are rejected.
+    """
+
+    def __init__(self, backend="openai", workers=Config.SERVER_WORKERS, queue_depth=Config.SERVER_QUEUE_DEPTH,
+                 default_timeout=Config.SERVER_REQUEST_TIMEOUT):
+        self.backend = backend
+        self.engine = importlib.import_module(BACKENDS[backend]["module"])
+        self.default_model = BACKENDS[backend]["model"]
+        self.models = {self.default_model, *parse_models(BACKENDS[backend]["models"])}
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.default_timeout = default_timeout
+        self.queue = asyncio.Queue()
+        self.accepting = True
+        self.admitted = 0
+        self.busy = 0
+        self.abandoned = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._tasks = []
+
+    async def start(self, app=None):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, app=None):
+        """Stop admitting, let queued work finish, then stop the workers."""
+        self.accepting = False
+        await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, job):
+        """Admit a job, or raise asyncio.QueueFull when every worker is busy and the queue is full."""
+        if self.admitted >= self.workers + self.queue_depth:
+            raise asyncio.QueueFull()
+        self.admitted += 1
+        self.queue.put_nowait(job)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.admitted -= 1
+                self.queue.task_done()
+
+    async def _run(self, job):
+        # The client gave up or the deadline passed while queued
+        if job.future.done():
+            return
+        remaining = job.deadline - time.monotonic()
+        if remaining <= 0:
+            self.timed_out += 1
+            job.future.set_exception(asyncio.TimeoutError())
+            return
+
+        self.busy += 1
+        job.started_at = time.monotonic()
+        # Rate-limit waits inside the agent never run past the request deadline
+        request_deadline.set(job.deadline)
+        run = asyncio.ensure_future(asyncio.wait_for(
+            self.engine.run_ai_agent_async(job.question, AGENT_PROFILES[job.profile], job.model, stream=job.stream),
+            timeout=remaining
+        ))
+        # Free the worker as soon as the client stops waiting
+        job.future.add_done_callback(lambda future: run.cancel() if future.cancelled() else None)
+        try:
+            answer = await run
+            if not job.future.done():
+                job.future.set_result(answer)
+            self.completed += 1
+        except asyncio.CancelledError:
+            if not job.future.cancelled():
+                run.cancel()
+                raise
+            self.abandoned += 1
+        except asyncio.TimeoutError as e:
+            self.timed_out += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self.busy -= 1
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "accepting": self.accepting,
+            "workers": self.workers,
+            "busy": self.busy,
+            "queued": self.queue.qsize(),
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "abandoned": self.abandoned
+        }
+
+SERVICE = web.AppKey("service", AgentService)
+
+def json_error(status, message, **headers):
+    return web.json_response({"error": message}, status=status, headers=headers or None)
+
+def request_timeout(value, default_timeout):
+    """
+    Seconds the request may take: the client's 'timeout' capped at the
+    service default, or None when it is not a positive number.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    try:
+        timeout = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(timeout) or timeout <= 0:
+        return None
+    return min(timeout, default_timeout)
+
+async def handle_agent(request):
+    service = request.app[SERVICE]
+    profile = request.match_info["profile"]
+    if profile not in AGENT_PROFILES:
+        return json_error(404, f"Unknown agent profile '{profile}'. Available: {', '.join(AGENT_PROFILES)}")
+    if not service.accepting:
+        return json_error(503, "Service is shutting down", **{"Retry-After": "5"})
+
+    try:
+        body = await request.json()
+    except ValueError:
+        return json_error(400, "Request body must be JSON")
+    question = (body.get("question") or "").strip() if isinstance(body, dict) else ""
+    if not question:
+        return json_error(400, "Missing 'question'")
+
+    timeout = service.default_timeout
+    if body.get("timeout") is not None:
+        timeout = request_timeout(body["timeout"], service.default_timeout)
+        if timeout is None:
+            return json_error(400, "'timeout' must be a positive number of seconds")
+    model = body.get("model") or service.default_model
+    if not isinstance(model, str) or model not in service.models:
+        return json_error(400, f"Unknown model {model!r}. Available: {', '.join(sorted(service.models))}")
+    job = AgentJob(profile, question, model, bool(body.get("stream", False)), time.monotonic() + timeout)
+
+    try:
+        service.submit(job)
+    except asyncio.QueueFull:
+        service.rejected += 1
+        return json_error(429, "Too many requests queued, retry later", **{"Retry-After": "1"})
+
+    try:
+        answer = await asyncio.wait_for(asyncio.shield(job.future), timeout=timeout)
+    except asyncio.TimeoutError:
+        job.future.cancel()
+        return json_error(504, f"Agent did not answer within {timeout:g} seconds")
+    except asyncio.CancelledError:
+        # Client disconnected; let the worker skip or abandon the job
+        job.future.cancel()
+        raise
+    except Exception as e:
+        return json_error(500, f"Agent error: {str(e)}")
+
+    now = time.monotonic()
+    started = job.started_at or now
+    return web.json_response({
+        "profile": profile,
+        "model": model,
+        "question": question,
+        "answer": answer,
+        "queue_ms": round((started - job.enqueued_at) * 1000, 1),
+        "run_ms": round((now - started) * 1000, 1)
+    })
+
+async def handle_profiles(request):
+    return web.json_response({"profiles": list(AGENT_PROFILES)})
+
+async def handle_health(request):
+    return web.json_response({**request.app[SERVICE].stats(), "upstreams": transport.stats(),
+                              "price_feed": price_feed.stats()})
+
+async def start_price_feed(app):
+    if Config.PRICE_FEED_ENABLED:
+        price_feed.start()
+
+async def stop_price_feed(app):
+    await asyncio.to_thread(price_feed.stop, 5)
+
+async def close_transport(app):
+    await transport.aclose()
+    transport.close()
+
+def create_app(backend="openai", workers=Config.SERVER_WORKERS, queue_depth=Config.SERVER_QUEUE_DEPTH,
+               default_timeout=Config.SERVER_REQUEST_TIMEOUT):
+    """Build the aiohttp application with its agent service."""
+    service = AgentService(backend, workers, queue_depth, default_timeout)
+    app = web.Application()
+    app[SERVICE] = service
+    app.on_startup.append(service.start)
+    app.on_startup.append(start_price_feed)
+    app.on_shutdown.append(service.stop)
+    app.on_shutdown.append(stop_price_feed)
+    app.on_cleanup.append(close_transport)
+    app.router.add_post("/agents/{profile}", handle_agent)
+    app.router.add_get("/agents", handle_profiles)
+    app.router.add_get("/health", handle_health)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the AI agents over HTTP")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="openai")
+    parser.add_argument("--host", default=Config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=Config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=Config.SERVER_WORKERS)
+    parser.add_argument("--queue-depth", type=int, default=Config.SERVER_QUEUE_DEPTH)
+    parser.add_argument("--timeout", type=float, default=Config.SERVER_REQUEST_TIMEOUT,
+                        help="Maximum seconds per request, including time queued")
+    args = parser.parse_args()
+
+    print(f"🤖 AI Agent Service ({args.backend}) on http://{args.host}:{args.port}")
+    print(f"Workers: {args.workers}, queue depth: {args.queue_depth}, deadline: {args.timeout:g}s")
+    web.run_app(create_app(args.backend, args.workers, args.queue_depth, args.timeout),
+                host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
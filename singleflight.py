@@ -0,0 +1,71 @@
+"""
+Request coalescing for identical concurrent calls.
+While a call for a key is in flight, later callers with the same key wait for
+it and share its result instead of issuing their own upstream request.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Hashable
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Thread-based single-flight: one caller runs, the others block on its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+class AsyncSingleFlight:
+    """
+    Asyncio single-flight. The shared call runs as its own task, so a caller
+    being cancelled does not cancel the request the others are waiting on.
+    """
+
+    def __init__(self):
+        # In-flight tasks per event loop
+        self._calls = weakref.WeakKeyDictionary()
+        self.shared = 0
+
+    async def do(self, key: Hashable, coroutine_function: Callable[[], Awaitable[Any]]) -> Any:
+        calls = self._calls.setdefault(asyncio.get_running_loop(), {})
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(coroutine_function())
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
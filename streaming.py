@@ -0,0 +1,96 @@
+"""
+Streaming helpers for the ReAct loop.
+Watches LLM tokens as they arrive so generation can be cancelled as soon as the
+turn's action is complete, instead of waiting for max_tokens of rambling.
+"""
+
+import json
+
+PAUSE_MARKER = "PAUSE"
+
+class ActionStreamMonitor:
+    """
+    Incrementally scans streamed LLM text for the end of an action turn.
+
+    The turn is complete when PAUSE appears outside any JSON value (so an
+    argument like "PAUSE button" does not end the turn), or when a complete
+    action JSON value (object or list of objects with "function_name") is followed by
+    text that is neither another JSON value nor the start of PAUSE.
+    Each character is scanned once, so the cost per token stays constant.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.stop_reason = None
+        self._scanned = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._value_start = None
+        self._action_end = None
+        self._pause_end = None
+
+    def feed(self, chunk):
+        """
+        Add a streamed chunk. Returns True once generation can be stopped.
+        """
+        if self.stop_reason or not chunk:
+            return bool(self.stop_reason)
+
+        self.text += chunk
+        self._scan()
+
+        if self._pause_end is not None:
+            self.stop_reason = "pause"
+        elif self._action_end is not None and self._depth == 0:
+            tail = self.text[self._action_end:].lstrip()
+            if tail and not PAUSE_MARKER.startswith(tail[:len(PAUSE_MARKER)]):
+                self.stop_reason = "action"
+
+        return bool(self.stop_reason)
+
+    def _scan(self):
+        text = self.text
+        for index in range(self._scanned, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif (self._depth == 0 and index + 1 >= len(PAUSE_MARKER)
+                  and text.startswith(PAUSE_MARKER, index + 1 - len(PAUSE_MARKER))):
+                self._pause_end = index + 1
+                break
+            elif char == '"' and self._depth > 0:
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._value_start = index
+                self._depth += 1
+            elif char in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0 and _is_action(text[self._value_start:index + 1]):
+                    self._action_end = index + 1
+        self._scanned = len(text)
+
+    def result(self):
+        """
+        Return the turn's text, trimmed to the action so history stays in ReAct format.
+        """
+        if self.stop_reason == "pause":
+            return self.text[:self._pause_end]
+        if self.stop_reason == "action":
+            return self.text[:self._action_end] + f"\n\n{PAUSE_MARKER}"
+        return self.text
+
+def _is_action(candidate):
+    """Check whether a complete JSON value is an action object or list of them."""
+    try:
+        value = json.loads(candidate)
+    except (json.JSONDecodeError, ValueError):
+        return False
+    values = value if isinstance(value, list) else [value]
+    return bool(values) and all(isinstance(v, dict) and "function_name" in v for v in values)
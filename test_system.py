@@ -77,6 +77,850 @@ def test_json_extraction():
     except ImportError:
         print("  Skipping JSON extraction test (main.py not available)")
 
+def test_multi_action_extraction():
+    """Test extracting and running several actions from one LLM turn."""
+    print("\nTesting Multi-Action Extraction")
+    print("=" * 40)
+    
+    try:
+        from main import extract_actions, execute_functions, format_action_response
+        
+        test_responses = [
+            'Action: [{"function_name": "get_weather_info", "function_parms": {"city": "london"}}, '
+            '{"function_name": "get_current_time", "function_parms": {}}] PAUSE',
+            'Action: {"function_name": "get_weather_info", "function_parms": {"city": "london"}}\n'
+            '{"function_name": "calculate_math_expression", "function_parms": {"expression": "2+2"}} PAUSE',
+            'Action: {"function_name": "get_response_time", "function_parms": {"url": "test.com"}} PAUSE',
+            'No function call here'
+        ]
+        
+        for i, response in enumerate(test_responses, 1):
+            function_calls = extract_actions(response)
+            print(f"  Test {i}: {[call.get('function_name') for call in function_calls]}")
+        
+        function_calls = extract_actions(test_responses[1])
+        function_results = execute_functions(function_calls)
+        print(f"  Combined: {format_action_response(function_calls, function_results)}")
+            
+    except ImportError:
+        print("  Skipping multi-action extraction test (main.py not available)")
+
+def test_action_cache():
+    """Test the per-tool TTL cache in front of the action dispatch."""
+    print("\nTesting Action Cache")
+    print("=" * 40)
+    
+    from cache import ActionCache, TTLCache, MISS, make_action_key
+    
+    calls = []
+    def fake_weather(city):
+        calls.append(city)
+        return {"city": city, "temperature": 70}
+    
+    cache = ActionCache(ttls={"get_weather_info": 60})
+    for city in ["London", " london", "LONDON", "Paris"]:
+        cache.call("get_weather_info", fake_weather, {"city": city})
+    print(f"  Upstream calls: {calls}")
+    print(f"  Stats: {cache.stats()}")
+    
+    print(f"  List keys equal: {make_action_key('get_stock_prices', {'symbols': ['AAPL', 'MSFT']}) == make_action_key('get_stock_prices', {'symbols': [' aapl', 'msft']})}")
+    print(f"  Dict keys equal: {make_action_key('analyze_portfolio', {'holdings': {'AAPL': 10, 'MSFT': 5}}) == make_action_key('analyze_portfolio', {'holdings': {'msft': 5, 'aapl': 10}})}")
+    
+    lru = TTLCache(max_size=2)
+    lru.set("a", 1, 60)
+    lru.set("b", 2, 60)
+    lru.get("a")
+    lru.set("c", 3, 60)
+    print(f"  LRU keeps: {[key for key in 'abc' if lru.get(key, allow_stale=True) is not MISS]}")
+    print(f"  LRU stats: {lru.stats()}")
+
+def test_answer_cache():
+    """Test the near-duplicate answer cache."""
+    print("\nTesting Answer Cache")
+    print("=" * 40)
+    
+    from answer_cache import AnswerCache
+    
+    cache = AnswerCache(enabled=True)
+    cache.store("What is the stock price of Apple?", "prompt", "Answer: AAPL is $150.25", ["get_stock_price"])
+    cache.store("What's the weather like in London?", "prompt", "Answer: London is cloudy", ["get_weather_info"])
+    cache.store("What time is it?", "prompt", "Answer: 14:30", ["get_current_time"])
+    
+    test_questions = [
+        ("Apple stock price now", "prompt"),
+        ("what is the weather in london right now", "prompt"),
+        ("weather in Paris", "prompt"),
+        ("What time is it?", "prompt"),
+        ("Apple stock price now", "other prompt")
+    ]
+    for question, prompt in test_questions:
+        print(f"  {question!r} ({prompt}): {cache.lookup(question, prompt)}")
+    print(f"  Stats: {cache.stats()}")
+    
+    # Operators and operand order are entities; calculator answers are never stored
+    cache.store("What is 3+2?", "prompt", "Answer: 5", [])
+    assert cache.lookup("What is 3+2?", "prompt") == "Answer: 5"
+    assert cache.lookup("What is 3*2?", "prompt") is None
+    assert cache.lookup("What is 2+3?", "prompt") is None
+    cache.store("What is 7*6?", "prompt", "Answer: 42", ["calculate_math_expression"])
+    assert cache.lookup("What is 7*6?", "prompt") is None
+    assert cache.lookup("weather in Paris", "prompt") is None
+
+def test_model_scheduler():
+    """Test per-model scheduling of Ollama requests."""
+    print("\nTesting Model Scheduler")
+    print("=" * 40)
+    
+    import threading
+    import time
+    from scheduler import ModelScheduler
+    
+    scheduler = ModelScheduler({"llama3.1:8b": 2, "llama3.1:70b": 1}, max_loaded=1, max_batch=8)
+    order = []
+    
+    def request(model):
+        with scheduler.slot(model, "batch"):
+            order.append(model)
+            time.sleep(0.02)
+    
+    # Interleaved requests for two models should be grouped to avoid swaps
+    threads = [threading.Thread(target=request, args=(model,)) for model in ["llama3.1:8b", "llama3.1:70b"] * 3]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.002)
+    for thread in threads:
+        thread.join()
+    
+    print(f"  Run order: {order}")
+    print(f"  Stats: {scheduler.stats()}")
+
+def test_cascade_checks():
+    """Test the model cascade escalation checks."""
+    print("\nTesting Model Cascade Checks")
+    print("=" * 40)
+    
+    from cascade import CascadeStats, check_turn
+    
+    known_actions = {"get_current_time", "get_weather_info"}
+    test_turns = [
+        ("Answer: It is 14:30", []),
+        ('{"function_name": "get_current_time", "function_parms": {}}\n\nPAUSE',
+         [{"function_name": "get_current_time", "function_parms": {}}]),
+        ('{"function_name": "get_magic", "function_parms": {}}\n\nPAUSE',
+         [{"function_name": "get_magic", "function_parms": {}}]),
+        ('{"function_name": get_current_time\n\nPAUSE', []),
+        ("Error: connection refused", [])
+    ]
+    stats = CascadeStats()
+    for response, function_calls in test_turns:
+        failure = check_turn(response, function_calls, known_actions)
+        stats.record("small", failure)
+        print(f"  {response[:40]!r}: {failure or 'ok'}")
+    print(f"  Stats: {stats.stats()}")
+
+def test_http_cache():
+    """Test HTTP cache freshness rules."""
+    print("\nTesting HTTP Cache")
+    print("=" * 40)
+    
+    from httpcache import CachedResponse, freshness_lifetime
+    
+    test_headers = [
+        {"Cache-Control": "public, max-age=60, s-maxage=60", "ETag": '"abc"'},
+        {"Cache-Control": "max-age=60", "Age": "50"},
+        {"Cache-Control": "no-cache", "ETag": '"abc"'},
+        {"Cache-Control": "no-store"},
+        {"Date": "Mon, 01 Jan 2024 00:00:00 GMT", "Expires": "Mon, 01 Jan 2024 00:05:00 GMT"},
+        {"Date": "Mon, 01 Jan 2024 00:00:00 GMT", "Last-Modified": "Sun, 31 Dec 2023 00:00:00 GMT"}
+    ]
+    for headers in test_headers:
+        print(f"  {headers}: {freshness_lifetime(headers)}")
+    
+    entry = CachedResponse(200, {"ETag": '"abc"', "Last-Modified": "Sun, 31 Dec 2023 00:00:00 GMT"}, b"{}", "url", None, 0)
+    print(f"  Revalidation headers: {entry.validators()}")
+    
+    import asyncio
+    from aiohttp import web
+    from transport import HTTPTransport
+    from ratelimit import RateLimiter
+    
+    statuses = []
+    async def page(request):
+        status = 304 if request.headers.get("If-None-Match") == '"v1"' else 200
+        statuses.append(status)
+        body = None if status == 304 else "<html><title>Cached</title></html>"
+        return web.Response(status=status, text=body, content_type="text/html",
+                            headers={"ETag": '"v1"', "Cache-Control": "no-cache"})
+    
+    async def read_streamed(client, url):
+        async with client.cached_stream_async(url) as body:
+            return b"".join([chunk async for chunk in body]), body.from_cache
+    
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        client = HTTPTransport(retries=0, rate_limiter=RateLimiter({}))
+        try:
+            url = "http://127.0.0.1:%d/" % runner.addresses[0][1]
+            return [await read_streamed(client, url) for _ in range(2)]
+        finally:
+            await runner.cleanup()
+    
+    first, second = asyncio.run(run())
+    print(f"  Streamed twice: upstream statuses {statuses}, second from cache: {second[1]}")
+    assert statuses == [200, 304] and second == (first[0], True)
+
+def test_transport_background_loop():
+    """Test that sync callers share the transport's background loop and session."""
+    print("\nTesting Transport Background Loop")
+    print("=" * 40)
+    
+    from concurrent.futures import ThreadPoolExecutor
+    from transport import HTTPTransport
+    
+    client = HTTPTransport()
+    
+    async def session_id():
+        return id(await client.async_session())
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        sessions = list(executor.map(lambda _: client.run_sync(session_id()), range(8)))
+    print(f"  8 sync calls from 4 threads used {len(set(sessions))} aiohttp session(s)")
+    client.close()
+    print(f"  Closed, new loop on next call: {client.run_sync(session_id()) not in sessions}")
+    client.close()
+
+def test_rate_limiter():
+    """Test per-provider rate limiting and the stale fallback."""
+    print("\nTesting Rate Limiter")
+    print("=" * 40)
+    
+    import asyncio
+    import time
+    from aiohttp import web
+    from cache import ActionCache
+    from ratelimit import RateLimiter, RateLimitExceeded
+    from transport import HTTPTransport
+    
+    limiter = RateLimiter({"https://api.example.com": ("example", 5, 1)}, max_wait=0.5)
+    start = time.time()
+    for _ in range(7):
+        limiter.acquire("https://api.example.com/quote")
+    elapsed = time.time() - start
+    print(f"  7 calls at 5/s took {elapsed:.2f}s")
+    assert elapsed >= 0.3
+    
+    rejected = None
+    try:
+        limiter.max_wait = 0
+        limiter.acquire("https://api.example.com/quote")
+    except RateLimitExceeded as e:
+        rejected = e
+        print(f"  Rejected: {e}")
+    print(f"  Stats: {limiter.stats()}")
+    assert rejected is not None and limiter.rejected == 1
+    
+    async def retries_take_tokens():
+        hits = []
+        
+        async def busy(request):
+            hits.append(request.path)
+            return web.Response(status=int(request.path[1:]), headers={"Retry-After": "0"})
+        
+        app = web.Application()
+        app.router.add_get("/{status}", busy)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = "http://127.0.0.1:%d" % runner.addresses[0][1]
+        try:
+            for status in (429, 503):
+                hits.clear()
+                client = HTTPTransport(retries=3, rate_limiter=RateLimiter({base: ("busy", 2, 60)}, max_wait=0))
+                try:
+                    result = await client.get_async(f"{base}/{status}", cache=False, circuit=False)
+                finally:
+                    await client.aclose()
+                print(f"  {status} with 3 retries and 2 tokens: {len(hits)} upstream requests, status {result.status_code}")
+                assert len(hits) == 2 and result.status_code == status
+        finally:
+            await runner.cleanup()
+    
+    asyncio.run(retries_take_tokens())
+    
+    cache = ActionCache(ttls={"get_stock_price": 0.01})
+    cache.call("get_stock_price", lambda symbol: {"symbol": symbol, "price": 150.25}, {"symbol": "AAPL"})
+    time.sleep(0.02)
+    result = cache.call("get_stock_price", lambda symbol: {"error": "Rate limit reached"}, {"symbol": "AAPL"})
+    print(f"  Fallback after error: {result}")
+    assert result == {"symbol": "AAPL", "price": 150.25, "stale": True}
+
+def test_request_coalescing():
+    """Test that identical concurrent tool calls share one upstream request."""
+    print("\nTesting Request Coalescing")
+    print("=" * 40)
+    
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from cache import ActionCache
+    
+    cache = ActionCache(enabled=False)
+    upstream_calls = []
+    
+    def slow_quote(symbol):
+        upstream_calls.append(symbol)
+        time.sleep(0.1)
+        return {"symbol": symbol.upper(), "price": 150.25}
+    
+    symbols = ["AAPL", "aapl", " AAPL", "AAPL", "MSFT", "msft"]
+    with ThreadPoolExecutor(max_workers=len(symbols)) as executor:
+        results = list(executor.map(lambda symbol: cache.call("get_stock_price", slow_quote, {"symbol": symbol}), symbols))
+    
+    print(f"  {len(symbols)} calls, {len(upstream_calls)} upstream requests: {upstream_calls}")
+    print(f"  Results: {results}")
+    print(f"  Coalesced: {cache.stats()['coalesced']}")
+    assert sorted(upstream_calls) == ["AAPL", "MSFT"]
+    
+    probes = []
+    def probe(url):
+        probes.append(url)
+        time.sleep(0.05)
+        return {"url": url, "response_time_ms": 50.0}
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: cache.call("get_response_time", probe, {"url": "https://example.com"}), range(3)))
+    print(f"  3 concurrent latency probes, {len(probes)} upstream requests")
+    assert len(probes) == 3
+
+def test_circuit_breaker():
+    """Test circuit breaker state changes and the offline fallback."""
+    print("\nTesting Circuit Breaker")
+    print("=" * 40)
+    
+    import time
+    from cache import ActionCache
+    from circuit import CircuitBreaker, CircuitBreakers, CircuitOpenError
+    from ratelimit import RateLimiter
+    from actions import fallback_actions
+    
+    breaker = CircuitBreaker("api.openweathermap.org", min_calls=3, open_seconds=0.05)
+    states = []
+    for latency in [0.1, 12.0, 10.5, 11.0]:
+        try:
+            breaker.before_call()
+            breaker.record(success=latency < 10, latency=latency)
+            print(f"  Call took {latency}s -> {breaker.state}")
+            states.append(breaker.state)
+        except CircuitOpenError as e:
+            print(f"  Failed fast: {e}")
+            states.append("rejected")
+    assert states == ["closed", "closed", "open", "rejected"]
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    try:
+        breaker.before_call()
+        raise AssertionError("second call during the recovery probe was let through")
+    except CircuitOpenError:
+        pass
+    breaker.record(success=True, latency=0.2)
+    print(f"  Recovery probe succeeded -> {breaker.state}")
+    print(f"  Stats: {breaker.stats()}")
+    assert breaker.state == "closed" and breaker.times_opened == 1 and breaker.rejected == 2
+    
+    breakers = CircuitBreakers(max_hosts=3, min_calls=1)
+    failing = breakers.for_url("https://down.example.com/")
+    failing.before_call()
+    failing.record(success=False, latency=0.1)
+    for index in range(10):
+        breakers.for_url(f"https://site{index}.example.com/page")
+    print(f"  Breakers kept after 11 hosts (max 3): {list(breakers.stats())}")
+    assert list(breakers.stats()) == ["down.example.com", "site8.example.com", "site9.example.com"]
+    assert breakers.for_url("https://down.example.com/other") is failing
+    
+    # Breakers are per provider where the rate limiter knows one, else per host and port
+    keyed = CircuitBreakers(provider_for=RateLimiter().provider_for)
+    keys = [keyed.key_for(url) for url in ("https://api.github.com/repos/a/b", "https://api.github.com/users/c",
+                                           "http://127.0.0.1:8001/", "http://127.0.0.1:8002/")]
+    print(f"  Breaker keys: {keys}")
+    assert keys == ["github", "github", "127.0.0.1:8001", "127.0.0.1:8002"]
+    
+    cache = ActionCache()
+    outage = lambda city: {"error": "Failed to get weather data: circuit open", "upstream_unavailable": True}
+    result = cache.call("get_weather_info", outage, {"city": "London"}, fallback_actions["get_weather_info"])
+    print(f"  Fallback during outage: {result}")
+    assert result["fallback"] == "offline data, upstream unavailable" and "error" not in result
+
+def test_fake_upstreams():
+    """Test the actions' parsers against the offline fake upstream server."""
+    print("\nTesting Fake Upstreams")
+    print("=" * 40)
+    
+    import asyncio
+    from aiohttp import web
+    from fake_upstreams import FakeProvider, LatencyModel, create_app, default_providers
+    from transport import HTTPTransport
+    from ratelimit import RateLimiter
+    from actions import _parse_weather, _parse_search, _parse_stock_quote, _parse_news, _parse_github
+    
+    async def run():
+        providers = default_providers(LatencyModel("lognormal", median_ms=5, spread=0.5))
+        providers["newsapi"] = FakeProvider("newsapi", rate_limit=(1, 60))
+        runner = web.AppRunner(create_app(providers, seed=1))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = "http://127.0.0.1:%d" % runner.addresses[0][1]
+        client = HTTPTransport(retries=0, rate_limiter=RateLimiter({}))
+        try:
+            weather = await client.get_async(f"{base}/openweather/data/2.5/weather", params={"q": "London", "appid": "x"})
+            print(f"  Weather: {_parse_weather(weather.json())}")
+            search = await client.get_async(f"{base}/duckduckgo/", params={"q": "python", "format": "json"})
+            print(f"  Search topics: {len(_parse_search('python', search.json(), 3)['related_topics'])}")
+            quote = await client.get_async(f"{base}/alphavantage/query", params={"function": "GLOBAL_QUOTE", "symbol": "AAPL"})
+            print(f"  Quote: {_parse_stock_quote(quote.json())}")
+            for _ in range(2):
+                news = await client.get_async(f"{base}/newsapi/v2/top-headlines", params={"category": "technology", "apiKey": "x"})
+                print(f"  News: {news.status_code} {news.headers.get('Retry-After') or _parse_news('technology', 'us', news.json())['total_results']}")
+            for _ in range(2):
+                repo = await client.get_async(f"{base}/github/repos/octocat/hello-world")
+                print(f"  GitHub: {_parse_github(repo.json())['full_name']}")
+            stats = await client.get_async(f"{base}/_stats", cache=False)
+            print(f"  Server stats: { {name: dict(requests=s.get('requests'), rate_limited=s.get('rate_limited', 0)) for name, s in stats.json().items()} }")
+            print(f"  Client HTTP cache: {client.http_cache.stats()}")
+        finally:
+            await client.aclose()
+            await runner.cleanup()
+    
+    asyncio.run(run())
+
+def test_fake_llm_server():
+    """Test the OpenAI and Ollama clients against the fake LLM server."""
+    print("\nTesting Fake LLM Server")
+    print("=" * 40)
+    
+    import asyncio
+    import time
+    from aiohttp import web
+    from openai import AsyncOpenAI
+    from ollama import AsyncClient
+    from fake_llm_server import FakeLLM, ModelTiming, create_app
+    from streaming import ActionStreamMonitor
+    from main import extract_actions
+    
+    async def run():
+        llm = FakeLLM(ModelTiming(ttft_ms=20, tokens_per_second=500), ramble=100)
+        runner = web.AppRunner(create_app(llm))
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = "http://127.0.0.1:%d" % runner.addresses[0][1]
+        openai_client = AsyncOpenAI(api_key="fake", base_url=f"{base}/v1")
+        ollama_client = AsyncClient(host=base)
+        messages = [{"role": "user", "content": "What is the weather in Tokyo?"}]
+        try:
+            start = time.time()
+            response = await openai_client.chat.completions.create(model="gpt-3.5-turbo", messages=messages)
+            text = response.choices[0].message.content
+            print(f"  OpenAI action: {extract_actions(text)} ({response.usage.completion_tokens} tokens, {time.time() - start:.2f}s)")
+            
+            start = time.time()
+            monitor = ActionStreamMonitor()
+            stream = await openai_client.chat.completions.create(model="gpt-3.5-turbo", messages=messages, stream=True)
+            async for chunk in stream:
+                if chunk.choices and monitor.feed(chunk.choices[0].delta.content):
+                    break
+            await stream.response.aclose()
+            print(f"  OpenAI stream stopped on {monitor.stop_reason} after {time.time() - start:.2f}s")
+            
+            chunks = await ollama_client.generate(model="llama3.1:8b", prompt="User: What time is it?\n\nAssistant: ", stream=True)
+            text = "".join([chunk["response"] async for chunk in chunks])
+            print(f"  Ollama generate action: {extract_actions(text)}")
+            
+            messages += [{"role": "assistant", "content": text}, {"role": "user", "content": "Function result: {'temperature': 75}"}]
+            response = await ollama_client.chat(model="llama3.1:8b", messages=messages)
+            print(f"  Ollama chat: {response.message.content}")
+            await asyncio.sleep(0.05)
+            print(f"  Server stats: {llm.stats()}")
+        finally:
+            await openai_client.close()
+            await runner.cleanup()
+    
+    asyncio.run(run())
+
+def test_agent_service_validation():
+    """Test the agent service's request validation."""
+    print("\nTesting Agent Service Validation")
+    print("=" * 40)
+    
+    import asyncio
+    import aiohttp
+    from aiohttp import web
+    from server import SERVICE, AgentService, handle_agent, request_timeout
+    
+    timeouts = [request_timeout(value, 60) for value in (5, '2.5', 600, 0, -1, None, 'abc', True, float('nan'))]
+    print(f"  Timeouts: {timeouts}")
+    assert timeouts == [5.0, 2.5, 60, None, None, None, None, None, None]
+    
+    async def run():
+        app = web.Application()
+        app[SERVICE] = AgentService(workers=1, queue_depth=1, default_timeout=60)
+        app.router.add_post("/agents/{profile}", handle_agent)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = "http://127.0.0.1:%d/agents/basic" % runner.addresses[0][1]
+        try:
+            async with aiohttp.ClientSession() as session:
+                for timeout in ("abc", 0, -5):
+                    async with session.post(url, json={"question": "What time is it?", "timeout": timeout}) as response:
+                        error = (await response.json())["error"]
+                        print(f"  timeout={timeout!r}: HTTP {response.status} {error}")
+                        assert response.status == 400 and "timeout" in error
+                # A null timeout means the service default, so only the unknown model is rejected
+                for model in ("no-such-model", ["gpt-4"]):
+                    body = {"question": "What time is it?", "timeout": None, "model": model}
+                    async with session.post(url, json=body) as response:
+                        error = (await response.json())["error"]
+                        print(f"  model={model!r}: HTTP {response.status} {error}")
+                        assert response.status == 400 and "Unknown model" in error
+        finally:
+            await runner.cleanup()
+    
+    asyncio.run(run())
+
+def test_stream_monitor():
+    """Test where the streaming monitor ends an action turn."""
+    print("\nTesting Stream Monitor")
+    print("=" * 40)
+    
+    from streaming import ActionStreamMonitor
+    
+    turn = 'Thought: search it\nAction: {"function_name": "search_web", "function_parms": {"query": "PAUSE button"}}\n\nPAUSE\n\nrambling'
+    monitor = ActionStreamMonitor()
+    for start in range(0, len(turn), 3):
+        if monitor.feed(turn[start:start + 3]):
+            break
+    print(f"  PAUSE inside an argument: stopped on {monitor.stop_reason}, result ends with {monitor.result()[-30:]!r}")
+    assert monitor.stop_reason == "pause"
+    assert monitor.result() == turn[:turn.index("\n\nrambling")]
+    
+    monitor = ActionStreamMonitor()
+    monitor.feed('Action: {"function_name": "get_current_time", "function_parms": {}}\nAnswer: it is noon')
+    print(f"  Action without PAUSE: stopped on {monitor.stop_reason}, result {monitor.result()!r}")
+    assert monitor.stop_reason == "action"
+    assert monitor.result() == 'Action: {"function_name": "get_current_time", "function_parms": {}}\n\nPAUSE'
+    
+    # Unquoted PAUSE inside a JSON value (depth > 0) does not end the turn; one after it does
+    monitor = ActionStreamMonitor()
+    stopped = [monitor.feed(chunk) for chunk in ('Action: {"function_parms": [PAUSE', ', {PAUSE}]', '}\nPAUSE')]
+    print(f"  PAUSE at depth > 0 ignored: {stopped}")
+    assert stopped == [False, False, True] and monitor.stop_reason == "pause"
+
+def test_latency_probe():
+    """Test the bulk latency probe against a local server."""
+    print("\nTesting Latency Probe")
+    print("=" * 40)
+    
+    import asyncio
+    import time
+    from aiohttp import web
+    from probe import csv_row, percentile, probe_urls
+    
+    for count in (8, 10, 20):
+        values = list(range(1, count + 1))
+        print(f"  Nearest rank of 1..{count}: p50 {percentile(values, 0.5)}, p95 {percentile(values, 0.95)}")
+    
+    async def run():
+        async def page(request):
+            await asyncio.sleep(0.01)
+            return web.Response(body=b"x" * 100000)
+        
+        app = web.Application()
+        app.router.add_get("/", page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        base = "http://127.0.0.1:%d" % runner.addresses[0][1]
+        urls = [f"{base}/?page={index}" for index in range(100)] + ["http://nonexistent.invalid/"]
+        try:
+            start = time.time()
+            results = [result async for result in probe_urls(urls, samples=3, concurrency=25)]
+            print(f"  Probed {len(results)} URLs x 3 samples in {time.time() - start:.2f}s")
+            print(f"  Sample: {results[0]}")
+            print(f"  CSV row: {csv_row(results[0])}")
+            print(f"  Failure: {[result for result in results if result['errors']]}")
+        finally:
+            await runner.cleanup()
+    
+    asyncio.run(run())
+
+def test_html_analysis():
+    """Test the streaming single-pass HTML analyzer."""
+    print("\nTesting HTML Analysis")
+    print("=" * 40)
+    
+    import time
+    from bs4 import BeautifulSoup
+    from html_analysis import StreamingPageAnalyzer, analyze_html, available_backend
+    
+    page = ("<html lang='en'><head><title> Demo </title><meta name='description' content='A demo page'>"
+            "<script>var x = 1;</script></head><body>" +
+            "<h1>Intro</h1><h2>Part<b>One</b></h2><p>Some text &amp; more</p><img src='a.png'><a href='/'>home</a>" * 2000 +
+            "</body></html>").encode()
+    
+    start = time.perf_counter()
+    analyzer = StreamingPageAnalyzer("text/html; charset=utf-8")
+    for index in range(0, len(page), 4096):
+        analyzer.feed(page[index:index + 4096])
+    result = analyzer.close()
+    print(f"  {available_backend()} single pass: {(time.perf_counter() - start) * 1000:.1f}ms -> {result}")
+    
+    start = time.perf_counter()
+    soup = BeautifulSoup(page, "html.parser")
+    words = len(soup.get_text().split())
+    print(f"  BeautifulSoup: {(time.perf_counter() - start) * 1000:.1f}ms, words match: {words == result['word_count']}")
+    
+    capped = analyze_html(page, max_bytes=10000)
+    print(f"  Capped at 10000 bytes: content_length={capped['content_length']}, truncated={capped.get('truncated')}")
+
+def test_crawler():
+    """Test the async site crawler against a local site."""
+    print("\nTesting Site Crawler")
+    print("=" * 40)
+    
+    import asyncio
+    from aiohttp import web
+    from crawler import crawl
+    
+    async def run():
+        async def page(request):
+            index = int(request.match_info.get("index", 0))
+            links = "".join(f"<a href='/page/{target}#top'>next</a>" for target in (index + 1, index + 2, 0))
+            body = (f"<html><head><title>Page {index % 3}</title></head><body><h1>Page</h1>"
+                    f"<p>{'word ' * 50 * index}</p>{links}<a href='/missing'>gone</a>"
+                    f"<a href='/private/x'>secret</a><a href='https://example.com/'>out</a></body></html>")
+            return web.Response(text=body, content_type="text/html")
+        
+        async def robots(request):
+            return web.Response(text="User-agent: *\nDisallow: /private/\n")
+        
+        app = web.Application()
+        app.router.add_get("/", page)
+        app.router.add_get("/page/{index}", page)
+        app.router.add_get("/robots.txt", robots)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            report = await crawl("http://127.0.0.1:%d/" % runner.addresses[0][1], max_pages=10, max_depth=3)
+            print(f"  Crawled {report['pages_crawled']} pages in {report['crawl_seconds']}s, status codes: {report['status_codes']}")
+            print(f"  Blocked by robots.txt: {report['blocked_by_robots']}")
+            print(f"  Issues: {sorted(report['issues'])}")
+            print(f"  Broken links: {report['issues'].get('broken_links')}")
+        finally:
+            await runner.cleanup()
+    
+    asyncio.run(run())
+
+def test_page_weight():
+    """Test the page weight analyzer against a local page with subresources."""
+    print("\nTesting Page Weight")
+    print("=" * 40)
+    
+    import asyncio
+    import io
+    from aiohttp import web
+    from PIL import Image
+    from page_weight import measure_page
+    
+    picture = io.BytesIO()
+    Image.new("RGB", (1200, 800), "navy").save(picture, "JPEG", quality=95)
+    picture = picture.getvalue()
+    
+    async def run():
+        async def page(request):
+            return web.Response(content_type="text/html", text=(
+                "<html><head><link rel='stylesheet' href='/site.css'><script src='/app.js'></script></head><body>"
+                "<img src='/hero.jpg'><img src='hero.jpg#again'><img src='/streamed.jpg'><img src='/missing.png'>"
+                "<img src='data:image/gif;base64,R0lGOD'></body></html>"))
+        
+        async def streamed(request):
+            # No Content-Length: the body has to be counted
+            response = web.StreamResponse(headers={"Content-Type": "image/jpeg"})
+            await response.prepare(request)
+            for index in range(0, len(picture), 4096):
+                await response.write(picture[index:index + 4096])
+            return response
+        
+        def static(body, content_type):
+            async def handler(request):
+                return web.Response(body=body, content_type=content_type)
+            return handler
+        
+        app = web.Application()
+        app.router.add_get("/", page)
+        app.router.add_get("/site.css", static(b"body{}" * 5000, "text/css"))
+        app.router.add_get("/app.js", static(b"var a;" * 20000, "text/javascript"))
+        app.router.add_get("/hero.jpg", static(picture, "image/jpeg"))
+        app.router.add_get("/streamed.jpg", streamed)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        try:
+            report = await measure_page("http://127.0.0.1:%d/" % runner.addresses[0][1])
+            print(f"  Total: {report['total_kb']}KB over {report['requests']} requests, by type: {report['by_type']}")
+            print(f"  Largest: {report['largest_assets']}")
+            print(f"  Failed: {report.get('failed_assets')}")
+        finally:
+            await runner.cleanup()
+    
+    asyncio.run(run())
+
+def test_quote_cache():
+    """Test batch quotes through the shared quote cache."""
+    print("\nTesting Quote Cache")
+    print("=" * 40)
+    
+    import asyncio
+    import time
+    from actions import get_stock_prices
+    from quotes import QuoteCache, quote_table
+    
+    calls = []
+    
+    async def fetch(symbol):
+        calls.append(symbol)
+        await asyncio.sleep(0.1)
+        if symbol == "FAIL":
+            return {"error": "Stock symbol not found"}
+        return {"symbol": symbol, "price": 100.0 + len(symbol), "change": 1.0, "change_percent": "1.0%", "volume": "1000"}
+    
+    async def run():
+        quotes = QuoteCache(freshness=60)
+        start = time.time()
+        first = await quotes.get_many(["AAPL", "GOOGL", "MSFT", "TSLA", "FAIL"], fetch)
+        print(f"  5 symbols fetched in {time.time() - start:.2f}s: {quote_table(first)}")
+        start = time.time()
+        second = await quotes.get_many(["AAPL", "MSFT", "NVDA"], fetch)
+        print(f"  Repeat with 1 new symbol in {time.time() - start:.2f}s, upstream calls: {len(calls)}")
+        print(f"  Cache: {quotes.stats()}")
+    
+    asyncio.run(run())
+    print(f"  get_stock_prices (mock data): {get_stock_prices('AAPL, msft tsla')}")
+
+def test_timeseries():
+    """Test the columnar price store and its vectorized indicators."""
+    print("\nTesting Time-Series Store")
+    print("=" * 40)
+    
+    import tempfile
+    import time
+    import numpy as np
+    import pandas as pd
+    from timeseries import TimeSeriesStore, ema, rsi, sma, summarize
+    
+    rng = np.random.default_rng(7)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.015, 2500))
+    dates = np.busday_offset("2015-01-02", np.arange(2500)).astype(np.int64)
+    rows = {"date": dates, "open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+            "volume": np.full(2500, 1e6)}
+    
+    with tempfile.TemporaryDirectory() as root:
+        store = TimeSeriesStore(root)
+        print(f"  Initial load: {store.append('TEST', {name: values[:2400] for name, values in rows.items()})} days")
+        print(f"  Incremental: {store.append('TEST', {name: values[2300:] for name, values in rows.items()})} new days")
+        columns = store.load("TEST")
+        print(f"  Stored {store.length('TEST')} days as {type(columns['close']).__name__}")
+        
+        start = time.perf_counter()
+        summary = summarize("TEST", columns, 90)
+        print(f"  Summary in {(time.perf_counter() - start) * 1e6:.0f}us: {summary}")
+        
+        series = pd.Series(close)
+        print(f"  SMA matches pandas: {np.allclose(sma(close, 50), series.rolling(50).mean().dropna())}")
+        print(f"  EMA matches pandas: {np.allclose(ema(close, 26), series.ewm(span=26, adjust=False).mean())}")
+        print(f"  RSI 14: {rsi(close):.2f}")
+
+def test_price_feed():
+    """Test the background price feed and its ring buffers."""
+    print("\nTesting Price Feed")
+    print("=" * 40)
+    
+    import asyncio
+    import time
+    from price_feed import PriceFeed, RingBuffer
+    
+    ring = RingBuffer(capacity=4)
+    for tick in range(6):
+        ring.append(tick * 60.0, 100.0 + tick)
+    print(f"  Ring after 6 samples in 4 slots: {ring.samples()[1].tolist()}, stats: {ring.window_stats()}")
+    
+    ticks = {"count": 0}
+    
+    async def fetch_crypto(symbols):
+        ticks["count"] += 1
+        return {symbol: {"symbol": symbol, "price": 45000 + 10 * ticks["count"]} for symbol in symbols}
+    
+    async def fetch_stocks(symbols):
+        return {symbol: {"error": "Stock symbol not found"} if symbol == "NOPE" else {"price": 150.0} for symbol in symbols}
+    
+    feed = PriceFeed(fetch_crypto, fetch_stocks, crypto=["BTC"], stocks=["AAPL", "NOPE"], interval=0.05, capacity=16)
+    feed.start()
+    time.sleep(0.3)
+    feed.stop()
+    start = time.perf_counter()
+    quote = feed.lookup("crypto", "btc")
+    print(f"  Lookup in {(time.perf_counter() - start) * 1e6:.0f}us: {quote}")
+    print(f"  Unwatched / failed symbols: {feed.lookup('crypto', 'ETH')}, {feed.lookup('stock', 'NOPE')}")
+    print(f"  Stats: {feed.stats()}")
+
+def test_portfolio():
+    """Test the vectorized portfolio analytics."""
+    print("\nTesting Portfolio Analytics")
+    print("=" * 40)
+    
+    import time
+    import numpy as np
+    import pandas as pd
+    from actions import analyze_portfolio
+    from portfolio import analyze, parse_holdings
+    
+    print(f"  Holdings parsed: {parse_holdings('aapl:10, MSFT:5')}, {parse_holdings(['AAPL', 'MSFT'])}")
+    result = analyze_portfolio({"AAPL": 10, "MSFT": 5, "TSLA": 8}, 252)
+    print(f"  Mock portfolio: value {result.get('value')}, return {result.get('annual_return_pct')}%, "
+          f"volatility {result.get('annual_volatility_pct')}%, risk {result.get('risk')}")
+    print(f"  Positions: {result.get('positions')}")
+    print(f"  Mixed holdings: {analyze_portfolio({'AAPL': 10, 'MSFT': None})}")
+    
+    # 500 symbols over five years, each missing a few random days
+    rng = np.random.default_rng(11)
+    days = np.busday_offset("2020-01-02", np.arange(1260)).astype(np.int64)
+    series = {}
+    for index in range(500):
+        keep = rng.random(1260) > 0.002
+        close = 50 * np.cumprod(1 + rng.normal(0.0004, 0.02, 1260))
+        series[f"S{index}"] = {"date": days[keep], "close": close[keep]}
+    holdings = {symbol: float(rng.integers(1, 100)) for symbol in series}
+    start = time.perf_counter()
+    report = analyze(holdings, series, 1000)
+    print(f"  500 symbols x {report['trading_days']} days in {(time.perf_counter() - start) * 1000:.1f}ms, "
+          f"VaR 95: {report['risk']['var_95']}, correlation: {report['correlation']}")
+    
+    frame = pd.DataFrame({symbol: pd.Series(series[symbol]["close"], index=series[symbol]["date"]) for symbol in ["S0", "S1", "S2", "S3"]})
+    returns = frame.ffill().iloc[-61:].pct_change().dropna()
+    small = analyze({symbol: None for symbol in frame}, {symbol: series[symbol] for symbol in frame}, 60)
+    print(f"  Correlation matches pandas: {np.allclose(small['correlation']['matrix'], returns.corr(), atol=1e-3)}")
+
 def test_function_execution():
     """Test the function execution logic."""
     print("\nTesting Function Execution Logic")
@@ -102,6 +946,31 @@ def test_function_execution():
     except ImportError:
         print("  Skipping function execution test (main.py not available)")
 
+def test_async_function_execution():
+    """Test the async function execution path used by run_ai_agent_async."""
+    print("\nTesting Async Function Execution")
+    print("=" * 40)
+    
+    try:
+        import asyncio
+        from main import execute_function_async
+        
+        test_calls = [
+            ("get_weather_info", {"city": "london"}),
+            ("calculate_math_expression", {"expression": "5 + 3"}),
+            ("get_current_time", {}),
+            ("unknown_function", {"param": "value"})
+        ]
+        
+        async def run_all():
+            return await asyncio.gather(*(execute_function_async(name, params) for name, params in test_calls))
+        
+        for (function_name, params), result in zip(test_calls, asyncio.run(run_all())):
+            print(f"  {function_name}({params}): {result}")
+            
+    except ImportError:
+        print("  Skipping async function execution test (main.py not available)")
+
 def main():
     """Run all tests."""
     print("🤖 AI Agent System Test Suite")
@@ -113,9 +982,78 @@ def main():
     # Test JSON extraction
     test_json_extraction()
     
+    # Test multi-action extraction
+    test_multi_action_extraction()
+    
     # Test function execution
     test_function_execution()
     
+    # Test action cache
+    test_action_cache()
+    
+    # Test answer cache
+    test_answer_cache()
+    
+    # Test model scheduler
+    test_model_scheduler()
+    
+    # Test model cascade checks
+    test_cascade_checks()
+    
+    # Test HTTP cache
+    test_http_cache()
+    
+    # Test transport background loop
+    test_transport_background_loop()
+    
+    # Test rate limiter
+    test_rate_limiter()
+    
+    # Test request coalescing
+    test_request_coalescing()
+    
+    # Test circuit breaker
+    test_circuit_breaker()
+    
+    # Test fake upstreams
+    test_fake_upstreams()
+    
+    # Test fake LLM server
+    test_fake_llm_server()
+    
+    # Test agent service validation
+    test_agent_service_validation()
+    
+    # Test stream monitor
+    test_stream_monitor()
+    
+    # Test latency probe
+    test_latency_probe()
+    
+    # Test HTML analysis
+    test_html_analysis()
+    
+    # Test site crawler
+    test_crawler()
+    
+    # Test page weight
+    test_page_weight()
+    
+    # Test quote cache
+    test_quote_cache()
+    
+    # Test time-series store
+    test_timeseries()
+    
+    # Test price feed
+    test_price_feed()
+    
+    # Test portfolio analytics
+    test_portfolio()
+    
+    # Test async function execution
+    test_async_function_execution()
+    
     print("\n" + "=" * 50)
     print("Test suite completed!")
     print("\nTo run the full AI agent system:")
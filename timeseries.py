@@ -0,0 +1,224 @@
+"""
+Local columnar store for daily price history, with vectorized indicators.
+Each symbol is a directory of append-only raw column files (date, open, high,
+low, close, volume) under TIMESERIES_DIR. New rows are appended instead of
+refetching the whole history, and columns are read back as read-only NumPy
+memory maps, so repeat queries cost no network and no parsing. Indicators
+(SMA, EMA, RSI, volatility, drawdown) are computed with NumPy over the mapped
+arrays.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import Config
+
+# Column name -> dtype; dates are days since 1970-01-01
+COLUMNS = {
+    "date": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64
+}
+
+TRADING_DAYS = 252
+
+# Smallest decay factor used inside one closed-form EWMA block
+EWMA_MIN_POWER = 1e-100
+
+_SYMBOL = re.compile(r"^[A-Z0-9][A-Z0-9.\-^]{0,19}$")
+
+def to_days(dates) -> np.ndarray:
+    """ISO date strings (or datetime64) to days since the epoch."""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+def to_iso(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+class TimeSeriesStore:
+    """Append-only per-symbol column files, read back as memory maps."""
+
+    def __init__(self, root: str = Config.TIMESERIES_DIR):
+        self.root = root
+        self._locks = defaultdict(threading.Lock)
+        self._maps = {}
+
+    def _dir(self, symbol: str) -> str:
+        symbol = symbol.strip().upper()
+        if not _SYMBOL.match(symbol):
+            raise ValueError(f"Invalid symbol: {symbol!r}")
+        return os.path.join(self.root, symbol)
+
+    def _path(self, symbol: str, column: str) -> str:
+        return os.path.join(self._dir(symbol), f"{column}.bin")
+
+    def length(self, symbol: str) -> int:
+        """Number of complete rows stored (the date column is written last)."""
+        try:
+            return os.path.getsize(self._path(symbol, "date")) // np.dtype(COLUMNS["date"]).itemsize
+        except FileNotFoundError:
+            return 0
+
+    def age(self, symbol: str) -> Optional[float]:
+        """Seconds since the symbol was last refreshed, or None if it was never stored."""
+        try:
+            return time.time() - os.path.getmtime(self._path(symbol, "date"))
+        except FileNotFoundError:
+            return None
+
+    def needs_refresh(self, symbol: str, max_age: float = Config.TIMESERIES_REFRESH) -> bool:
+        age = self.age(symbol)
+        return age is None or age > max_age
+
+    def load(self, symbol: str) -> Dict[str, np.ndarray]:
+        """All stored columns as read-only arrays, oldest first (empty arrays when nothing is stored)."""
+        length = self.length(symbol)
+        cached = self._maps.get(symbol.upper())
+        if cached is not None and cached[0] == length:
+            return cached[1]
+        if length == 0:
+            return {column: np.empty(0, dtype) for column, dtype in COLUMNS.items()}
+        columns = {column: np.memmap(self._path(symbol, column), dtype=dtype, mode="r", shape=(length,))
+                   for column, dtype in COLUMNS.items()}
+        self._maps[symbol.upper()] = (length, columns)
+        return columns
+
+    def last_date(self, symbol: str) -> Optional[int]:
+        dates = self.load(symbol)["date"]
+        return int(dates[-1]) if len(dates) else None
+
+    def append(self, symbol: str, rows: Dict[str, np.ndarray]) -> int:
+        """
+        Append the rows dated after the last stored day and return how many
+        were added. Always marks the symbol as refreshed.
+        """
+        directory = self._dir(symbol)
+        with self._locks[symbol.upper()]:
+            os.makedirs(directory, exist_ok=True)
+            length = self.length(symbol)
+            last = self.last_date(symbol)
+            order = np.argsort(rows["date"], kind="stable")
+            dates = np.asarray(rows["date"], dtype=np.int64)[order]
+            keep = dates > last if last is not None else np.ones(len(dates), bool)
+            # Drop duplicate days within the batch, keeping the last one
+            keep &= np.append(dates[1:] != dates[:-1], True) if len(dates) else keep
+            # Dates go last, so an interrupted append never counts as complete rows
+            for column, dtype in sorted(COLUMNS.items(), key=lambda item: item[0] == "date"):
+                path = self._path(symbol, column)
+                values = np.asarray(rows[column], dtype=dtype)[order][keep]
+                with open(path, "ab") as handle:
+                    # Cut off the tail of a previously interrupted append
+                    handle.truncate(length * np.dtype(dtype).itemsize)
+                    handle.write(values.tobytes())
+            os.utime(self._path(symbol, "date"))
+            self._maps.pop(symbol.upper(), None)
+            return int(keep.sum())
+
+# Indicators
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average; one value per full window."""
+    values = np.asarray(values, dtype=np.float64)
+    if window <= 0 or len(values) < window:
+        return np.empty(0)
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums[window - 1:] / window
+
+def ewma(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponentially weighted moving average seeded with the first value
+    (pandas ewm(adjust=False)). Blocks of values are solved in closed form
+    with a cumulative sum; the block length keeps the decay powers above
+    EWMA_MIN_POWER so they stay well inside float64 range.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if alpha >= 1 or not len(values):
+        return values.copy()
+    decay = 1 - alpha
+    block = max(1, min(len(values), int(np.log(EWMA_MIN_POWER) / np.log(decay))))
+    powers = decay ** np.arange(1, block + 1)
+    out = np.empty_like(values)
+    previous = values[0]
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        scale = powers[:len(chunk)]
+        out[start:start + len(chunk)] = scale * (previous + alpha * np.cumsum(chunk / scale))
+        previous = out[start + len(chunk) - 1]
+    return out
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    return ewma(values, 2 / (span + 1))
+
+def rsi(close: np.ndarray, period: int = 14) -> Optional[float]:
+    """Latest Wilder RSI, or None without period + 1 closes."""
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) <= period:
+        return None
+    deltas = np.diff(close)
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+    gain = ewma(np.concatenate(([gains[:period].mean()], gains[period:])), 1 / period)[-1]
+    loss = ewma(np.concatenate(([losses[:period].mean()], losses[period:])), 1 / period)[-1]
+    if loss == 0:
+        return 100.0
+    return float(100 - 100 / (1 + gain / loss))
+
+def log_returns(close: np.ndarray) -> np.ndarray:
+    return np.diff(np.log(np.asarray(close, dtype=np.float64)))
+
+def volatility(close: np.ndarray) -> Optional[float]:
+    """Annualized standard deviation of daily log returns."""
+    returns = log_returns(close)
+    if len(returns) < 2:
+        return None
+    return float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS))
+
+def drawdowns(close: np.ndarray) -> np.ndarray:
+    """Drawdown from the running peak at each point (0 at a new high, negative below it)."""
+    close = np.asarray(close, dtype=np.float64)
+    return close / np.maximum.accumulate(close) - 1
+
+def _pct(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value * 100, 2)
+
+def summarize(symbol: str, columns: Dict[str, np.ndarray], window: int = 90) -> Dict[str, Any]:
+    """Indicator summary over the last `window` trading days of a stored series."""
+    close = columns["close"]
+    window = max(2, min(int(window), len(close)))
+    recent = close[-window:]
+    dips = drawdowns(recent)
+    strength = rsi(close)
+    moving = {}
+    for span in (20, 50, 200):
+        average = sma(close[-span:], span)
+        if len(average):
+            moving[str(span)] = round(float(average[-1]), 2)
+    return {
+        "symbol": symbol,
+        "from": to_iso(columns["date"][-window]),
+        "to": to_iso(columns["date"][-1]),
+        "trading_days": window,
+        "last_close": round(float(close[-1]), 2),
+        "return_pct": _pct(float(recent[-1] / recent[0] - 1)),
+        "high": round(float(columns["high"][-window:].max()), 2),
+        "low": round(float(columns["low"][-window:].min()), 2),
+        "sma": moving,
+        "ema": {str(span): round(float(ema(close, span)[-1]), 2) for span in (12, 26)},
+        "rsi_14": None if strength is None else round(strength, 1),
+        "volatility_pct": _pct(volatility(recent)),
+        "max_drawdown_pct": _pct(float(dips.min())),
+        "current_drawdown_pct": _pct(float(dips[-1])),
+        "history_days": len(close)
+    }
+
+# Shared by the price history actions
+price_store = TimeSeriesStore()
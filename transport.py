@@ -0,0 +1,534 @@
+"""
+Shared HTTP transport for the network actions.
+One pooled requests.Session and one aiohttp.ClientSession per event loop keep
+connections to each upstream host alive between calls, so repeated tool calls
+skip DNS, TCP and TLS setup. Sync callers of async code use run_sync. It
+runs the coroutine on one long-lived background loop, so that loop's pool is
+reused too. Idempotent GETs are retried on connection errors and on
+429/502/503/504 with exponential backoff, go through an HTTP cache that
+revalidates stale responses with ETag / Last-Modified, wait for their
+provider's rate limiter, and fail fast while their host's circuit breaker
+is open.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import weakref
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit import CircuitBreakers, CircuitOpenError
+from config import Config
+from httpcache import HTTPCache
+from ratelimit import RateLimiter, RateLimitExceeded
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Read size for bodies streamed through cached_stream
+STREAM_CHUNK = 65536
+
+class FetchResult:
+    """
+    Buffered aiohttp response exposing the parts of requests.Response the actions use.
+    """
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str, encoding: Optional[str]):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.encoding = encoding
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+class StreamedBody:
+    """
+    GET body read chunk by chunk (iterate it, or async-iterate it in the async
+    flavor), either live from the network or from an HTTP cache entry.
+    Up to max_body bytes of a live body are kept so that a body read to the
+    end can be stored in the cache afterwards.
+    """
+
+    def __init__(self, status_code: int, headers, url: str, chunks=None, max_body: int = 0, entry=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.url = url
+        self.from_cache = entry is not None
+        self._entry = entry
+        self._chunks = chunks
+        self._max_body = max_body
+        self._kept = []
+        self._size = 0
+        self.finished = False
+
+    @classmethod
+    def cached(cls, entry) -> "StreamedBody":
+        return cls(entry.status_code, entry.headers, entry.url, entry=entry)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+    def _keep(self, chunk: bytes):
+        self._size += len(chunk)
+        if self._size <= self._max_body:
+            self._kept.append(chunk)
+
+    def __iter__(self):
+        if self._entry is not None:
+            yield self._entry.content
+        else:
+            for chunk in self._chunks:
+                self._keep(chunk)
+                yield chunk
+        self.finished = True
+
+    async def __aiter__(self):
+        if self._entry is not None:
+            yield self._entry.content
+        else:
+            async for chunk in self._chunks:
+                self._keep(chunk)
+                yield chunk
+        self.finished = True
+
+    def recorded(self) -> Optional[FetchResult]:
+        """The live body as a FetchResult if it was read to the end and fits max_body, else None."""
+        if self.from_cache or not self.finished or self._size > self._max_body:
+            return None
+        return FetchResult(self.status_code, self.headers, b"".join(self._kept), self.url, None)
+
+class HTTPTransport:
+    """
+    Connection-pooling HTTP client with sync (requests) and async (aiohttp) flavors.
+    Timeouts default to Config.REQUEST_TIMEOUT; pass retry=False, cache=False
+    and circuit=False for calls that measure latency, where a silent retry, a
+    cached body or a fail-fast error would distort the result.
+    """
+
+    def __init__(self, timeout: float = Config.REQUEST_TIMEOUT, pool_hosts: int = Config.HTTP_POOL_HOSTS,
+                 pool_per_host: int = Config.HTTP_POOL_PER_HOST, retries: int = Config.HTTP_RETRIES,
+                 backoff: float = Config.HTTP_RETRY_BACKOFF, keepalive: float = Config.HTTP_KEEPALIVE_TIMEOUT,
+                 user_agent: str = Config.USER_AGENT, http_cache: Optional[HTTPCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None, breakers: Optional[CircuitBreakers] = None):
+        self.timeout = timeout
+        self.pool_hosts = pool_hosts
+        self.pool_per_host = pool_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.keepalive = keepalive
+        self.user_agent = user_agent
+        self.http_cache = HTTPCache() if http_cache is None else http_cache
+        self.rate_limiter = RateLimiter() if rate_limiter is None else rate_limiter
+        self.breakers = CircuitBreakers(provider_for=self.rate_limiter.provider_for) if breakers is None else breakers
+        self._lock = threading.Lock()
+        self._session = None
+        # aiohttp sessions are bound to the loop that created them
+        self._async_sessions = weakref.WeakKeyDictionary()
+        self._session_keepers = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_thread = None
+
+    # Sync flavor
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        # Retries happen in _send, the same way as in the async flavor
+        adapter = HTTPAdapter(pool_connections=self.pool_hosts, pool_maxsize=self.pool_per_host,
+                              max_retries=0, pool_block=False)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = self.user_agent
+        return session
+
+    def session(self) -> requests.Session:
+        """The shared requests.Session (created on first use)."""
+        with self._lock:
+            if self._session is None:
+                self._session = self._build_session()
+            return self._session
+
+    def _send(self, url: str, retry: bool, **kwargs) -> requests.Response:
+        """
+        GET with retries on connection errors and RETRY_STATUSES, backing off
+        exponentially or for the server's Retry-After (capped at the timeout).
+        The caller takes the first attempt's rate limit token; each retry takes
+        its own, and a retry that gets none returns the last response instead.
+        """
+        attempts = self.retries + 1 if retry else 1
+        response = None
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            if attempt:
+                try:
+                    self.rate_limiter.acquire(url)
+                except RateLimitExceeded:
+                    if response is None:
+                        raise
+                    return response
+            try:
+                response = self.session().get(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if last_attempt:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            response.close()
+            time.sleep(self._retry_delay(response, attempt))
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None, allow_redirects: bool = True, retry: bool = True,
+            cache: bool = True, circuit: bool = True) -> requests.Response:
+        """GET through the HTTP cache, rate limiter, circuit breaker and shared connection pool."""
+        key, entry, request_headers = self._prepare(url, params, headers, cache)
+        if entry is not None and entry.is_fresh():
+            return self.http_cache.serve(entry)
+        breaker, open_error = self._admit(url, circuit)
+        if open_error is not None:
+            if entry is not None:
+                return self.http_cache.serve_stale(entry)
+            raise open_error
+
+        try:
+            self.rate_limiter.acquire(url)
+            start = time.monotonic()
+            response = self._send(url, retry, params=params, headers=request_headers,
+                                  timeout=timeout or self.timeout, allow_redirects=allow_redirects)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if breaker:
+                breaker.record(False, time.monotonic() - start)
+            raise
+        except BaseException:
+            if breaker:
+                breaker.cancel()
+            raise
+        if breaker:
+            breaker.record(response.status_code < 500, time.monotonic() - start)
+        return self.http_cache.complete(key, entry, response) if key else response
+
+    @contextmanager
+    def stream(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+               circuit: bool = True):
+        """
+        GET whose body is left unread for the caller to consume incrementally
+        (iter_content), so it can stop early. Skips the HTTP cache, which needs
+        whole bodies (see cached_stream). Yields the requests.Response and
+        closes it afterwards.
+        """
+        breaker, open_error = self._admit(url, circuit)
+        if open_error is not None:
+            raise open_error
+        try:
+            self.rate_limiter.acquire(url)
+            start = time.monotonic()
+            response = self._send(url, True, headers=headers, timeout=timeout or self.timeout, stream=True)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if breaker:
+                breaker.record(False, time.monotonic() - start)
+            raise
+        except BaseException:
+            if breaker:
+                breaker.cancel()
+            raise
+        if breaker:
+            breaker.record(response.status_code < 500, time.monotonic() - start)
+        try:
+            yield response
+        finally:
+            response.close()
+
+    @contextmanager
+    def cached_stream(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                      circuit: bool = True):
+        """
+        stream through the HTTP cache. Yields a StreamedBody served from a
+        fresh entry, revalidated with a conditional request, or read live; a
+        live body the caller reads to the end is stored when the block exits.
+        """
+        key, entry, request_headers = self._prepare(url, None, headers, True)
+        if entry is not None and entry.is_fresh():
+            yield StreamedBody.cached(self.http_cache.serve(entry))
+            return
+        with ExitStack() as stack:
+            try:
+                response = stack.enter_context(self.stream(url, headers=request_headers, timeout=timeout, circuit=circuit))
+            except CircuitOpenError:
+                if entry is None:
+                    raise
+                response = None
+            if response is None:
+                body = StreamedBody.cached(self.http_cache.serve_stale(entry))
+            else:
+                body = StreamedBody(response.status_code, response.headers, response.url,
+                                    response.iter_content(chunk_size=STREAM_CHUNK), self.http_cache.max_body)
+                if entry is not None and response.status_code == 304:
+                    body = StreamedBody.cached(self.http_cache.complete(key, entry, body))
+            yield body
+            self._store_streamed(key, body)
+
+    def _store_streamed(self, key, body: StreamedBody):
+        recorded = body.recorded()
+        if key and recorded is not None:
+            self.http_cache.complete(key, None, recorded)
+
+    def _admit(self, url, circuit):
+        """
+        Ask the host's breaker for permission. Returns (breaker, None) when the
+        call may proceed, (None, CircuitOpenError) when it must fail fast, and
+        (None, None) when breakers are bypassed.
+        """
+        if not circuit:
+            return None, None
+        breaker = self.breakers.for_url(url)
+        try:
+            breaker.before_call()
+        except CircuitOpenError as e:
+            return None, e
+        return breaker, None
+
+    def _prepare(self, url, params, headers, cache):
+        """Find the cached entry for a request and add its validators to the headers."""
+        if not (cache and self.http_cache.enabled):
+            return None, None, headers
+        key = self.http_cache.key(url, params, headers)
+        entry = self.http_cache.lookup(key)
+        if entry is None:
+            return key, None, headers
+        return key, entry, {**(headers or {}), **entry.validators()}
+
+    # Async flavor
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="http-transport", daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    def run_sync(self, coro) -> Any:
+        """
+        Run a coroutine from sync code on the transport's background event
+        loop and wait for its result. Unlike asyncio.run(), the loop (and so
+        its aiohttp session and per-loop single-flights) outlives the call.
+        """
+        loop = self._background_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("run_sync called from the transport's own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def _session_lifetime(self, session: aiohttp.ClientSession):
+        # Suspended for the life of the loop; asyncio.run() finalizes pending
+        # async generators before closing the loop, which closes the session.
+        try:
+            yield
+        finally:
+            await session.close()
+
+    async def async_session(self) -> aiohttp.ClientSession:
+        """The shared aiohttp.ClientSession for the running event loop."""
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            # Forget sessions of loops that have since been closed
+            for old_loop in [old_loop for old_loop in list(self._async_sessions) if old_loop.is_closed()]:
+                self._async_sessions.pop(old_loop, None)
+                self._session_keepers.pop(old_loop, None)
+            connector = aiohttp.TCPConnector(limit=self.pool_hosts * self.pool_per_host, limit_per_host=self.pool_per_host,
+                                             keepalive_timeout=self.keepalive, ttl_dns_cache=300)
+            session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                            headers={"User-Agent": self.user_agent})
+            keeper = self._session_lifetime(session)
+            await keeper.__anext__()
+            self._async_sessions[loop] = session
+            self._session_keepers[loop] = keeper
+        return session
+
+    async def get_async(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                        timeout: Optional[float] = None, allow_redirects: bool = True, retry: bool = True,
+                        cache: bool = True, circuit: bool = True) -> FetchResult:
+        """Async variant of get, buffering the body from the loop's shared aiohttp pool."""
+        key, entry, headers = self._prepare(url, params, headers, cache)
+        if entry is not None and entry.is_fresh():
+            return self.http_cache.serve(entry)
+        breaker, open_error = self._admit(url, circuit)
+        if open_error is not None:
+            if entry is not None:
+                return self.http_cache.serve_stale(entry)
+            raise open_error
+
+        try:
+            await self.rate_limiter.acquire_async(url)
+            start = time.monotonic()
+            result = await self._get_async(url, params, headers, timeout, allow_redirects, retry)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if breaker:
+                breaker.record(False, time.monotonic() - start)
+            raise
+        except BaseException:
+            if breaker:
+                breaker.cancel()
+            raise
+        if breaker:
+            breaker.record(result.status_code < 500, time.monotonic() - start)
+        return self.http_cache.complete(key, entry, result) if key else result
+
+    @asynccontextmanager
+    async def stream_async(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                           circuit: bool = True, method: str = "GET"):
+        """
+        Async variant of stream; yields the aiohttp.ClientResponse with its body
+        unread. method="HEAD" fetches only the headers.
+        """
+        breaker, open_error = self._admit(url, circuit)
+        if open_error is not None:
+            raise open_error
+        try:
+            session = await self.async_session()
+            await self.rate_limiter.acquire_async(url)
+            start = time.monotonic()
+            response = await session.request(method, url, headers=headers,
+                                             timeout=aiohttp.ClientTimeout(total=timeout or self.timeout))
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if breaker:
+                breaker.record(False, time.monotonic() - start)
+            raise
+        except BaseException:
+            if breaker:
+                breaker.cancel()
+            raise
+        if breaker:
+            breaker.record(response.status < 500, time.monotonic() - start)
+        try:
+            yield response
+        finally:
+            response.release()
+
+    @asynccontextmanager
+    async def cached_stream_async(self, url: str, headers: Optional[Dict[str, str]] = None,
+                                  timeout: Optional[float] = None, circuit: bool = True):
+        """Async variant of cached_stream; iterate the StreamedBody with async for."""
+        key, entry, request_headers = self._prepare(url, None, headers, True)
+        if entry is not None and entry.is_fresh():
+            yield StreamedBody.cached(self.http_cache.serve(entry))
+            return
+        async with AsyncExitStack() as stack:
+            try:
+                response = await stack.enter_async_context(
+                    self.stream_async(url, headers=request_headers, timeout=timeout, circuit=circuit))
+            except CircuitOpenError:
+                if entry is None:
+                    raise
+                response = None
+            if response is None:
+                body = StreamedBody.cached(self.http_cache.serve_stale(entry))
+            else:
+                body = StreamedBody(response.status, response.headers, str(response.url),
+                                    response.content.iter_chunked(STREAM_CHUNK), self.http_cache.max_body)
+                if entry is not None and response.status == 304:
+                    body = StreamedBody.cached(self.http_cache.complete(key, entry, body))
+            yield body
+            self._store_streamed(key, body)
+
+    async def _get_async(self, url, params, headers, timeout, allow_redirects, retry) -> FetchResult:
+        session = await self.async_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        attempts = self.retries + 1 if retry else 1
+        result = None
+
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            if attempt:
+                # A retry is another upstream request and needs its own token
+                try:
+                    await self.rate_limiter.acquire_async(url)
+                except RateLimitExceeded:
+                    if result is None:
+                        raise
+                    return result
+            try:
+                async with session.get(url, params=params, headers=headers, timeout=client_timeout,
+                                       allow_redirects=allow_redirects) as response:
+                    content = await response.read()
+                    result = FetchResult(
+                        status_code=response.status,
+                        headers=response.headers,
+                        content=content,
+                        url=str(response.url),
+                        encoding=response.get_encoding() if content else None
+                    )
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if last_attempt:
+                    raise
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+                continue
+
+            if result.status_code not in RETRY_STATUSES or last_attempt:
+                return result
+            await asyncio.sleep(self._retry_delay(result, attempt))
+
+    def _retry_delay(self, result, attempt: int) -> float:
+        """Seconds before the next attempt; result is a FetchResult or requests.Response."""
+        retry_after = result.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), self.timeout)
+        return self.backoff * (2 ** attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        """HTTP cache, rate limiter and circuit breaker metrics."""
+        return {
+            "http_cache": self.http_cache.stats(),
+            "rate_limits": self.rate_limiter.stats(),
+            "circuits": self.breakers.stats()
+        }
+
+    # Lifecycle
+
+    def close(self):
+        """
+        Close the sync sessions and stop the background loop (other loops'
+        async sessions close with their event loop or aclose()).
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is not None and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.aclose(), loop).result(self.timeout)
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(self.timeout)
+            loop.close()
+
+    async def aclose(self):
+        """Close the running loop's aiohttp session."""
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.pop(loop, None)
+        keeper = self._session_keepers.pop(loop, None)
+        if keeper is not None:
+            await keeper.aclose()
+        elif session is not None:
+            await session.close()
+
+# Shared transport used by the network actions in actions.py
+transport = HTTPTransport()